@@ -1,3 +1,14 @@
+import numbers
+
+import numpy as np
+
+from checkpoints import Checkpoints
+from cost_basis import CostBasis
+from ledger import Ledger, to_ns
+from storage import AccountStorage
+from valuation import PriceSnapshot
+
+
 class InsufficientFundsError(Exception):
     """Raised when an account has insufficient funds for a transaction."""
     pass
@@ -8,24 +19,77 @@ class InsufficientSharesError(Exception):
     pass
 
 
+def _check_quantity(quantity):
+    # El ledger guarda cantidades enteras: una fracción se perdería sin avisar, pero 10.0 es válido
+    if not isinstance(quantity, numbers.Integral):
+        if not isinstance(quantity, numbers.Real) or not float(quantity).is_integer():
+            raise ValueError("Quantity must be a whole number of shares.")
+    quantity = int(quantity)
+    if quantity <= 0:
+        raise ValueError("Quantity must be positive.")
+    return quantity
+
+
 class Account:
     """
     Represents a user's trading account.
     """
 
-    def __init__(self, account_id, initial_deposit=0.0):
+    def __init__(self, account_id, initial_deposit=0.0, storage=None, cost_method='fifo'):
         """
         Initializes a new Account object.
 
         Args:
             account_id (str): Unique identifier for the account.
             initial_deposit (float): Initial deposit amount (default: 0.0).
+            storage (AccountStorage): Backend that persists the account (default: memory only).
+            cost_method (str): Lot matching of sales, 'fifo' or 'average' (default: 'fifo').
         """
         self.account_id = account_id
         self.balance = initial_deposit
         self.holdings = {}  # {symbol: quantity}
-        self.transactions = []  # List of transaction dictionaries: {'type': 'deposit'/'withdraw'/'buy'/'sell', 'symbol': 'AAPL', 'quantity': 10, 'price': 150.0, 'timestamp': '2023-10-27 10:00:00', 'amount':1500.0}
+        self.transactions = Ledger()  # Reads as transaction dictionaries: {'type': 'deposit'/'withdraw'/'buy'/'sell', 'symbol': 'AAPL', 'quantity': 10, 'price': 150.0, 'timestamp': '2023-10-27 10:00:00.000', 'amount':1500.0}
         self.initial_deposit = initial_deposit
+        self.net_deposits = initial_deposit  # Depósitos menos retiradas, incluido el inicial
+        self.cost_basis = CostBasis(cost_method)
+        self.checkpoints = Checkpoints(self.transactions, initial_deposit, {}, initial_deposit)
+        self.history_offset = 0  # Transactions before the ones in the ledger, kept only in the storage
+        self.storage = storage if storage is not None else AccountStorage()
+        self.storage.create(self)
+
+    @property
+    def history_truncated(self):
+        """True when older transactions are only in the storage."""
+        return self.history_offset > 0
+
+    def _append(self, kind, amount, symbol=None, quantity=0, price=float('nan'), timestamp=None):
+        row = self.transactions.append(kind, amount, symbol, quantity, price, timestamp)
+        timestamp = int(self.transactions.timestamps[row])
+        if self.checkpoints.add_if_due(self.balance, self.holdings, self.net_deposits):
+            self.storage.record_checkpoint(self, self.history_offset + row + 1, timestamp)
+        return kind, amount, symbol, quantity, price, timestamp
+
+    def _record(self, kind, amount, symbol=None, quantity=0, price=float('nan')):
+        self.storage.record(self, *self._append(kind, amount, symbol, quantity, price))
+
+    def _apply_buy(self, symbol, quantity, price):
+        cost = price * quantity
+        self.balance -= cost
+        if symbol in self.holdings:
+            self.holdings[symbol] += quantity
+        else:
+            self.holdings[symbol] = quantity
+        self.cost_basis.buy(symbol, quantity, price)
+        return cost
+
+    def _apply_sell(self, symbol, quantity, price):
+        proceeds = price * quantity
+        self.balance += proceeds
+        self.holdings[symbol] -= quantity
+        if self.holdings[symbol] == 0:
+            del self.holdings[symbol]
+        self.cost_basis.sell(symbol, quantity, price)
+        return proceeds
 
     def deposit(self, amount):
         """
@@ -40,11 +104,8 @@ class Account:
         if amount <= 0:
             raise ValueError("Deposit amount must be positive.")
         self.balance += amount
-        self.transactions.append({
-            'type': 'deposit',
-            'amount': amount,
-            'timestamp': 'now'  # Replace with actual timestamp
-        })
+        self.net_deposits += amount
+        self._record('deposit', amount)
 
     def withdraw(self, amount):
         """
@@ -64,11 +125,8 @@ class Account:
         if self.balance < amount:
             raise InsufficientFundsError("Insufficient funds.")
         self.balance -= amount
-        self.transactions.append({
-            'type': 'withdraw',
-            'amount': amount,
-            'timestamp': 'now'  # Replace with actual timestamp
-        })
+        self.net_deposits -= amount
+        self._record('withdraw', amount)
 
     def buy(self, symbol, quantity, get_share_price_func):
         """
@@ -76,7 +134,7 @@ class Account:
 
         Args:
             symbol (str): The stock symbol.
-            quantity (int): The number of shares to buy.
+            quantity (int): The number of shares to buy, a positive integer.
             get_share_price_func (function): A function that retrieves the current price of a share.
 
         Returns:
@@ -85,8 +143,7 @@ class Account:
         Raises:
             InsufficientFundsError: If the account balance is insufficient.
         """
-        if quantity <= 0:
-            raise ValueError("Quantity must be positive.")
+        quantity = _check_quantity(quantity)
 
         price = get_share_price_func(symbol)
         cost = price * quantity
@@ -94,21 +151,8 @@ class Account:
         if self.balance < cost:
             raise InsufficientFundsError("Insufficient funds.")
 
-        self.balance -= cost
-
-        if symbol in self.holdings:
-            self.holdings[symbol] += quantity
-        else:
-            self.holdings[symbol] = quantity
-
-        self.transactions.append({
-            'type': 'buy',
-            'symbol': symbol,
-            'quantity': quantity,
-            'price': price,
-            'amount': cost,
-            'timestamp': 'now'  # Replace with actual timestamp
-        })
+        self._apply_buy(symbol, quantity, price)
+        self._record('buy', cost, symbol, quantity, price)
 
     def sell(self, symbol, quantity, get_share_price_func):
         """
@@ -116,7 +160,7 @@ class Account:
 
         Args:
             symbol (str): The stock symbol.
-            quantity (int): The number of shares to sell.
+            quantity (int): The number of shares to sell, a positive integer.
             get_share_price_func (function): A function that retrieves the current price of a share.
 
         Returns:
@@ -125,29 +169,80 @@ class Account:
         Raises:
             InsufficientSharesError: If the account doesn't have enough shares.
         """
-        if quantity <= 0:
-            raise ValueError("Quantity must be positive.")
+        quantity = _check_quantity(quantity)
 
         if symbol not in self.holdings or self.holdings[symbol] < quantity:
             raise InsufficientSharesError("Insufficient shares.")
 
         price = get_share_price_func(symbol)
-        proceeds = price * quantity
+        proceeds = self._apply_sell(symbol, quantity, price)
+        self._record('sell', proceeds, symbol, quantity, price)
 
-        self.balance += proceeds
-        self.holdings[symbol] -= quantity
+    def execute_batch(self, orders, get_share_prices_func):
+        """
+        Executes several orders all together or not at all.
 
-        if self.holdings[symbol] == 0:
-            del self.holdings[symbol]
+        Every distinct symbol is priced once. Sells run first, so their proceeds can pay
+        for the buys, and the whole batch is checked against the projected balance and
+        holdings before anything changes. The executed trades are recorded as one block
+        of transactions sharing a timestamp.
 
-        self.transactions.append({
-            'type': 'sell',
-            'symbol': symbol,
-            'quantity': quantity,
-            'price': price,
-            'amount': proceeds,
-            'timestamp': 'now'  # Replace with actual timestamp
-        })
+        Args:
+            orders (Iterable): Orders as ('buy' | 'sell', symbol, quantity) tuples or as
+                {'type': 'buy' | 'sell', 'symbol': ..., 'quantity': ...} dictionaries.
+            get_share_prices_func (function): A batch price provider ({symbol: price} for a list of symbols).
+
+        Returns:
+            list: The transaction dictionaries recorded, sells first.
+
+        Raises:
+            ValueError: If an order is malformed or its quantity is not a positive integer.
+            InsufficientSharesError: If the sells exceed the shares held.
+            InsufficientFundsError: If the buys exceed the balance after the sells.
+        """
+        sells, buys = [], []
+        for order in orders:
+            if isinstance(order, dict):
+                missing = [key for key in ('type', 'symbol', 'quantity') if key not in order]
+                if missing:
+                    raise ValueError(f"Order is missing {', '.join(missing)}: {order!r}.")
+                kind, symbol, quantity = order['type'], order['symbol'], order['quantity']
+            elif isinstance(order, (tuple, list)) and len(order) == 3:
+                kind, symbol, quantity = order
+            else:
+                raise ValueError(f"Malformed order: {order!r}.")
+            if kind not in ('buy', 'sell'):
+                raise ValueError(f"Unknown order type: {kind}.")
+            if not isinstance(symbol, str) or not symbol:
+                raise ValueError(f"Invalid order symbol: {symbol!r}.")
+            quantity = _check_quantity(quantity)
+            (sells if kind == 'sell' else buys).append((symbol, quantity))
+
+        prices = PriceSnapshot.take([symbol for symbol, _ in sells + buys], get_share_prices_func)
+
+        # Validación contra el estado proyectado, sin tocar la cuenta
+        shares = {}
+        for symbol, quantity in sells:
+            shares[symbol] = shares.get(symbol, 0) + quantity
+            if self.holdings.get(symbol, 0) < shares[symbol]:
+                raise InsufficientSharesError("Insufficient shares.")
+        balance = self.balance + sum(prices(symbol) * quantity for symbol, quantity in sells)
+        for symbol, quantity in buys:
+            balance -= prices(symbol) * quantity
+            if balance < 0:
+                raise InsufficientFundsError("Insufficient funds.")
+
+        timestamp = self.transactions.now()
+        first = len(self.transactions)
+        records = []
+        for symbol, quantity in sells:
+            proceeds = self._apply_sell(symbol, quantity, prices(symbol))
+            records.append(self._append('sell', proceeds, symbol, quantity, prices(symbol), timestamp))
+        for symbol, quantity in buys:
+            cost = self._apply_buy(symbol, quantity, prices(symbol))
+            records.append(self._append('buy', cost, symbol, quantity, prices(symbol), timestamp))
+        self.storage.record_batch(self, records)
+        return self.transactions[first:]
 
     def get_portfolio_value(self, get_share_price_func):
         """
@@ -175,7 +270,9 @@ class Account:
 
     def get_profit_loss(self, get_share_price_func):
         """
-        Calculates the profit or loss since the initial deposit.
+        Calculates the profit or loss of the account, net of deposits and withdrawals.
+
+        It equals the realized plus the unrealized profit or loss.
 
         Args:
             get_share_price_func (function): A function that retrieves the current price of a share.
@@ -183,16 +280,157 @@ class Account:
         Returns:
             float: The profit or loss.
         """
-        return self.get_portfolio_value(get_share_price_func) - self.initial_deposit
+        return self.get_portfolio_value(get_share_price_func) - self.net_deposits
+
+    def get_net_deposits(self):
+        """
+        Returns the money put into the account: initial deposit plus deposits minus withdrawals.
+
+        Returns:
+            float: The net deposits.
+        """
+        return self.net_deposits
+
+    def get_return(self, get_share_price_func):
+        """
+        Calculates the deposit-adjusted return of the account.
+
+        Args:
+            get_share_price_func (function): A function that retrieves the current price of a share.
+
+        Returns:
+            float: The profit or loss as a fraction of the net deposits (0.0 if nothing was deposited).
+        """
+        if self.net_deposits <= 0:
+            return 0.0
+        return self.get_profit_loss(get_share_price_func) / self.net_deposits
 
-    def get_transactions(self):
+    def get_realized_profit_loss(self):
+        """
+        Returns the profit or loss locked in by the sales so far.
+
+        Returns:
+            float: The realized profit or loss.
+        """
+        return self.cost_basis.realized_total
+
+    def get_unrealized_profit_loss(self, get_share_price_func):
+        """
+        Calculates the profit or loss of the shares held against their cost basis.
+
+        Args:
+            get_share_price_func (function): A function that retrieves the current price of a share.
+
+        Returns:
+            float: The unrealized profit or loss.
+        """
+        return sum(
+            self.cost_basis.unrealized(symbol, quantity, get_share_price_func(symbol))
+            for symbol, quantity in self.holdings.items()
+        )
+
+    def get_profit_loss_by_symbol(self, get_share_price_func):
+        """
+        Calculates the cost basis and the realized and unrealized profit or loss of every symbol traded.
+
+        Args:
+            get_share_price_func (function): A function that retrieves the current price of a share.
+
+        Returns:
+            dict: {symbol: {'quantity', 'cost_basis', 'realized', 'unrealized'}}.
+        """
+        result = {}
+        for symbol, realized in self.cost_basis.realized.items():
+            result[symbol] = {'quantity': 0, 'cost_basis': 0.0, 'realized': realized, 'unrealized': 0.0}
+        for symbol, quantity in self.holdings.items():
+            result[symbol] = {
+                'quantity': quantity,
+                'cost_basis': self.cost_basis.cost.get(symbol, 0.0),
+                'realized': self.cost_basis.realized.get(symbol, 0.0),
+                'unrealized': self.cost_basis.unrealized(symbol, quantity, get_share_price_func(symbol)),
+            }
+        return result
+
+    def get_transactions(self, start=None, end=None, symbol=None):
         """
         Returns the transaction history of the account.
 
+        Args:
+            start (datetime | str | float): Only transactions from this instant on (default: all).
+            end (datetime | str | float): Only transactions before this instant (default: all).
+            symbol (str): Only the trades of this stock symbol (default: all).
+
         Returns:
-            list: A list of transaction dictionaries.
+            Sequence: The transaction dictionaries, oldest first.
         """
-        return self.transactions
+        if self.history_truncated and (
+            start is None or not len(self.transactions) or to_ns(start) < self.transactions.timestamps[0]
+        ):
+            # Parte del rango es anterior a las transacciones cargadas en memoria
+            return self.storage.transactions(self.account_id, start, end, symbol)
+        if start is None and end is None and symbol is None:
+            return self.transactions
+        if symbol is None:
+            return self.transactions.rows(self.transactions.between(start, end))
+        return self.transactions.rows(self.transactions.for_symbol(symbol, start, end))
+
+    def get_transaction_count(self):
+        """
+        Returns the number of transactions in the whole history, stored ones included.
+
+        Returns:
+            int: The number of transactions.
+        """
+        return self.history_offset + len(self.transactions)
+
+    def get_transaction_range(self, first, last):
+        """
+        Returns the transactions at positions [first, last) of the whole history.
+
+        Args:
+            first (int): Position of the first transaction (0 is the oldest).
+            last (int): Position after the last transaction.
+
+        Returns:
+            Sequence: The transaction dictionaries, oldest first.
+        """
+        if first >= self.history_offset:
+            return self.transactions[first - self.history_offset:last - self.history_offset]
+        # Parte del rango es anterior a las transacciones cargadas en memoria
+        return self.storage.transaction_range(self.account_id, first, last)
+
+    def state_at(self, timestamp_or_index):
+        """
+        Returns the balance and holdings the account had at a point of its history.
+
+        Replays from the nearest checkpoint, so it costs at most one checkpoint interval of
+        transactions; points before the transactions loaded in memory are replayed from the
+        checkpoints saved in the storage.
+
+        Args:
+            timestamp_or_index (int | datetime | str | float): Number of transactions applied
+                (an index into get_transactions(), which covers the whole stored history), or an
+                instant: every transaction recorded at or before it is applied.
+
+        Returns:
+            dict: {'index', 'timestamp', 'balance', 'holdings', 'net_deposits'}.
+        """
+        if isinstance(timestamp_or_index, (int, np.integer)):
+            index = int(timestamp_or_index)
+            if not 0 <= index <= self.history_offset + len(self.transactions):
+                raise IndexError("Transaction index out of range.")
+            if self.history_truncated and index <= self.history_offset:
+                return self.storage.state_at(self.account_id, index=index)
+            state = self.checkpoints.state_at(index - self.history_offset)
+        elif self.history_truncated and (
+            not len(self.transactions) or to_ns(timestamp_or_index) < self.transactions.timestamps[0]
+        ):
+            # Anterior a las transacciones cargadas en memoria
+            return self.storage.state_at(self.account_id, end=timestamp_or_index)
+        else:
+            state = self.checkpoints.state_at(timestamp_or_index)
+        state['index'] += self.history_offset
+        return state
 
     def get_balance(self):
         """
@@ -223,3 +461,16 @@ def get_share_price(symbol):
         return 2700.0
     else:
         return 100.0  # Default Price
+
+
+def get_share_prices(symbols):
+    """
+    Returns mock share prices for many symbols in a single call (batch price provider).
+
+    Args:
+        symbols (Iterable[str]): The stock symbols.
+
+    Returns:
+        dict: {symbol: mock share price}.
+    """
+    return {symbol: get_share_price(symbol) for symbol in symbols}
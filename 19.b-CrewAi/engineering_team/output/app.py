@@ -1,70 +1,141 @@
-import gradio as gr
-from accounts import Account, InsufficientFundsError, InsufficientSharesError, get_share_price
-
-# Inicializar la cuenta del usuario
-account = Account("user123", initial_deposit=10000.0)
-
-def actualizar_estado():
-    balance = account.get_balance()
-    holdings = account.get_holdings()
-    portfolio_value = account.get_portfolio_value(get_share_price)
-    profit_loss = account.get_profit_loss(get_share_price)
-    transactions = account.get_transactions()
-
-    holdings_str = ""
-    for symbol, quantity in holdings.items():
-        holdings_str += f"{symbol}: {quantity}\n"
-
-    transactions_str = ""
-    for transaction in transactions:
-        transactions_str += f"{transaction}\n"
-    
-    return balance, holdings_str, portfolio_value, profit_loss, transactions_str
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
 
-
-def depositar(amount):
+import gradio as gr
+from accounts import InsufficientFundsError, InsufficientSharesError, get_share_price, get_share_prices
+from service import AccountService
+from storage import SQLiteStorage
+from valuation import PriceSnapshot
+
+# Las cuentas se guardan en SQLite y se recuperan al reiniciar la aplicación
+storage = SQLiteStorage(os.environ.get("ACCOUNTS_DB", Path(__file__).parent / "accounts.db"))
+
+# Registro compartido por todas las sesiones de Gradio: cada cuenta tiene su propio lock
+# y las cuentas nuevas se crean con 10000 al usarlas por primera vez
+service = AccountService(storage, initial_deposit=10000.0)
+
+# Filas por página de la tabla de transacciones
+PAGE_SIZE = int(os.environ.get("TRANSACTIONS_PAGE_SIZE", "20"))
+COLUMNAS_TRANSACCIONES = ["Fecha", "Tipo", "Símbolo", "Cantidad", "Precio", "Importe"]
+
+# Texto de las tenencias de las cuentas usadas más recientemente, que solo se regenera cuando cambian
+MAX_VISTAS_TENENCIAS = int(os.environ.get("HOLDINGS_VIEWS_CACHE_SIZE", "1024"))
+vistas_tenencias = OrderedDict()
+# Sesiones de cuentas distintas pueden refrescar a la vez
+vistas_lock = threading.Lock()
+
+
+def vista_tenencias(account_id, holdings):
+    clave = tuple(holdings.items())
+    with vistas_lock:
+        cacheada = vistas_tenencias.get(account_id)
+        if cacheada is None or cacheada[0] != clave:
+            texto = "".join(f"{symbol}: {quantity}\n" for symbol, quantity in clave)
+            cacheada = vistas_tenencias[account_id] = (clave, texto)
+        vistas_tenencias.move_to_end(account_id)
+        if len(vistas_tenencias) > MAX_VISTAS_TENENCIAS:
+            vistas_tenencias.popitem(last=False)
+    return cacheada
+
+
+def pagina_transacciones(account, page):
+    # Solo se leen las filas de la página (la 0 es la más reciente), no todo el historial;
+    # las páginas antiguas de una cuenta recargada se leen de la base de datos
+    total = account.get_transaction_count()
+    pages = max(1, -(-total // PAGE_SIZE))
+    page = min(max(0, int(page or 0)), pages - 1)
+    last = total - page * PAGE_SIZE
+    rows = [
+        [t['timestamp'], t['type'], t.get('symbol', ''), t.get('quantity', ''), t.get('price', ''), t['amount']]
+        for t in reversed(account.get_transaction_range(max(0, last - PAGE_SIZE), last))
+    ]
+    return rows, page, pages, total
+
+
+def actualizar_estado(account_id, page=0, vista=None):
+    # vista guarda lo que ya tiene el navegador de esta sesión; lo que no ha cambiado no se reenvía
+    vista = dict(vista or {})
+    # Lectura consistente: ninguna operación puede modificar la cuenta a mitad
+    with service.locked(account_id) as account:
+        balance = account.get_balance()
+        holdings = account.get_holdings()
+        # Una sola consulta de precios por refresco, compartida por el valor y la ganancia
+        prices = PriceSnapshot.take(holdings, get_share_prices)
+        portfolio_value = account.get_portfolio_value(prices)
+        profit_loss = account.get_profit_loss(prices)
+        clave_tenencias, holdings_str = vista_tenencias(account_id, holdings)
+        rows, page, pages, total = pagina_transacciones(account, page)
+
+    holdings_output = holdings_str
+    if vista.get('tenencias') == (account_id, clave_tenencias):
+        holdings_output = gr.skip()
+    vista['tenencias'] = (account_id, clave_tenencias)
+
+    transactions_output = rows
+    if vista.get('transacciones') == (account_id, total, page):
+        transactions_output = gr.skip()
+    vista['transacciones'] = (account_id, total, page)
+
+    page_info = f"Página {page + 1} de {pages} ({total} transacciones)"
+    return balance, holdings_output, portfolio_value, profit_loss, transactions_output, page, page_info, vista
+
+
+def error_estado(mensaje):
+    # El mensaje se muestra en el balance y el resto de la vista se deja como estaba
+    return (mensaje,) + (gr.skip(),) * 7
+
+
+def cambiar_pagina(account_id, page, delta, vista):
+    return actualizar_estado(account_id, int(page or 0) + delta, vista)
+
+
+def depositar(account_id, amount, vista):
     try:
         amount = float(amount)
-        account.deposit(amount)
-        return actualizar_estado()
+        service.deposit(account_id, amount)
+        return actualizar_estado(account_id, 0, vista)
     except ValueError:
-        return "Cantidad inválida", "", "", "", ""
+        return error_estado("Cantidad inválida")
 
-def retirar(amount):
+def retirar(account_id, amount, vista):
     try:
         amount = float(amount)
-        account.withdraw(amount)
-        return actualizar_estado()
+        service.withdraw(account_id, amount)
+        return actualizar_estado(account_id, 0, vista)
     except ValueError:
-        return "Cantidad inválida", "", "", "", ""
+        return error_estado("Cantidad inválida")
     except InsufficientFundsError:
-        return "Fondos insuficientes", "", "", "", ""
+        return error_estado("Fondos insuficientes")
 
-def comprar(symbol, quantity):
+def comprar(account_id, symbol, quantity, vista):
     try:
         quantity = int(quantity)
-        account.buy(symbol, quantity, get_share_price)
-        return actualizar_estado()
+        service.buy(account_id, symbol, quantity, get_share_price)
+        return actualizar_estado(account_id, 0, vista)
     except ValueError:
-        return "Cantidad inválida", "", "", "", ""
+        return error_estado("Cantidad inválida")
     except InsufficientFundsError:
-        return "Fondos insuficientes", "", "", "", ""
+        return error_estado("Fondos insuficientes")
 
-def vender(symbol, quantity):
+def vender(account_id, symbol, quantity, vista):
     try:
         quantity = int(quantity)
-        account.sell(symbol, quantity, get_share_price)
-        return actualizar_estado()
+        service.sell(account_id, symbol, quantity, get_share_price)
+        return actualizar_estado(account_id, 0, vista)
     except ValueError:
-        return "Cantidad inválida", "", "", "", ""
+        return error_estado("Cantidad inválida")
     except InsufficientSharesError:
-        return "No tienes suficientes acciones", "", "", "", ""
+        return error_estado("No tienes suficientes acciones")
 
 with gr.Blocks() as demo:
     gr.Markdown("# Simulador de Trading Simple")
 
     with gr.Row():
         with gr.Column():
+            cuenta_input = gr.Text(label="Cuenta", value="user123")
+
             deposito_input = gr.Number(label="Depositar")
             deposito_button = gr.Button("Depositar")
 
@@ -84,16 +155,38 @@ with gr.Blocks() as demo:
             holdings_output = gr.Textbox(label="Tenencias")
             portfolio_value_output = gr.Number(label="Valor del Portafolio")
             profit_loss_output = gr.Number(label="Ganancia/Pérdida")
-            transactions_output = gr.Textbox(label="Transacciones")
-            
-    estado_inputs = [balance_output, holdings_output, portfolio_value_output, profit_loss_output, transactions_output]
-
-
-    deposito_button.click(depositar, inputs=deposito_input, outputs=estado_inputs)
-    retiro_button.click(retirar, inputs=retiro_input, outputs=estado_inputs)
-    compra_button.click(comprar, inputs=[simbolo_compra, cantidad_compra], outputs=estado_inputs)
-    venta_button.click(vender, inputs=[simbolo_venta, cantidad_venta], outputs=estado_inputs)
+            transactions_output = gr.Dataframe(headers=COLUMNAS_TRANSACCIONES, label="Transacciones", interactive=False)
+            with gr.Row():
+                recientes_button = gr.Button("< Más recientes")
+                pagina_info = gr.Markdown()
+                anteriores_button = gr.Button("Anteriores >")
+
+    pagina = gr.State(0)
+    vista = gr.State({})
+    estado_inputs = [
+        balance_output, holdings_output, portfolio_value_output, profit_loss_output,
+        transactions_output, pagina, pagina_info, vista,
+    ]
+
+
+    deposito_button.click(depositar, inputs=[cuenta_input, deposito_input, vista], outputs=estado_inputs)
+    retiro_button.click(retirar, inputs=[cuenta_input, retiro_input, vista], outputs=estado_inputs)
+    compra_button.click(comprar, inputs=[cuenta_input, simbolo_compra, cantidad_compra, vista], outputs=estado_inputs)
+    venta_button.click(vender, inputs=[cuenta_input, simbolo_venta, cantidad_venta, vista], outputs=estado_inputs)
+    cuenta_input.submit(
+        lambda account_id, vista: actualizar_estado(account_id, 0, vista),
+        inputs=[cuenta_input, vista], outputs=estado_inputs,
+    )
+    recientes_button.click(
+        lambda account_id, page, vista: cambiar_pagina(account_id, page, -1, vista),
+        inputs=[cuenta_input, pagina, vista], outputs=estado_inputs,
+    )
+    anteriores_button.click(
+        lambda account_id, page, vista: cambiar_pagina(account_id, page, 1, vista),
+        inputs=[cuenta_input, pagina, vista], outputs=estado_inputs,
+    )
     
-    demo.load(actualizar_estado, outputs=estado_inputs) # Cargar estado inicial
+    demo.load(actualizar_estado, inputs=[cuenta_input, pagina, vista], outputs=estado_inputs) # Cargar estado inicial
 
-demo.launch()
+if __name__ == "__main__":
+    demo.launch()
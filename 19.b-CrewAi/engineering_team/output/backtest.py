@@ -0,0 +1,143 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+TRADING_DAYS = 252
+
+
+class TargetWeights:
+    """
+    Strategy that trades every account towards a fixed share of its value in each symbol.
+
+    With ``every=None`` it only trades on the first step (buy and hold); otherwise it
+    rebalances every ``every`` steps. Target quantities are rounded down to whole shares.
+    """
+
+    def __init__(self, weights, every=None):
+        """
+        Args:
+            weights (array): Fraction of the value per symbol, shape (S,) or (N, S) for one row per account.
+            every (int): Steps between rebalances (default: only the first step).
+        """
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.every = every
+
+    def __call__(self, t, prices, cash, holdings):
+        if t and (self.every is None or t % self.every):
+            return np.zeros_like(holdings)
+        price = prices[-1]
+        value = cash + holdings @ price
+        target = np.floor(self.weights * value[:, None] / price).astype(np.int64)
+        return target - holdings
+
+
+def backtest(prices, strategy, initial_deposits):
+    """
+    Simulates many accounts trading over one price path.
+
+    At every step the strategy returns signed orders (positive buys, negative sells)
+    for all the accounts, and cash and holdings are updated for all of them at once.
+    The result is exactly that of calling, for every account and step, ``Account.sell``
+    for each negative order and then ``Account.buy`` for each positive one, in symbol
+    order, and skipping the calls that would raise InsufficientSharesError or
+    InsufficientFundsError.
+
+    Args:
+        prices (array): Price of every symbol at every step, shape (T, S).
+        strategy (function): strategy(t, prices[:t + 1], cash, holdings) -> orders, an (N, S) integer array.
+            It must not modify its arguments.
+        initial_deposits (array): Initial deposit of every account, shape (N,).
+
+    Returns:
+        dict: 'cash' (N,), 'holdings' (N, S), 'values' (T, N) portfolio value after every step,
+        'trades' (N,) executed orders and 'rejected' (N,) orders skipped for lack of cash or shares.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    steps, n_symbols = prices.shape
+    cash = np.array(initial_deposits, dtype=np.float64, ndmin=1)
+    holdings = np.zeros((len(cash), n_symbols), dtype=np.int64)
+    values = np.empty((steps, len(cash)))
+    trades = np.zeros(len(cash), dtype=np.int64)
+    rejected = np.zeros(len(cash), dtype=np.int64)
+
+    for t in range(steps):
+        price = prices[t]
+        orders = np.asarray(strategy(t, prices[:t + 1], cash, holdings), dtype=np.int64)
+        # Primero las ventas, que liberan efectivo, y después las compras, símbolo a símbolo
+        for s in range(n_symbols):
+            quantity = -orders[:, s]
+            sell = quantity > 0
+            ok = sell & (holdings[:, s] >= quantity)
+            cash[ok] += price[s] * quantity[ok]
+            holdings[ok, s] -= quantity[ok]
+            trades += ok
+            rejected += sell & ~ok
+        for s in range(n_symbols):
+            quantity = orders[:, s]
+            buy = quantity > 0
+            cost = price[s] * quantity
+            ok = buy & ~(cash < cost)
+            cash[ok] -= cost[ok]
+            holdings[ok, s] += quantity[ok]
+            trades += ok
+            rejected += buy & ~ok
+        values[t] = cash + holdings @ price
+
+    return {'cash': cash, 'holdings': holdings, 'values': values, 'trades': trades, 'rejected': rejected}
+
+
+def simulate_paths(initial_prices, drift, volatility, steps, n_paths, seed=None):
+    """
+    Simulates daily price paths with a geometric Brownian motion.
+
+    Args:
+        initial_prices (array): Price of every symbol at the first step, shape (S,).
+        drift (array | float): Annual drift of every symbol.
+        volatility (array | float): Annual volatility of every symbol.
+        steps (int): Steps per path, the first one included.
+        n_paths (int): Number of paths.
+        seed (int): Seed of the random generator, for reproducible runs.
+
+    Returns:
+        numpy.ndarray: The prices, shape (n_paths, steps, S).
+    """
+    initial_prices = np.asarray(initial_prices, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    dt = 1 / TRADING_DAYS
+    shocks = rng.standard_normal((n_paths, steps - 1, len(initial_prices)))
+    log_returns = (np.asarray(drift) - np.asarray(volatility) ** 2 / 2) * dt + np.asarray(volatility) * np.sqrt(dt) * shocks
+    paths = np.empty((n_paths, steps, len(initial_prices)))
+    paths[:, 0] = initial_prices
+    paths[:, 1:] = initial_prices * np.exp(np.cumsum(log_returns, axis=1))
+    return paths
+
+
+def _backtest_chunk(paths, strategy, initial_deposits):
+    return [backtest(path, strategy, initial_deposits) for path in paths]
+
+
+def backtest_paths(paths, strategy, initial_deposits, processes=None):
+    """
+    Runs the same accounts and strategy over many independent price paths in a process pool.
+
+    Args:
+        paths (array): Prices, shape (P, T, S).
+        strategy (function): As in backtest(); it must be picklable, e.g. a TargetWeights.
+        initial_deposits (array): Initial deposit of every account, shape (N,).
+        processes (int): Worker processes (default: one per CPU; 1 runs everything in this process).
+
+    Returns:
+        dict: The backtest() results stacked along a first axis of length P.
+    """
+    paths = np.asarray(paths, dtype=np.float64)
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(paths) == 1:
+        results = _backtest_chunk(paths, strategy, initial_deposits)
+    else:
+        # Un bloque contiguo de caminos por tarea, para repartir el coste de serializar
+        chunks = np.array_split(paths, min(len(paths), processes * 4))
+        with ProcessPoolExecutor(processes) as pool:
+            futures = [pool.submit(_backtest_chunk, chunk, strategy, initial_deposits) for chunk in chunks]
+            results = [result for future in futures for result in future.result()]
+    return {key: np.stack([result[key] for result in results]) for key in results[0]}
@@ -0,0 +1,198 @@
+"""
+Performance benchmark of the accounts module.
+
+Measures the throughput of the account operations, valuation with many holdings,
+memory per ledger entry and the state refresh of app.py, and compares the results
+with a saved JSON baseline:
+
+    python bench_accounts.py --save baseline.json
+    python bench_accounts.py --compare baseline.json --tolerance 0.15
+
+With ``--compare`` it exits with status 1 when a metric is worse than the baseline
+by more than the tolerance.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from accounts import Account, get_share_price, get_share_prices
+from ledger import Ledger
+from valuation import PriceSnapshot, mark_to_market
+
+
+def best_of(repeat, fn):
+    """Best wall time, in seconds, of ``repeat`` runs of ``fn``"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def metric(value, unit, higher_is_better):
+    return {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+
+def bench_operations(ops, repeat):
+    results = {}
+
+    def deposits():
+        account = Account("bench", 0.0)
+        for _ in range(ops):
+            account.deposit(1.0)
+
+    def withdrawals():
+        account = Account("bench", float(ops))
+        for _ in range(ops):
+            account.withdraw(1.0)
+
+    def buys():
+        account = Account("bench", 1e12)
+        for i in range(ops):
+            account.buy("AAPL" if i % 2 else "TSLA", 1, get_share_price)
+
+    account = Account("bench", 1e12)
+    for symbol in ("AAPL", "TSLA"):
+        account.buy(symbol, ops * repeat, get_share_price)
+
+    def sells():
+        for i in range(ops):
+            account.sell("AAPL" if i % 2 else "TSLA", 1, get_share_price)
+
+    for name, fn in (("deposit", deposits), ("withdraw", withdrawals), ("buy", buys), ("sell", sells)):
+        results[f"{name}_ops_s"] = metric(ops / best_of(repeat, fn), "ops/s", True)
+    return results
+
+
+def bench_valuation(holdings, repeat):
+    symbols = [f"S{i:05d}" for i in range(holdings)]
+    account = Account("bench", 1e12)
+    account.execute_batch([("buy", symbol, 1) for symbol in symbols], get_share_prices)
+    snapshot = PriceSnapshot.take(symbols, get_share_prices)
+    accounts = [account] * 100
+    return {
+        f"portfolio_value_{holdings}_holdings_ms": metric(
+            best_of(repeat, lambda: account.get_portfolio_value(get_share_price)) * 1000, "ms", False
+        ),
+        f"portfolio_value_{holdings}_holdings_snapshot_ms": metric(
+            best_of(repeat, lambda: account.get_portfolio_value(snapshot)) * 1000, "ms", False
+        ),
+        f"mark_to_market_100_accounts_{holdings}_holdings_ms": metric(
+            best_of(repeat, lambda: mark_to_market(accounts, get_share_prices)) * 1000, "ms", False
+        ),
+    }
+
+
+def bench_ledger_memory(entries):
+    symbols = [f"S{i}" for i in range(100)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    ledger = Ledger()
+    base = time.time_ns()
+    for i in range(entries):
+        ledger.append("buy", 100.0, symbols[i % 100], 1, 100.0, base + i)
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return {
+        "ledger_bytes_per_entry": metric(allocated / entries, "bytes", False),
+        "ledger_time_range_query_us": metric(
+            best_of(1000, lambda: ledger.between(base / 1e9 + 0.0001, base / 1e9 + 0.0002)) * 1e6, "us", False
+        ),
+        "ledger_symbol_query_us": metric(
+            best_of(1000, lambda: ledger.for_symbol("S7", base / 1e9 + 0.0001, base / 1e9 + 0.0002)) * 1e6,
+            "us",
+            False,
+        ),
+    }
+
+
+def bench_app_refresh(transactions, repeat):
+    try:
+        import gradio  # noqa: F401
+    except ImportError:
+        print("gradio is not installed: skipping the app.py refresh", file=sys.stderr)
+        return {}
+
+    # app.py abre al importarse la base de datos de ACCOUNTS_DB
+    os.environ["ACCOUNTS_DB"] = os.path.join(tempfile.mkdtemp(prefix="bench_accounts_"), "accounts.db")
+    import app
+
+    with app.service.locked("bench") as account:
+        account.deposit(1e9)
+        for i in range(transactions):
+            account.deposit(1.0)
+            if i % 10 == 0:
+                account.buy("AAPL", 1, get_share_price)
+    return {
+        f"app_refresh_{transactions}_transactions_ms": metric(
+            best_of(repeat, lambda: app.actualizar_estado("bench", 0, None)) * 1000, "ms", False
+        ),
+    }
+
+
+def run(args):
+    results = {}
+    results.update(bench_operations(args.ops, args.repeat))
+    results.update(bench_valuation(args.holdings, args.repeat))
+    results.update(bench_ledger_memory(args.entries))
+    results.update(bench_app_refresh(args.app_transactions, args.repeat))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Flags the metrics worse than the baseline by more than ``tolerance`` (a fraction).
+
+    Returns:
+        list: The names of the regressed metrics.
+    """
+    regressions = []
+    print(f"{'metric':52} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, current in results.items():
+        if name not in baseline:
+            print(f"{name:52} {'-':>12} {current['value']:>12.3f}      new")
+            continue
+        old = baseline[name]["value"]
+        change = (current["value"] - old) / old if old else 0.0
+        worse = -change if current["higher_is_better"] else change
+        flag = "  REGRESSION" if worse > tolerance else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:52} {old:>12.3f} {current['value']:>12.3f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def print_results(results):
+    for name, result in results.items():
+        print(f"{name:52} {result['value']:>12.3f} {result['unit']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the accounts module")
+    parser.add_argument("--ops", type=int, default=100_000, help="Operations per throughput run")
+    parser.add_argument("--holdings", type=int, default=10_000, help="Holdings of the valuation benchmark")
+    parser.add_argument("--entries", type=int, default=1_000_000, help="Ledger entries of the memory benchmark")
+    parser.add_argument("--app-transactions", type=int, default=100_000, help="History of the app.py refresh")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of every timing; the best one is kept")
+    parser.add_argument("--save", help="Write the results to this JSON baseline")
+    parser.add_argument("--compare", help="Compare the results with this JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+    else:
+        print_results(results)
@@ -0,0 +1,128 @@
+import numpy as np
+
+from ledger import format_ns, to_ns
+
+# Efecto de cada tipo de transacción (deposit, withdraw, buy, sell) sobre el saldo,
+# las acciones y los depósitos netos
+CASH_SIGN = np.array([1.0, -1.0, -1.0, 1.0])
+SHARES_SIGN = np.array([0, 0, 1, -1])
+DEPOSITS_SIGN = np.array([1.0, -1.0, 0.0, 0.0])
+# Filas del ledger entre dos snapshots: acota el coste de una consulta histórica
+CHECKPOINT_INTERVAL = 1024
+
+
+class Checkpoints:
+    """
+    Snapshots of an account's state every ``interval`` rows of its ledger.
+
+    Snapshot k is the balance, holdings and net deposits before row k * interval,
+    so the state at any point is the nearest earlier snapshot plus a vectorized
+    replay of at most ``interval`` rows.
+    """
+
+    def __init__(self, ledger, balance, holdings, net_deposits, interval=CHECKPOINT_INTERVAL):
+        """
+        Initializes the checkpoints of a ledger from its state before the first row.
+
+        Args:
+            ledger (Ledger): The transaction ledger of the account.
+            balance (float): Balance before the first row.
+            holdings (dict): {symbol: quantity} before the first row.
+            net_deposits (float): Net deposits before the first row.
+            interval (int): Rows between two snapshots.
+        """
+        self.ledger = ledger
+        self.interval = interval
+        self.states = [(balance, dict(holdings), net_deposits)]
+
+    @classmethod
+    def rebuild(cls, ledger, balance, holdings, net_deposits, interval=CHECKPOINT_INTERVAL):
+        """
+        Builds the checkpoints of an already filled ledger from the state after its last row.
+
+        Args:
+            ledger (Ledger): The transaction ledger of the account.
+            balance (float): Current balance.
+            holdings (dict): Current {symbol: quantity}.
+            net_deposits (float): Current net deposits.
+            interval (int): Rows between two snapshots.
+
+        Returns:
+            Checkpoints: The checkpoints.
+        """
+        # El estado inicial es el actual menos el efecto de todas las filas
+        cash, shares, deposits = cls._effect(ledger, 0, len(ledger))
+        start = dict(holdings)
+        for symbol, quantity in shares.items():
+            start[symbol] = start.get(symbol, 0) - quantity
+        checkpoints = cls(ledger, balance - cash, _nonzero(start), net_deposits - deposits, interval)
+        for first in range(0, len(ledger) - interval + 1, interval):
+            checkpoints.states.append(checkpoints._replay(checkpoints.states[-1], first, first + interval))
+        return checkpoints
+
+    def add_if_due(self, balance, holdings, net_deposits):
+        """
+        Takes a snapshot when the ledger has just reached a multiple of ``interval`` rows.
+
+        Returns:
+            bool: True if a snapshot was taken.
+        """
+        if len(self.ledger) != len(self.states) * self.interval:
+            return False
+        self.states.append((balance, dict(holdings), net_deposits))
+        return True
+
+    def state_at(self, when):
+        """
+        Returns the state of the account at a point of its ledger.
+
+        Args:
+            when (int | datetime | str | float): Number of rows applied, or an instant (every
+                transaction recorded at or before it is applied).
+
+        Returns:
+            dict: {'index', 'timestamp', 'balance', 'holdings', 'net_deposits'}.
+        """
+        if isinstance(when, (int, np.integer)):
+            index = int(when)
+            if not 0 <= index <= len(self.ledger):
+                raise IndexError("Ledger index out of range.")
+        else:
+            index = int(np.searchsorted(self.ledger.timestamps, to_ns(when), side='right'))
+        checkpoint = min(index // self.interval, len(self.states) - 1)
+        balance, holdings, net_deposits = self._replay(self.states[checkpoint], checkpoint * self.interval, index)
+        return {
+            'index': index,
+            'timestamp': format_ns(int(self.ledger.timestamps[index - 1])) if index else None,
+            'balance': balance,
+            'holdings': holdings,
+            'net_deposits': net_deposits,
+        }
+
+    def _replay(self, state, first, last):
+        balance, holdings, net_deposits = state
+        cash, shares, deposits = self._effect(self.ledger, first, last)
+        holdings = dict(holdings)
+        for symbol, quantity in shares.items():
+            holdings[symbol] = holdings.get(symbol, 0) + quantity
+        return balance + cash, _nonzero(holdings), net_deposits + deposits
+
+    @staticmethod
+    def _effect(ledger, first, last):
+        """Change of balance, holdings and net deposits caused by the rows [first, last)."""
+        types = ledger.types[first:last]
+        amounts = ledger.amounts[first:last]
+        cash = float(np.dot(CASH_SIGN[types], amounts))
+        deposits = float(np.dot(DEPOSITS_SIGN[types], amounts))
+        trades = SHARES_SIGN[types] != 0
+        per_symbol = np.bincount(
+            ledger.symbol_ids[first:last][trades],
+            weights=(SHARES_SIGN[types] * ledger.quantities[first:last])[trades],
+            minlength=len(ledger.symbols),
+        )
+        shares = {ledger.symbols[i]: int(quantity) for i, quantity in enumerate(per_symbol) if quantity}
+        return cash, shares, deposits
+
+
+def _nonzero(holdings):
+    return {symbol: quantity for symbol, quantity in holdings.items() if quantity}
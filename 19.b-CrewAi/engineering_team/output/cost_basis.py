@@ -0,0 +1,115 @@
+from collections import deque
+
+COST_METHODS = ('fifo', 'average')
+
+
+class CostBasis:
+    """
+    Lot tracking of an account, updated on every trade.
+
+    With 'fifo' every buy opens a lot and sells consume the oldest lots first; with
+    'average' the lots of a symbol are merged into one at the average cost. Both keep
+    the cost basis of the shares held and the realized P&L per symbol, so no figure
+    ever needs a pass over the transaction history.
+
+    Every lot carries a sequence number, increasing in the order the lots are opened,
+    so a storage backend can persist only the lots a trade touches.
+    """
+
+    def __init__(self, method='fifo'):
+        """
+        Initializes an empty cost basis.
+
+        Args:
+            method (str): 'fifo' or 'average'.
+        """
+        if method not in COST_METHODS:
+            raise ValueError(f"Unknown cost method: {method}.")
+        self.method = method
+        self.lots = {}  # {symbol: deque([[quantity, price, seq], ...])}, oldest first
+        self.cost = {}  # {symbol: cost basis of the shares held}
+        self.realized = {}  # {symbol: realized P&L}
+        self.realized_total = 0.0
+        self.next_seq = 0  # Número de secuencia del próximo lote
+
+    def buy(self, symbol, quantity, price):
+        """
+        Records a purchase.
+
+        Args:
+            symbol (str): The stock symbol.
+            quantity (int): The number of shares bought.
+            price (float): The price paid per share.
+        """
+        lots = self.lots.setdefault(symbol, deque())
+        cost = self.cost.get(symbol, 0.0) + quantity * price
+        if self.method == 'average' and lots:
+            held = lots[0][0] + quantity
+            lots[0] = [held, cost / held, lots[0][2]]
+        else:
+            lots.append([quantity, price, self.next_seq])
+            self.next_seq += 1
+        self.cost[symbol] = cost
+
+    def sell(self, symbol, quantity, price):
+        """
+        Records a sale, consuming lots in FIFO order (or at the average cost).
+
+        Args:
+            symbol (str): The stock symbol.
+            quantity (int): The number of shares sold; must not exceed the shares held.
+            price (float): The price received per share.
+
+        Returns:
+            float: The P&L realized by this sale.
+        """
+        lots = self.lots[symbol]
+        realized = 0.0
+        remaining = quantity
+        while remaining:
+            lot = lots[0]
+            taken = min(remaining, lot[0])
+            realized += (price - lot[1]) * taken
+            self.cost[symbol] -= lot[1] * taken
+            lot[0] -= taken
+            remaining -= taken
+            if not lot[0]:
+                lots.popleft()
+        if not lots:
+            # Sin acciones el coste es exactamente cero, sin restos de redondeo
+            del self.lots[symbol]
+            del self.cost[symbol]
+        self.realized[symbol] = self.realized.get(symbol, 0.0) + realized
+        self.realized_total += realized
+        return realized
+
+    def unrealized(self, symbol, quantity, price):
+        """
+        Returns the unrealized P&L of the shares held of a symbol.
+
+        Args:
+            symbol (str): The stock symbol.
+            quantity (int): The number of shares held.
+            price (float): The current price per share.
+
+        Returns:
+            float: Market value minus cost basis.
+        """
+        return quantity * price - self.cost.get(symbol, 0.0)
+
+    def restore(self, symbol, lots, realized=None):
+        """
+        Restores the persisted lots and realized P&L of a symbol.
+
+        Args:
+            symbol (str): The stock symbol.
+            lots (list): [[quantity, price, seq], ...], oldest first.
+            realized (float): The realized P&L of the symbol (None if it was never sold).
+        """
+        if lots:
+            self.lots[symbol] = deque([list(lot) for lot in lots])
+            self.cost[symbol] = sum(quantity * price for quantity, price, _ in lots)
+            self.next_seq = max(self.next_seq, lots[-1][2] + 1)
+        if realized is not None:
+            self.realized[symbol] = realized
+            self.realized_total += realized
@@ -0,0 +1,262 @@
+import time
+from collections.abc import Sequence
+from datetime import datetime
+
+import numpy as np
+
+TRANSACTION_TYPES = ('deposit', 'withdraw', 'buy', 'sell')
+TYPE_CODES = {name: code for code, name in enumerate(TRANSACTION_TYPES)}
+
+
+def to_ns(value):
+    """
+    Converts a point in time to nanoseconds since the epoch.
+
+    Args:
+        value (datetime | str | int | float): A datetime, an ISO 8601 string or seconds since the epoch.
+
+    Returns:
+        int: Nanoseconds since the epoch.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1_000_000) * 1000
+    return int(value * 1_000_000_000)
+
+
+def format_ns(ns):
+    """
+    Formats nanoseconds since the epoch as a local 'YYYY-MM-DD HH:MM:SS.mmm' string.
+    """
+    return datetime.fromtimestamp(ns / 1_000_000_000).isoformat(sep=' ', timespec='milliseconds')
+
+
+class _Column:
+    """
+    Growable typed array with amortized O(1) appends.
+    """
+    __slots__ = ('data', 'size')
+
+    def __init__(self, dtype, capacity=16):
+        self.data = np.empty(capacity, dtype=dtype)
+        self.size = 0
+
+    def append(self, value):
+        if self.size == len(self.data):
+            grown = np.empty(2 * len(self.data), dtype=self.data.dtype)
+            grown[:self.size] = self.data
+            self.data = grown
+        self.data[self.size] = value
+        self.size += 1
+
+    def view(self):
+        return self.data[:self.size]
+
+
+class Ledger(Sequence):
+    """
+    Append-only transaction history stored in typed columns.
+
+    Every row takes 37 bytes (timestamp, type, symbol id, quantity, price and amount)
+    plus 16 bytes in the index of its symbol, instead of a dictionary per transaction.
+    Timestamps never decrease, so time-range queries are binary searches over the
+    timestamp column, and per-symbol queries binary-search that symbol's own index.
+
+    Rows read as the transaction dictionaries the account has always returned.
+    """
+
+    def __init__(self, clock=time.time_ns):
+        """
+        Initializes an empty ledger.
+
+        Args:
+            clock (function): Returns the current time in nanoseconds since the epoch.
+        """
+        self._clock = clock
+        self._timestamps = _Column(np.int64)
+        self._types = _Column(np.int8)
+        self._symbol_ids = _Column(np.int32)
+        self._quantities = _Column(np.int64)
+        self._prices = _Column(np.float64)
+        self._amounts = _Column(np.float64)
+        self.symbols = []  # id -> symbol
+        self._symbol_id = {}  # symbol -> id
+        self._by_symbol = {}  # id -> (row positions, timestamps) of that symbol
+
+    def append(self, kind, amount, symbol=None, quantity=0, price=float('nan'), timestamp=None):
+        """
+        Records a transaction.
+
+        Args:
+            kind (str): 'deposit', 'withdraw', 'buy' or 'sell'.
+            amount (float): Cash moved by the transaction.
+            symbol (str): The stock symbol, for trades.
+            quantity (int): The number of shares, for trades.
+            price (float): The share price, for trades.
+            timestamp (int): Nanoseconds since the epoch (default: now).
+
+        Returns:
+            int: The position of the new row.
+
+        Raises:
+            ValueError: If the timestamp is earlier than the last recorded one.
+        """
+        last = self._timestamps.data[self._timestamps.size - 1] if self._timestamps.size else None
+        if timestamp is None:
+            timestamp = self.now()
+        elif last is not None and timestamp < last:
+            raise ValueError("Ledger timestamps must not decrease.")
+
+        row = self._timestamps.size
+        symbol_id = -1
+        if symbol is not None:
+            symbol_id = self._symbol_id.get(symbol)
+            if symbol_id is None:
+                symbol_id = self._symbol_id[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+                self._by_symbol[symbol_id] = (_Column(np.int64), _Column(np.int64))
+            rows, timestamps = self._by_symbol[symbol_id]
+            rows.append(row)
+            timestamps.append(timestamp)
+
+        self._timestamps.append(timestamp)
+        self._types.append(TYPE_CODES[kind])
+        self._symbol_ids.append(symbol_id)
+        self._quantities.append(quantity)
+        self._prices.append(price)
+        self._amounts.append(amount)
+        return row
+
+    def now(self):
+        """
+        Returns the current time, never earlier than the last recorded timestamp.
+
+        Returns:
+            int: Nanoseconds since the epoch.
+        """
+        # Reloj de pared, pero sin retroceder nunca para que la columna siga ordenada
+        timestamp = self._clock()
+        if self._timestamps.size:
+            timestamp = max(timestamp, int(self._timestamps.data[self._timestamps.size - 1]))
+        return timestamp
+
+    def __len__(self):
+        return self._timestamps.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Ledger index out of range.")
+        return self._row(index)
+
+    def _row(self, i):
+        kind = TRANSACTION_TYPES[self._types.data[i]]
+        row = {'type': kind}
+        if kind in ('buy', 'sell'):
+            row['symbol'] = self.symbols[self._symbol_ids.data[i]]
+            row['quantity'] = int(self._quantities.data[i])
+            row['price'] = float(self._prices.data[i])
+        row['amount'] = float(self._amounts.data[i])
+        row['timestamp'] = format_ns(int(self._timestamps.data[i]))
+        return row
+
+    def rows(self, positions):
+        """
+        Returns the transaction dictionaries at the given positions.
+
+        Args:
+            positions (Iterable[int]): Row positions, e.g. the result of a query.
+
+        Returns:
+            list: A list of transaction dictionaries.
+        """
+        return [self._row(int(i)) for i in positions]
+
+    def between(self, start=None, end=None):
+        """
+        Positions of the transactions recorded in [start, end), in O(log n).
+
+        Args:
+            start (datetime | str | float): First instant included (default: the beginning).
+            end (datetime | str | float): First instant excluded (default: the end).
+
+        Returns:
+            range: The row positions.
+        """
+        return range(*self._span(self.timestamps, start, end))
+
+    def for_symbol(self, symbol, start=None, end=None):
+        """
+        Positions of the trades of a symbol recorded in [start, end), in O(log n).
+
+        Args:
+            symbol (str): The stock symbol.
+            start (datetime | str | float): First instant included (default: the beginning).
+            end (datetime | str | float): First instant excluded (default: the end).
+
+        Returns:
+            numpy.ndarray: The row positions, in time order.
+        """
+        symbol_id = self._symbol_id.get(symbol)
+        if symbol_id is None:
+            return np.empty(0, dtype=np.int64)
+        rows, timestamps = self._by_symbol[symbol_id]
+        first, last = self._span(timestamps.view(), start, end)
+        return rows.view()[first:last]
+
+    @staticmethod
+    def _span(timestamps, start, end):
+        first = 0 if start is None else int(np.searchsorted(timestamps, to_ns(start), side='left'))
+        last = len(timestamps) if end is None else int(np.searchsorted(timestamps, to_ns(end), side='left'))
+        return first, max(first, last)
+
+    @property
+    def timestamps(self):
+        """numpy.ndarray: Nanoseconds since the epoch of every row (read-only view)."""
+        return self._readonly(self._timestamps)
+
+    @property
+    def types(self):
+        """numpy.ndarray: Type code of every row, an index into TRANSACTION_TYPES."""
+        return self._readonly(self._types)
+
+    @property
+    def symbol_ids(self):
+        """numpy.ndarray: Index into ``symbols`` of every row, -1 for cash movements."""
+        return self._readonly(self._symbol_ids)
+
+    @property
+    def quantities(self):
+        """numpy.ndarray: Shares of every row, 0 for cash movements."""
+        return self._readonly(self._quantities)
+
+    @property
+    def prices(self):
+        """numpy.ndarray: Share price of every row, NaN for cash movements."""
+        return self._readonly(self._prices)
+
+    @property
+    def amounts(self):
+        """numpy.ndarray: Cash moved by every row."""
+        return self._readonly(self._amounts)
+
+    @staticmethod
+    def _readonly(column):
+        view = column.view()
+        view.flags.writeable = False
+        return view
+
+    def nbytes(self):
+        """
+        Returns the memory used by the columns and indexes.
+
+        Returns:
+            int: Bytes allocated, including the spare capacity.
+        """
+        columns = (self._timestamps, self._types, self._symbol_ids, self._quantities, self._prices, self._amounts)
+        indexes = [column for pair in self._by_symbol.values() for column in pair]
+        return sum(column.data.nbytes for column in (*columns, *indexes))
@@ -0,0 +1,90 @@
+import threading
+from contextlib import contextmanager
+
+from accounts import Account
+from storage import AccountStorage
+
+
+class AccountService:
+    """
+    Shared registry of accounts that serializes the operations of each account.
+
+    Account methods check and then update the balance and holdings, so two threads
+    trading on the same account could overdraw it. Every operation here runs under
+    the lock of its account; operations on different accounts never wait for each
+    other, so throughput grows with the number of independent accounts.
+    """
+
+    def __init__(self, storage=None, initial_deposit=0.0):
+        """
+        Initializes an empty registry.
+
+        Args:
+            storage (AccountStorage): Backend that loads and persists the accounts (default: memory only).
+            initial_deposit (float): Initial deposit of the accounts created on first use.
+        """
+        self.storage = storage if storage is not None else AccountStorage()
+        self.initial_deposit = initial_deposit
+        self._accounts = {}  # account_id -> (Account, RLock)
+        self._registry_lock = threading.Lock()
+
+    def _entry(self, account_id):
+        entry = self._accounts.get(account_id)
+        if entry is None:
+            with self._registry_lock:
+                entry = self._accounts.get(account_id)
+                if entry is None:
+                    account = self.storage.load(account_id)
+                    if account is None:
+                        account = Account(account_id, self.initial_deposit, storage=self.storage)
+                    entry = self._accounts[account_id] = (account, threading.RLock())
+        return entry
+
+    @contextmanager
+    def locked(self, account_id):
+        """
+        Gives exclusive access to an account, loading or creating it on first use.
+
+        Args:
+            account_id (str): Unique identifier of the account.
+
+        Yields:
+            Account: The account, locked until the block ends.
+        """
+        account, lock = self._entry(account_id)
+        with lock:
+            yield account
+
+    def account_ids(self):
+        """
+        Returns the identifiers of the accounts loaded in the registry.
+
+        Returns:
+            list: The account identifiers, sorted.
+        """
+        return sorted(self._accounts)
+
+    def deposit(self, account_id, amount):
+        """Deposits funds into an account. See Account.deposit."""
+        with self.locked(account_id) as account:
+            account.deposit(amount)
+
+    def withdraw(self, account_id, amount):
+        """Withdraws funds from an account. See Account.withdraw."""
+        with self.locked(account_id) as account:
+            account.withdraw(amount)
+
+    def buy(self, account_id, symbol, quantity, get_share_price_func):
+        """Buys shares for an account. See Account.buy."""
+        with self.locked(account_id) as account:
+            account.buy(symbol, quantity, get_share_price_func)
+
+    def sell(self, account_id, symbol, quantity, get_share_price_func):
+        """Sells shares of an account. See Account.sell."""
+        with self.locked(account_id) as account:
+            account.sell(symbol, quantity, get_share_price_func)
+
+    def execute_batch(self, account_id, orders, get_share_prices_func):
+        """Executes several orders of an account atomically. See Account.execute_batch."""
+        with self.locked(account_id) as account:
+            return account.execute_batch(orders, get_share_prices_func)
@@ -0,0 +1,545 @@
+import atexit
+import itertools
+import json
+import logging
+import sqlite3
+import threading
+
+from checkpoints import CASH_SIGN, DEPOSITS_SIGN, SHARES_SIGN, Checkpoints
+from ledger import TRANSACTION_TYPES, TYPE_CODES, format_ns, to_ns
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    account_id TEXT PRIMARY KEY,
+    initial_deposit REAL NOT NULL,
+    balance REAL NOT NULL,
+    net_deposits REAL NOT NULL,
+    cost_method TEXT NOT NULL DEFAULT 'fifo'
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS holdings (
+    account_id TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    PRIMARY KEY (account_id, symbol)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS lots (
+    account_id TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    price REAL NOT NULL,
+    PRIMARY KEY (account_id, symbol, seq)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS realized (
+    account_id TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    realized REAL NOT NULL,
+    PRIMARY KEY (account_id, symbol)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    account_id TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    type INTEGER NOT NULL,
+    symbol TEXT,
+    quantity INTEGER NOT NULL,
+    price REAL,
+    amount REAL NOT NULL,
+    idx INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS transactions_account_ts ON transactions (account_id, ts);
+CREATE INDEX IF NOT EXISTS transactions_account_symbol_ts ON transactions (account_id, symbol, ts);
+CREATE INDEX IF NOT EXISTS transactions_account_idx ON transactions (account_id, idx);
+
+CREATE TABLE IF NOT EXISTS checkpoints (
+    account_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    balance REAL NOT NULL,
+    net_deposits REAL NOT NULL,
+    holdings TEXT NOT NULL,
+    PRIMARY KEY (account_id, idx)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS checkpoints_account_ts ON checkpoints (account_id, ts);
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def _apply_rows(state, rows):
+    """Applies (ts, type, symbol, quantity, amount) rows, oldest first, to a (balance, holdings, net_deposits) state."""
+    balance, holdings, net_deposits = state
+    holdings = dict(holdings)
+    for _, kind, symbol, quantity, amount in rows:
+        balance += CASH_SIGN[kind] * amount
+        net_deposits += DEPOSITS_SIGN[kind] * amount
+        if symbol is not None:
+            holdings[symbol] = holdings.get(symbol, 0) + int(SHARES_SIGN[kind]) * quantity
+    return float(balance), {symbol: quantity for symbol, quantity in holdings.items() if quantity}, float(net_deposits)
+
+
+def _transaction_dicts(rows):
+    result = []
+    for ts, kind, symbol, quantity, price, amount in rows:
+        transaction = {'type': TRANSACTION_TYPES[kind]}
+        if symbol is not None:
+            transaction.update(symbol=symbol, quantity=quantity, price=price)
+        transaction.update(amount=amount, timestamp=format_ns(ts))
+        result.append(transaction)
+    return result
+
+
+class AccountStorage:
+    """
+    Storage backend of an Account. This default one keeps nothing: the account lives only in memory.
+    """
+
+    def create(self, account):
+        """Registers a new account."""
+
+    def record(self, account, kind, amount, symbol, quantity, price, timestamp):
+        """Persists a transaction that has just been applied to the account."""
+
+    def record_batch(self, account, records):
+        """Persists several transactions that must be stored all together or not at all."""
+        for record in records:
+            self.record(account, *record)
+
+    def record_checkpoint(self, account, index, timestamp):
+        """Persists the current state of the account as the state after its first ``index`` transactions."""
+
+    def load(self, account_id, recent=None):
+        """Returns the stored account, or None if it does not exist."""
+        return None
+
+    def transactions(self, account_id, start=None, end=None, symbol=None, include_end=False):
+        """Returns the stored transaction dictionaries of an account."""
+        return []
+
+    def transaction_range(self, account_id, first, last):
+        """Returns the stored transaction dictionaries at positions [first, last) of an account's history."""
+        return []
+
+    def state_at(self, account_id, index=None, end=None):
+        """Returns the stored state of an account after ``index`` transactions or at the instant ``end``."""
+        raise NotImplementedError("This storage keeps no transaction history.")
+
+    def flush(self):
+        """Makes every pending write durable."""
+
+    def close(self):
+        """Flushes and releases the backend."""
+
+
+class SQLiteStorage(AccountStorage):
+    """
+    Stores many accounts in a SQLite database in WAL mode.
+
+    Writes are queued and group-committed by a background thread: one transaction
+    every ``commit_interval`` seconds, or as soon as ``commit_batch`` writes are
+    pending, so a trade never waits for a disk sync. Balances and holdings are kept
+    in their own tables, so loading an account reads them plus only its most recent
+    transactions; older ones are queried from the database on demand.
+
+    If a group commit fails (e.g. the database is locked by another process for
+    longer than the busy timeout), its writes go back to the front of the queue and
+    are retried with the next one. The background thread logs the error and keeps
+    it in ``last_error``; an explicit ``flush()`` or ``close()`` raises it.
+    """
+
+    def __init__(self, path, commit_interval=0.05, commit_batch=1000, recent=1000):
+        """
+        Opens (and creates if needed) the database.
+
+        Args:
+            path (str): Path of the database file.
+            commit_interval (float): Maximum seconds a write waits to be committed.
+            commit_batch (int): Pending writes that trigger a commit right away.
+            recent (int): Transactions loaded into memory with every account.
+        """
+        self.path = str(path)
+        self.commit_interval = commit_interval
+        self.commit_batch = commit_batch
+        self.recent = recent
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Con WAL, NORMAL solo sincroniza en los checkpoints y sigue siendo consistente ante caídas
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._db_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._new_accounts = {}  # account_id -> (initial_deposit, balance, net_deposits, cost_method)
+        self._new_transactions = []
+        self._balances = {}  # account_id -> (balance, net_deposits)
+        self._holdings = {}  # (account_id, symbol) -> quantity
+        self._lots = {}  # (account_id, symbol, seq) -> (quantity, price)
+        self._lot_floors = {}  # (account_id, symbol) -> seq of the oldest open lot
+        self._realized = {}  # (account_id, symbol) -> realized
+        self._queued_seq = {}  # (account_id, symbol) -> seq of the newest lot queued
+        self._checkpoints = {}  # (account_id, idx) -> (ts, balance, net_deposits, holdings)
+        self._wake = threading.Event()
+        self._closed = False
+        self.last_error = None
+        self._flusher = threading.Thread(target=self._run, name="sqlite-group-commit", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def create(self, account):
+        with self._pending_lock:
+            self._new_accounts[account.account_id] = (
+                account.initial_deposit, account.balance, account.net_deposits, account.cost_basis.method
+            )
+        self._wake.set()
+
+    def _enqueue(self, account, index, kind, amount, symbol, quantity, price, timestamp):
+        self._new_transactions.append(
+            (account.account_id, index, timestamp, TYPE_CODES[kind], symbol, quantity, price, amount)
+        )
+        # Del saldo y las tenencias basta con guardar el último valor de cada grupo
+        self._balances[account.account_id] = (account.balance, account.net_deposits)
+        if symbol is None:
+            return
+        key = (account.account_id, symbol)
+        self._holdings[key] = account.holdings.get(symbol, 0)
+        # Solo los lotes que toca la operación: el coste no crece con el número de lotes abiertos
+        lots = account.cost_basis.lots.get(symbol, ())
+        if kind == 'buy':
+            # El último lote es el abierto o, con coste medio, el actualizado; en un bloque de
+            # órdenes puede haber otros lotes nuevos que aún no se han encolado
+            queued = self._queued_seq.get(key, -1)
+            for i, lot in enumerate(reversed(lots)):
+                if i and lot[2] <= queued:
+                    break
+                self._lots[(*key, lot[2])] = (lot[0], lot[1])
+            self._queued_seq[key] = lots[-1][2]
+        else:
+            # La venta cierra los lotes más antiguos y puede dejar a medias el primero que queda
+            self._lot_floors[key] = lots[0][2] if lots else account.cost_basis.next_seq
+            if lots:
+                self._lots[(*key, lots[0][2])] = (lots[0][0], lots[0][1])
+            self._realized[key] = account.cost_basis.realized[symbol]
+
+    def record(self, account, kind, amount, symbol, quantity, price, timestamp):
+        with self._pending_lock:
+            self._enqueue(account, account.history_offset + len(account.transactions) - 1,
+                          kind, amount, symbol, quantity, price, timestamp)
+            pending = len(self._new_transactions)
+        if pending >= self.commit_batch:
+            self._wake.set()
+
+    def record_batch(self, account, records):
+        # Se encolan bajo un único lock para que ningún group commit los separe
+        first = account.history_offset + len(account.transactions) - len(records)
+        with self._pending_lock:
+            for index, record in enumerate(records, first):
+                self._enqueue(account, index, *record)
+            pending = len(self._new_transactions)
+        if pending >= self.commit_batch:
+            self._wake.set()
+
+    def record_checkpoint(self, account, index, timestamp):
+        with self._pending_lock:
+            self._checkpoints[(account.account_id, index)] = (
+                timestamp, account.balance, account.net_deposits, json.dumps(account.holdings)
+            )
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.commit_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("SQLite group commit failed; its writes stay queued for the next one")
+
+    def flush(self):
+        # Los lotes se toman y escriben bajo el mismo lock para que se confirmen en orden
+        with self._db_lock:
+            with self._pending_lock:
+                accounts, self._new_accounts = self._new_accounts, {}
+                transactions, self._new_transactions = self._new_transactions, []
+                balances, self._balances = self._balances, {}
+                holdings, self._holdings = self._holdings, {}
+                lots, self._lots = self._lots, {}
+                lot_floors, self._lot_floors = self._lot_floors, {}
+                realized, self._realized = self._realized, {}
+                checkpoints, self._checkpoints = self._checkpoints, {}
+            if not (accounts or transactions or balances or holdings or lots or lot_floors or realized or checkpoints):
+                return
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO accounts (account_id, initial_deposit, balance, net_deposits, cost_method)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    [(account_id, *values) for account_id, values in accounts.items()],
+                )
+                self._conn.executemany(
+                    "INSERT INTO transactions (account_id, idx, ts, type, symbol, quantity, price, amount)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    transactions,
+                )
+                self._conn.executemany(
+                    "UPDATE accounts SET balance = ?, net_deposits = ? WHERE account_id = ?",
+                    [(*values, account_id) for account_id, values in balances.items()],
+                )
+                # Primero los lotes y luego los cerrados: un lote abierto y cerrado en el mismo grupo se borra
+                self._conn.executemany(
+                    "INSERT INTO lots (account_id, symbol, seq, quantity, price) VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT (account_id, symbol, seq) DO UPDATE SET"
+                    " quantity = excluded.quantity, price = excluded.price",
+                    [(*key, *lot) for key, lot in lots.items()],
+                )
+                self._conn.executemany(
+                    "DELETE FROM lots WHERE account_id = ? AND symbol = ? AND seq < ?",
+                    [(*key, seq) for key, seq in lot_floors.items()],
+                )
+                self._conn.executemany(
+                    "INSERT INTO realized (account_id, symbol, realized) VALUES (?, ?, ?)"
+                    " ON CONFLICT (account_id, symbol) DO UPDATE SET realized = excluded.realized",
+                    [(*key, value) for key, value in realized.items()],
+                )
+                self._conn.executemany(
+                    "INSERT INTO holdings (account_id, symbol, quantity) VALUES (?, ?, ?)"
+                    " ON CONFLICT (account_id, symbol) DO UPDATE SET quantity = excluded.quantity",
+                    [(account_id, symbol, quantity) for (account_id, symbol), quantity in holdings.items() if quantity],
+                )
+                self._conn.executemany(
+                    "DELETE FROM holdings WHERE account_id = ? AND symbol = ?",
+                    [key for key, quantity in holdings.items() if not quantity],
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO checkpoints (account_id, idx, ts, balance, net_deposits, holdings)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    [(*key, *state) for key, state in checkpoints.items()],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException as exc:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                # El grupo vuelve delante de lo encolado mientras tanto: los valores más nuevos prevalecen
+                with self._pending_lock:
+                    self._new_accounts = {**accounts, **self._new_accounts}
+                    self._new_transactions = transactions + self._new_transactions
+                    self._balances = {**balances, **self._balances}
+                    self._holdings = {**holdings, **self._holdings}
+                    self._lots = {**lots, **self._lots}
+                    self._lot_floors = {**lot_floors, **self._lot_floors}
+                    self._realized = {**realized, **self._realized}
+                    self._checkpoints = {**checkpoints, **self._checkpoints}
+                self.last_error = exc
+                raise
+            self.last_error = None
+
+    def load(self, account_id, recent=None):
+        """
+        Loads an account with its balance, holdings and most recent transactions.
+
+        Args:
+            account_id (str): Unique identifier of the account.
+            recent (int): Transactions loaded into memory (default: the storage's ``recent``).
+
+        Returns:
+            Account: The account, or None if it does not exist.
+        """
+        from accounts import Account
+
+        self.flush()
+        recent = self.recent if recent is None else recent
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT initial_deposit, balance, net_deposits, cost_method FROM accounts WHERE account_id = ?",
+                (account_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            holdings = self._conn.execute(
+                "SELECT symbol, quantity FROM holdings WHERE account_id = ?", (account_id,)
+            ).fetchall()
+            lots = self._conn.execute(
+                "SELECT symbol, quantity, price, seq FROM lots WHERE account_id = ? ORDER BY symbol, seq",
+                (account_id,),
+            ).fetchall()
+            realized = dict(self._conn.execute(
+                "SELECT symbol, realized FROM realized WHERE account_id = ?", (account_id,)
+            ).fetchall())
+            transactions = self._conn.execute(
+                "SELECT ts, type, symbol, quantity, price, amount, idx FROM transactions"
+                " WHERE account_id = ? ORDER BY id DESC LIMIT ?",
+                (account_id, recent),
+            ).fetchall()
+            # Posición tras la última transacción guardada, aunque no se cargue ninguna
+            total = self._conn.execute(
+                "SELECT COALESCE(MAX(idx) + 1, 0) FROM transactions WHERE account_id = ?", (account_id,)
+            ).fetchone()[0]
+            # Instantáneas de transacciones que no llegaron a guardarse
+            self._conn.execute("DELETE FROM checkpoints WHERE account_id = ? AND idx > ?", (account_id, total))
+
+        account = Account(account_id, row[0], cost_method=row[3])
+        account.balance = row[1]
+        account.holdings = dict(holdings)
+        account.net_deposits = row[2]
+        lots = {symbol: [row[1:] for row in rows] for symbol, rows in itertools.groupby(lots, lambda row: row[0])}
+        for symbol in lots.keys() | realized.keys():
+            account.cost_basis.restore(symbol, lots.get(symbol, []), realized.get(symbol))
+            if symbol in lots:
+                self._queued_seq[(account_id, symbol)] = lots[symbol][-1][2]
+        account.history_offset = total - len(transactions)
+        for ts, kind, symbol, quantity, price, amount, _ in reversed(transactions):
+            account.transactions.append(
+                TRANSACTION_TYPES[kind], amount, symbol, quantity, float('nan') if price is None else price, ts
+            )
+        account.checkpoints = Checkpoints.rebuild(
+            account.transactions, account.balance, account.holdings, account.net_deposits
+        )
+        account.storage = self
+        return account
+
+    def open_account(self, account_id, initial_deposit=0.0, recent=None):
+        """
+        Loads an account, creating it first if it does not exist.
+
+        Args:
+            account_id (str): Unique identifier of the account.
+            initial_deposit (float): Initial deposit of a new account.
+            recent (int): Transactions loaded into memory.
+
+        Returns:
+            Account: The account, backed by this storage.
+        """
+        from accounts import Account
+
+        account = self.load(account_id, recent)
+        if account is None:
+            account = Account(account_id, initial_deposit, storage=self)
+        return account
+
+    def account_ids(self):
+        """
+        Returns the identifiers of every stored account.
+
+        Returns:
+            list: The account identifiers, sorted.
+        """
+        self.flush()
+        with self._db_lock:
+            return [row[0] for row in self._conn.execute("SELECT account_id FROM accounts ORDER BY account_id")]
+
+    def transactions(self, account_id, start=None, end=None, symbol=None, include_end=False):
+        """
+        Reads transactions of an account from the database through its indexes.
+
+        Args:
+            account_id (str): Unique identifier of the account.
+            start (datetime | str | float): Only transactions from this instant on.
+            end (datetime | str | float): Only transactions before this instant.
+            symbol (str): Only the trades of this stock symbol.
+            include_end (bool): Also return the transactions recorded exactly at ``end``.
+
+        Returns:
+            list: The transaction dictionaries, oldest first.
+        """
+        query = "SELECT ts, type, symbol, quantity, price, amount FROM transactions WHERE account_id = ?"
+        params = [account_id]
+        if symbol is not None:
+            query += " AND symbol = ?"
+            params.append(symbol)
+        if start is not None:
+            query += " AND ts >= ?"
+            params.append(to_ns(start))
+        if end is not None:
+            query += " AND ts <= ?" if include_end else " AND ts < ?"
+            params.append(to_ns(end))
+        self.flush()
+        with self._db_lock:
+            rows = self._conn.execute(query + " ORDER BY id", params).fetchall()
+        return _transaction_dicts(rows)
+
+    def transaction_range(self, account_id, first, last):
+        """
+        Reads the transactions at positions [first, last) of an account's history, seeking by position.
+
+        Returns:
+            list: The transaction dictionaries, oldest first.
+        """
+        self.flush()
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT ts, type, symbol, quantity, price, amount FROM transactions"
+                " WHERE account_id = ? AND idx >= ? AND idx < ? ORDER BY idx",
+                (account_id, first, last),
+            ).fetchall()
+        return _transaction_dicts(rows)
+
+    def state_at(self, account_id, index=None, end=None):
+        """
+        Replays the stored history of an account from its nearest checkpoint.
+
+        Args:
+            account_id (str): Unique identifier of the account.
+            index (int): Number of transactions applied.
+            end (datetime | str | float): Or an instant: every transaction recorded at or before it is applied.
+
+        Returns:
+            dict: {'index', 'timestamp', 'balance', 'holdings', 'net_deposits'}.
+        """
+        self.flush()
+        columns = "SELECT idx, ts, balance, holdings, net_deposits FROM checkpoints WHERE account_id = ?"
+        with self._db_lock:
+            initial_deposit = self._conn.execute(
+                "SELECT initial_deposit FROM accounts WHERE account_id = ?", (account_id,)
+            ).fetchone()[0]
+            if index is not None:
+                checkpoint = self._conn.execute(
+                    columns + " AND idx <= ? ORDER BY idx DESC LIMIT 1", (account_id, index)
+                ).fetchone()
+                last, bound = index, ()
+            else:
+                end = to_ns(end)
+                checkpoint = self._conn.execute(
+                    columns + " AND ts <= ? ORDER BY ts DESC, idx DESC LIMIT 1", (account_id, end)
+                ).fetchone()
+                following = self._conn.execute(
+                    "SELECT idx FROM checkpoints WHERE account_id = ? AND idx > ? ORDER BY idx LIMIT 1",
+                    (account_id, checkpoint[0] if checkpoint else 0),
+                ).fetchone()
+                # Las transacciones van en orden de tiempo: ninguna posterior a la siguiente instantánea cuenta
+                last, bound = following[0] if following else 2 ** 62, (end,)
+            first = checkpoint[0] if checkpoint else 0
+            rows = self._conn.execute(
+                "SELECT ts, type, symbol, quantity, amount FROM transactions"
+                " WHERE account_id = ? AND idx >= ? AND idx < ?" + " AND ts <= ?" * len(bound) + " ORDER BY idx",
+                (account_id, first, last, *bound),
+            ).fetchall()
+
+        if checkpoint is None:
+            state, timestamp = (initial_deposit, {}, initial_deposit), None
+        else:
+            state, timestamp = (checkpoint[2], json.loads(checkpoint[3]), checkpoint[4]), checkpoint[1]
+        balance, holdings, net_deposits = _apply_rows(state, rows)
+        if rows:
+            timestamp = rows[-1][0]
+        return {
+            'index': first + len(rows),
+            'timestamp': format_ns(timestamp) if timestamp is not None else None,
+            'balance': balance,
+            'holdings': holdings,
+            'net_deposits': net_deposits,
+        }
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        # Si no, atexit mantendría viva la instancia hasta el final del proceso
+        atexit.unregister(self.close)
+        self._wake.set()
+        self._flusher.join()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
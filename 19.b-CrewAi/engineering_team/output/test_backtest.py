@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+
+from accounts import Account, InsufficientFundsError, InsufficientSharesError
+from backtest import TargetWeights, backtest, simulate_paths
+
+
+def scalar_backtest(prices, orders, initial_deposits):
+    # Lo mismo que backtest(), operación a operación con Account
+    accounts = [Account(f"acc{i}", float(deposit)) for i, deposit in enumerate(initial_deposits)]
+    trades = [0] * len(accounts)
+    rejected = [0] * len(accounts)
+    symbols = [f"S{s}" for s in range(prices.shape[1])]
+    for t in range(len(prices)):
+        price = dict(zip(symbols, prices[t]))
+        for i, account in enumerate(accounts):
+            sells = [(s, -int(q)) for s, q in zip(symbols, orders[t, i]) if q < 0]
+            buys = [(s, int(q)) for s, q in zip(symbols, orders[t, i]) if q > 0]
+            for method, symbol_orders in ((account.sell, sells), (account.buy, buys)):
+                for symbol, quantity in symbol_orders:
+                    try:
+                        method(symbol, quantity, price.get)
+                        trades[i] += 1
+                    except (InsufficientFundsError, InsufficientSharesError):
+                        rejected[i] += 1
+    return accounts, symbols, trades, rejected
+
+
+class TestBacktest(unittest.TestCase):
+
+    def test_matches_account_buy_and_sell(self):
+        rng = np.random.default_rng(7)
+        steps, n_accounts, n_symbols = 40, 25, 4
+        prices = simulate_paths(rng.uniform(20, 300, n_symbols), 0.05, 0.4, steps, 1, seed=7)[0]
+        # Órdenes aleatorias grandes para que haya rechazos por falta de efectivo y de acciones
+        orders = rng.integers(-15, 16, (steps, n_accounts, n_symbols))
+        deposits = rng.uniform(500, 5000, n_accounts)
+
+        result = backtest(prices, lambda t, prices, cash, holdings: orders[t], deposits)
+        accounts, symbols, trades, rejected = scalar_backtest(prices, orders, deposits)
+
+        self.assertGreater(result['rejected'].sum(), 0)
+        for i, account in enumerate(accounts):
+            self.assertEqual(result['cash'][i], account.get_balance())
+            self.assertEqual({s: int(q) for s, q in zip(symbols, result['holdings'][i]) if q}, account.get_holdings())
+            self.assertEqual(result['trades'][i], trades[i])
+            self.assertEqual(result['rejected'][i], rejected[i])
+
+    def test_target_weights_buy_and_hold(self):
+        prices = np.array([[100.0, 50.0], [110.0, 40.0]])
+        result = backtest(prices, TargetWeights([0.5, 0.5]), [1000.0])
+        np.testing.assert_array_equal(result['holdings'], [[5, 10]])
+        np.testing.assert_allclose(result['values'][:, 0], [1000.0, 950.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from accounts import Account
+from checkpoints import CHECKPOINT_INTERVAL, Checkpoints
+from ledger import Ledger, format_ns
+from storage import SQLiteStorage
+
+BOUNDARIES = [0, 1, CHECKPOINT_INTERVAL - 1, CHECKPOINT_INTERVAL, CHECKPOINT_INTERVAL + 1,
+              2 * CHECKPOINT_INTERVAL - 1, 2 * CHECKPOINT_INTERVAL, 2 * CHECKPOINT_INTERVAL + 1]
+
+
+def trade(account, steps):
+    # Precios enteros para que los saldos sean exactos sea cual sea el orden de la suma
+    states = [(account.get_balance(), dict(account.get_holdings()), account.get_net_deposits())]
+    for i in range(steps):
+        symbol = ('AAPL', 'TSLA', 'MSFT')[i % 3]
+        if i % 7 == 6:
+            account.deposit(50.0)
+        elif i % 5 == 4 and account.holdings.get(symbol):
+            account.sell(symbol, 1, lambda symbol: float(100 + i % 13))
+        else:
+            account.buy(symbol, 1 + i % 3, lambda symbol: float(90 + i % 11))
+        states.append((account.get_balance(), dict(account.get_holdings()), account.get_net_deposits()))
+    return states
+
+
+class TestCheckpoints(unittest.TestCase):
+
+    def test_state_at_checkpoint_boundaries(self):
+        account = Account('test_account', 1e6)
+        states = trade(account, 2 * CHECKPOINT_INTERVAL + 5)
+        self.assertEqual(len(account.checkpoints.states), 3)
+        for index in BOUNDARIES:
+            with self.subTest(index=index):
+                state = account.state_at(index)
+                self.assertEqual(state['index'], index)
+                self.assertEqual((state['balance'], state['holdings'], state['net_deposits']), states[index])
+
+    def test_rebuild_matches_incremental(self):
+        account = Account('test_account', 1e6)
+        trade(account, 2 * CHECKPOINT_INTERVAL + 5)
+        rebuilt = Checkpoints.rebuild(account.transactions, account.balance, account.holdings, account.net_deposits)
+        self.assertEqual(rebuilt.states, account.checkpoints.states)
+
+    def test_state_at_instant(self):
+        ledger = Ledger(clock=lambda: 0)
+        checkpoints = Checkpoints(ledger, 100.0, {}, 100.0, interval=2)
+        balance = 100.0
+        for second in range(1, 6):
+            balance += 10.0
+            ledger.append('deposit', 10.0, timestamp=second * 1_000_000_000)
+            checkpoints.add_if_due(balance, {}, balance)
+        self.assertEqual(len(checkpoints.states), 3)
+        # Las transacciones del instante exacto se aplican
+        state = checkpoints.state_at(4)
+        self.assertEqual((state['index'], state['balance']), (4, 140.0))
+        self.assertEqual(state['timestamp'], format_ns(4_000_000_000))
+        self.assertEqual(checkpoints.state_at(3.5)['balance'], 130.0)
+        self.assertEqual(checkpoints.state_at(0.5), {
+            'index': 0, 'timestamp': None, 'balance': 100.0, 'holdings': {}, 'net_deposits': 100.0,
+        })
+        with self.assertRaises(IndexError):
+            checkpoints.state_at(6)
+
+
+class TestStoredCheckpoints(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "accounts.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_state_at_boundaries_after_reload(self):
+        storage = SQLiteStorage(self.path)
+        states = trade(Account('test_account', 1e6, storage=storage), 2 * CHECKPOINT_INTERVAL + 5)
+        storage.close()
+
+        storage = SQLiteStorage(self.path, recent=3)
+        try:
+            account = storage.load('test_account')
+            self.assertTrue(account.history_truncated)
+            for index in BOUNDARIES + [len(states) - 1]:
+                with self.subTest(index=index):
+                    state = account.state_at(index)
+                    self.assertEqual(state['index'], index)
+                    self.assertEqual((state['balance'], state['holdings'], state['net_deposits']), states[index])
+        finally:
+            storage.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+
+from accounts import Account
+from cost_basis import CostBasis
+
+
+def prices(price):
+    return lambda symbol: price
+
+
+class TestCostBasis(unittest.TestCase):
+
+    def test_fifo_sells_the_oldest_lots_first(self):
+        basis = CostBasis('fifo')
+        basis.buy('AAPL', 10, 100.0)
+        basis.buy('AAPL', 10, 120.0)
+        self.assertEqual(basis.sell('AAPL', 15, 130.0), 10 * 30.0 + 5 * 10.0)
+        self.assertEqual([list(lot) for lot in basis.lots['AAPL']], [[5, 120.0, 1]])
+        self.assertEqual(basis.cost['AAPL'], 600.0)
+        self.assertEqual(basis.unrealized('AAPL', 5, 110.0), -50.0)
+
+    def test_average_merges_lots(self):
+        basis = CostBasis('average')
+        basis.buy('AAPL', 10, 100.0)
+        basis.buy('AAPL', 10, 120.0)
+        self.assertEqual([list(lot) for lot in basis.lots['AAPL']], [[20, 110.0, 0]])
+        self.assertEqual(basis.sell('AAPL', 15, 130.0), 15 * 20.0)
+        self.assertEqual(basis.cost['AAPL'], 550.0)
+        self.assertEqual(basis.unrealized('AAPL', 5, 110.0), 0.0)
+
+    def test_selling_everything_clears_the_cost(self):
+        for method in ('fifo', 'average'):
+            with self.subTest(method=method):
+                basis = CostBasis(method)
+                basis.buy('AAPL', 3, 0.1)
+                basis.buy('AAPL', 7, 0.2)
+                basis.sell('AAPL', 10, 0.3)
+                self.assertNotIn('AAPL', basis.lots)
+                self.assertNotIn('AAPL', basis.cost)
+                self.assertAlmostEqual(basis.realized['AAPL'], 1.3)
+                self.assertEqual(basis.unrealized('AAPL', 0, 0.3), 0.0)
+
+    def test_sequence_numbers_survive_restore(self):
+        basis = CostBasis('fifo')
+        for price in (10.0, 11.0, 12.0):
+            basis.buy('AAPL', 1, price)
+        basis.sell('AAPL', 1, 15.0)
+        restored = CostBasis('fifo')
+        restored.restore('AAPL', basis.lots['AAPL'], basis.realized['AAPL'])
+        restored.restore('TSLA', [], 7.0)
+        self.assertEqual(restored.next_seq, 3)
+        self.assertEqual(restored.cost, basis.cost)
+        self.assertEqual(restored.realized_total, 5.0 + 7.0)
+        restored.buy('AAPL', 1, 13.0)
+        self.assertEqual(restored.lots['AAPL'][-1], [1, 13.0, 3])
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            CostBasis('lifo')
+
+
+class TestAccountProfitLoss(unittest.TestCase):
+
+    def trade(self, method):
+        account = Account('test_account', 10000.0, cost_method=method)
+        account.buy('AAPL', 10, prices(100.0))
+        account.buy('AAPL', 10, prices(120.0))
+        account.buy('TSLA', 5, prices(200.0))
+        account.sell('AAPL', 15, prices(130.0))
+        return account
+
+    def test_fifo(self):
+        account = self.trade('fifo')
+        self.assertEqual(account.get_realized_profit_loss(), 350.0)
+        self.assertEqual(account.get_unrealized_profit_loss(prices(110.0)), -50.0 + 5 * -90.0)
+        self.assertEqual(account.get_profit_loss_by_symbol(prices(110.0)), {
+            'AAPL': {'quantity': 5, 'cost_basis': 600.0, 'realized': 350.0, 'unrealized': -50.0},
+            'TSLA': {'quantity': 5, 'cost_basis': 1000.0, 'realized': 0.0, 'unrealized': -450.0},
+        })
+
+    def test_average(self):
+        account = self.trade('average')
+        self.assertEqual(account.get_realized_profit_loss(), 300.0)
+        self.assertEqual(account.get_unrealized_profit_loss(prices(110.0)), 0.0 + 5 * -90.0)
+
+    def test_realized_plus_unrealized_is_total_profit_loss(self):
+        for method in ('fifo', 'average'):
+            with self.subTest(method=method):
+                account = self.trade(method)
+                account.sell('TSLA', 5, prices(210.0))
+                self.assertAlmostEqual(
+                    account.get_realized_profit_loss() + account.get_unrealized_profit_loss(prices(140.0)),
+                    account.get_profit_loss(prices(140.0)),
+                )
+                self.assertEqual(account.get_profit_loss_by_symbol(prices(140.0))['TSLA']['quantity'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from accounts import Account, InsufficientFundsError, InsufficientSharesError, get_share_prices
+from storage import SQLiteStorage
+
+
+class TestExecuteBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.storage = SQLiteStorage(os.path.join(self.directory, "accounts.db"))
+        self.account = Account("test_account", 1000.0, storage=self.storage)
+        self.account.buy("AAPL", 3, lambda symbol: 170.0)
+        self.account.buy("TSLA", 1, lambda symbol: 250.0)
+
+    def tearDown(self):
+        self.storage.close()
+        shutil.rmtree(self.directory)
+
+    def snapshot(self):
+        # Estado en memoria y en la base de datos
+        account = self.account
+        self.storage.flush()
+        stored = self.storage.load(account.account_id)
+        return (
+            account.get_balance(),
+            dict(account.get_holdings()),
+            len(account.transactions),
+            {symbol: [list(lot) for lot in lots] for symbol, lots in account.cost_basis.lots.items()},
+            account.get_realized_profit_loss(),
+            stored.get_balance(),
+            stored.get_holdings(),
+            len(self.storage.transactions(account.account_id)),
+        )
+
+    def test_executes_sells_before_buys(self):
+        # La compra solo se puede pagar con lo que deja la venta
+        transactions = self.account.execute_batch(
+            [('buy', 'MSFT', 7), {'type': 'sell', 'symbol': 'AAPL', 'quantity': 3}], get_share_prices
+        )
+        self.assertEqual([t['type'] for t in transactions], ['sell', 'buy'])
+        self.assertEqual(transactions[0]['timestamp'], transactions[1]['timestamp'])
+        self.assertEqual(self.account.get_holdings(), {'TSLA': 1, 'MSFT': 7})
+        self.assertEqual(self.account.get_balance(), 1000.0 - 510.0 - 250.0 + 510.0 - 700.0)
+        self.assertEqual(self.snapshot()[5:7], (50.0, {'TSLA': 1, 'MSFT': 7}))
+
+    def test_failing_buy_after_sells_changes_nothing(self):
+        before = self.snapshot()
+        orders = [('sell', 'AAPL', 3), ('sell', 'TSLA', 1), ('buy', 'GOOGL', 1)]
+        with self.assertRaises(InsufficientFundsError):
+            self.account.execute_batch(orders, get_share_prices)
+        self.assertEqual(self.snapshot(), before)
+
+    def test_overselling_changes_nothing(self):
+        before = self.snapshot()
+        with self.assertRaises(InsufficientSharesError):
+            self.account.execute_batch([('sell', 'AAPL', 2), ('sell', 'AAPL', 2)], get_share_prices)
+        self.assertEqual(self.snapshot(), before)
+
+    def test_malformed_orders_raise_value_error(self):
+        before = self.snapshot()
+        malformed = [
+            {'type': 'buy', 'symbol': 'AAPL'},
+            {'symbol': 'AAPL', 'quantity': 1},
+            {'type': 'buy', 'quantity': 1},
+            ('buy', 'AAPL'),
+            'buy AAPL 1',
+            ('hold', 'AAPL', 1),
+            ('buy', None, 1),
+            ('buy', 'AAPL', 0),
+            ('buy', 'AAPL', 1.5),
+        ]
+        for order in malformed:
+            with self.subTest(order=order), self.assertRaises(ValueError):
+                self.account.execute_batch([('sell', 'AAPL', 1), order], get_share_prices)
+        self.assertEqual(self.snapshot(), before)
+
+    def test_accepts_whole_float_quantities(self):
+        self.account.execute_batch([('sell', 'AAPL', 3.0), ('buy', 'MSFT', np.float64(2))], get_share_prices)
+        self.account.buy('MSFT', np.float32(1), lambda symbol: 100.0)
+        self.assertEqual(self.account.get_holdings(), {'TSLA': 1, 'MSFT': 3})
+        self.assertEqual(self.snapshot()[6], {'TSLA': 1, 'MSFT': 3})
+
+
+if __name__ == '__main__':
+    unittest.main()
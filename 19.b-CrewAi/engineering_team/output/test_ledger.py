@@ -0,0 +1,76 @@
+import unittest
+
+import numpy as np
+
+from ledger import Ledger, format_ns, to_ns
+
+SECOND = 1_000_000_000
+
+
+class TestLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.ledger = Ledger()
+        self.ledger.append('deposit', 1000.0, timestamp=10 * SECOND)
+        self.ledger.append('buy', 300.0, 'AAPL', 2, 150.0, timestamp=20 * SECOND)
+        self.ledger.append('buy', 250.0, 'TSLA', 1, 250.0, timestamp=20 * SECOND)
+        self.ledger.append('sell', 160.0, 'AAPL', 1, 160.0, timestamp=30 * SECOND)
+        self.ledger.append('withdraw', 100.0, timestamp=40 * SECOND)
+
+    def test_rows_read_as_transaction_dictionaries(self):
+        self.assertEqual(len(self.ledger), 5)
+        self.assertEqual(self.ledger[0], {'type': 'deposit', 'amount': 1000.0, 'timestamp': format_ns(10 * SECOND)})
+        self.assertEqual(self.ledger[-2], {
+            'type': 'sell', 'symbol': 'AAPL', 'quantity': 1, 'price': 160.0, 'amount': 160.0,
+            'timestamp': format_ns(30 * SECOND),
+        })
+        self.assertEqual([row['type'] for row in self.ledger[1:3]], ['buy', 'buy'])
+        with self.assertRaises(IndexError):
+            self.ledger[5]
+
+    def test_columns(self):
+        np.testing.assert_array_equal(self.ledger.quantities, [0, 2, 1, 1, 0])
+        np.testing.assert_array_equal(self.ledger.symbol_ids, [-1, 0, 1, 0, -1])
+        self.assertEqual(self.ledger.symbols, ['AAPL', 'TSLA'])
+        self.assertTrue(np.isnan(self.ledger.prices[0]))
+        with self.assertRaises(ValueError):
+            self.ledger.amounts[0] = 0.0
+
+    def test_grows_past_initial_capacity(self):
+        ledger = Ledger()
+        for i in range(100):
+            ledger.append('buy', float(i), 'AAPL', i + 1, 1.0, timestamp=i)
+        self.assertEqual(len(ledger), 100)
+        np.testing.assert_array_equal(ledger.quantities, np.arange(1, 101))
+        np.testing.assert_array_equal(ledger.for_symbol('AAPL'), np.arange(100))
+
+    def test_time_range_queries(self):
+        self.assertEqual(self.ledger.between(), range(0, 5))
+        self.assertEqual(self.ledger.between(20, 30), range(1, 3))
+        self.assertEqual(self.ledger.between(start=25), range(3, 5))
+        self.assertEqual(self.ledger.between(end=20), range(0, 1))
+        self.assertEqual(self.ledger.between(35, 20), range(4, 4))
+
+    def test_symbol_queries(self):
+        np.testing.assert_array_equal(self.ledger.for_symbol('AAPL'), [1, 3])
+        np.testing.assert_array_equal(self.ledger.for_symbol('AAPL', start=25), [3])
+        np.testing.assert_array_equal(self.ledger.for_symbol('TSLA', end=20), [])
+        self.assertEqual(len(self.ledger.for_symbol('MSFT')), 0)
+
+    def test_timestamps_never_decrease(self):
+        with self.assertRaises(ValueError):
+            self.ledger.append('deposit', 1.0, timestamp=39 * SECOND)
+        # Un reloj que retrocede no desordena la columna
+        ledger = Ledger(clock=iter([5 * SECOND, 3 * SECOND]).__next__)
+        ledger.append('deposit', 1.0)
+        ledger.append('deposit', 1.0)
+        np.testing.assert_array_equal(ledger.timestamps, [5 * SECOND, 5 * SECOND])
+
+    def test_to_ns(self):
+        instant = format_ns(20 * SECOND)
+        self.assertEqual(to_ns(instant), 20 * SECOND)
+        self.assertEqual(to_ns(1.5), 1_500_000_000)
+
+
+if __name__ == '__main__':
+    unittest.main()
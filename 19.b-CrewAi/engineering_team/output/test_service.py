@@ -0,0 +1,95 @@
+import threading
+import time
+import unittest
+
+from accounts import InsufficientFundsError, InsufficientSharesError
+from service import AccountService
+
+
+def slow_price(symbol):
+    # Cede el hilo entre la comprobación de las acciones y la venta
+    time.sleep(0.001)
+    return 100.0
+
+
+class TestAccountService(unittest.TestCase):
+
+    def setUp(self):
+        self.service = AccountService(initial_deposit=1000.0)
+
+    def run_threads(self, target, count):
+        errors = []
+
+        def run():
+            try:
+                target()
+            except (InsufficientFundsError, InsufficientSharesError):
+                errors.append(None)
+
+        threads = [threading.Thread(target=run) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return len(errors)
+
+    def test_concurrent_buys_cannot_overdraw(self):
+        results, threads = [], []
+
+        def other_buy():
+            try:
+                self.service.buy('acc', 'AAPL', 1, lambda symbol: 100.0)
+                results.append('bought')
+            except InsufficientFundsError:
+                results.append('rejected')
+
+        def price(symbol):
+            # Entre consultar el precio y comprar, otra compra de la misma cuenta tiene que esperar
+            other = threading.Thread(target=other_buy)
+            other.start()
+            other.join(0.05)
+            self.assertEqual(results, [])
+            threads.append(other)
+            return 100.0
+
+        self.service.buy('acc', 'AAPL', 10, price)
+        threads[0].join()
+        self.assertEqual(results, ['rejected'])
+        with self.service.locked('acc') as account:
+            self.assertEqual(account.get_balance(), 0.0)
+            self.assertEqual(account.get_holdings(), {'AAPL': 10})
+
+    def test_concurrent_sells_cannot_oversell(self):
+        self.service.buy('acc', 'AAPL', 10, lambda symbol: 100.0)
+        rejected = self.run_threads(lambda: self.service.sell('acc', 'AAPL', 1, slow_price), 25)
+        with self.service.locked('acc') as account:
+            self.assertEqual(account.get_holdings(), {})
+            self.assertEqual(account.get_balance(), 1000.0)
+            self.assertEqual(len(account.transactions), 11)
+        self.assertEqual(rejected, 15)
+
+    def test_accounts_do_not_wait_for_each_other(self):
+        other_done = threading.Event()
+
+        def waiting_price(symbol):
+            # Solo termina si la compra de la otra cuenta no espera a esta
+            self.assertTrue(other_done.wait(5))
+            return 100.0
+
+        thread = threading.Thread(target=self.service.buy, args=('first', 'AAPL', 1, waiting_price))
+        thread.start()
+        self.service.buy('second', 'AAPL', 1, lambda symbol: 100.0)
+        other_done.set()
+        thread.join()
+        self.assertEqual(self.service.account_ids(), ['first', 'second'])
+
+    def test_same_account_object_for_every_caller(self):
+        self.service.deposit('acc', 50.0)
+        self.service.withdraw('acc', 20.0)
+        with self.service.locked('acc') as account, self.service.locked('acc') as again:
+            self.assertIs(account, again)
+            self.assertEqual(account.get_balance(), 1030.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+import weakref
+
+from accounts import Account
+from storage import SQLiteStorage
+
+
+def price(symbol):
+    return 10.0
+
+
+def trade(account, steps, seed):
+    # Operaciones aleatorias que dejan lotes abiertos y beneficio realizado
+    rng = random.Random(seed)
+    for _ in range(steps):
+        symbol = rng.choice(['AAPL', 'TSLA'])
+        held = account.holdings.get(symbol, 0)
+        price = round(rng.uniform(50, 150), 2)
+        if held and rng.random() < 0.4:
+            account.sell(symbol, rng.randint(1, held), lambda symbol: price)
+        elif rng.random() < 0.05:
+            account.deposit(100.0)
+        else:
+            account.buy(symbol, rng.randint(1, 5), lambda symbol: price)
+
+
+def state(account):
+    return (
+        account.get_balance(),
+        account.get_holdings(),
+        account.get_net_deposits(),
+        {symbol: [list(lot) for lot in lots] for symbol, lots in account.cost_basis.lots.items()},
+        account.cost_basis.realized,
+        account.get_transaction_count(),
+    )
+
+
+class TestSQLiteStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "accounts.db")
+        self.storage = SQLiteStorage(self.path)
+
+    def tearDown(self):
+        self.storage.close()
+        shutil.rmtree(self.directory)
+
+    def test_load_without_recent_transactions_keeps_numbering(self):
+        account = Account("acc", 100000.0, storage=self.storage)
+        for _ in range(1500):
+            account.buy("AAPL", 1, price)
+        expected = account.state_at(1200)
+        self.storage.flush()
+
+        reloaded = self.storage.load("acc", recent=0)
+        self.assertEqual(reloaded.history_offset, 1500)
+        self.assertEqual(reloaded.get_transaction_count(), 1500)
+        reloaded.sell("AAPL", 1, price)
+        self.storage.flush()
+
+        indexes = [row[0] for row in self.storage._conn.execute(
+            "SELECT idx FROM transactions WHERE account_id = 'acc' ORDER BY id"
+        )]
+        self.assertEqual(indexes, list(range(1501)))
+        self.assertEqual(reloaded.state_at(1200), expected)
+        self.assertEqual(reloaded.state_at(1501)['holdings'], {'AAPL': 1499})
+        self.assertEqual([t['type'] for t in reloaded.get_transaction_range(1499, 1501)], ['buy', 'sell'])
+
+    def assertStateEqual(self, first, second):
+        # Los saldos reconstruidos desde la base de datos suman en otro orden
+        self.assertAlmostEqual(first.pop('balance'), second.pop('balance'), places=6)
+        self.assertEqual(first, second)
+
+    def stored_rows(self, table):
+        connection = sqlite3.connect(self.path)
+        try:
+            return connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        finally:
+            connection.close()
+
+    def test_reload_matches_the_account(self):
+        for method in ('fifo', 'average'):
+            with self.subTest(method=method):
+                account = Account(method, 1e6, storage=self.storage, cost_method=method)
+                trade(account, 3000, seed=len(method))
+                self.storage.close()
+                self.storage = SQLiteStorage(self.path, recent=100)
+
+                reloaded = self.storage.load(method)
+                self.assertEqual(state(reloaded), state(account))
+                self.assertEqual(len(reloaded.transactions), 100)
+                self.assertEqual(list(reloaded.get_transactions()), list(account.get_transactions()))
+                self.assertEqual(reloaded.get_transaction_range(990, 1010), account.get_transaction_range(990, 1010))
+                for index in (0, 1, 1023, 1024, 2500, 3000):
+                    self.assertStateEqual(reloaded.state_at(index), account.state_at(index))
+
+                # Sigue operando igual después de recargar
+                trade(account, 200, seed=99)
+                trade(reloaded, 200, seed=99)
+                self.assertEqual(state(reloaded)[:5], state(account)[:5])
+
+    def test_group_commit(self):
+        Account("acc", 1000.0, storage=self.storage)
+        self.storage.close()
+        self.storage = SQLiteStorage(self.path, commit_interval=3600, commit_batch=50)
+        account = self.storage.load("acc")
+        for _ in range(10):
+            account.deposit(1.0)
+        # Nada llega a la base de datos hasta el siguiente group commit
+        self.assertEqual(self.stored_rows("transactions"), 0)
+        self.storage.flush()
+        self.assertEqual(self.stored_rows("transactions"), 10)
+
+        # commit_batch escrituras pendientes despiertan al hilo sin esperar a commit_interval
+        for _ in range(50):
+            account.deposit(1.0)
+        deadline = time.monotonic() + 5
+        while self.stored_rows("transactions") < 60 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.stored_rows("transactions"), 60)
+
+    def test_failed_commit_is_requeued(self):
+        self.storage.close()
+        self.storage = SQLiteStorage(self.path, commit_interval=3600)
+        self.storage._conn.execute("PRAGMA busy_timeout = 50")
+        account = Account("acc", 1000.0, storage=self.storage)
+        self.storage.flush()
+
+        other = sqlite3.connect(self.path, isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+        account.buy("AAPL", 3, price)
+        account.deposit(10.0)
+        account.sell("AAPL", 1, price)
+        with self.assertRaises(sqlite3.OperationalError):
+            self.storage.flush()
+        self.assertIsInstance(self.storage.last_error, sqlite3.OperationalError)
+        account.buy("TSLA", 1, price)
+        other.execute("COMMIT")
+        other.close()
+
+        self.storage.flush()
+        self.assertEqual(self.stored_rows("transactions"), 4)
+        self.storage.close()
+        self.storage = SQLiteStorage(self.path)
+        self.assertEqual(state(self.storage.load("acc")), state(account))
+
+    def test_closed_storage_can_be_collected(self):
+        storage = SQLiteStorage(os.path.join(self.directory, "other.db"))
+        storage.close()
+        reference = weakref.ref(storage)
+        del storage
+        self.assertIsNone(reference())
+
+
+if __name__ == '__main__':
+    unittest.main()
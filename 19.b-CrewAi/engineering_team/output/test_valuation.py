@@ -0,0 +1,72 @@
+import unittest
+
+import numpy as np
+
+from accounts import Account
+from valuation import PriceSnapshot, as_batch, holdings_matrix, mark_to_market
+
+PRICES = {'AAPL': 170.0, 'TSLA': 250.0, 'MSFT': 100.0}
+
+
+class CountingProvider:
+    """Batch price provider that records every call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, symbols):
+        self.calls.append(list(symbols))
+        return {symbol: PRICES[symbol] for symbol in symbols}
+
+
+class TestPriceSnapshot(unittest.TestCase):
+
+    def test_fetches_each_symbol_once(self):
+        provider = CountingProvider()
+        snapshot = PriceSnapshot.take(['TSLA', 'AAPL', 'TSLA'], provider)
+        self.assertEqual(provider.calls, [['AAPL', 'TSLA']])
+        self.assertEqual(snapshot('AAPL'), 170.0)
+        np.testing.assert_array_equal(snapshot.vector(['TSLA', 'AAPL']), [250.0, 170.0])
+        with self.assertRaises(KeyError):
+            snapshot('MSFT')
+
+    def test_no_symbols_no_fetch(self):
+        provider = CountingProvider()
+        self.assertEqual(PriceSnapshot.take([], provider).prices, {})
+        self.assertEqual(provider.calls, [])
+
+    def test_as_batch(self):
+        self.assertEqual(as_batch(PRICES.get)(['AAPL', 'MSFT']), {'AAPL': 170.0, 'MSFT': 100.0})
+
+
+class TestMarkToMarket(unittest.TestCase):
+
+    def setUp(self):
+        self.accounts = [Account(f"acc{i}", 10000.0) for i in range(3)]
+        self.accounts[0].buy('AAPL', 10, PRICES.get)
+        self.accounts[1].buy('TSLA', 4, PRICES.get)
+        self.accounts[1].buy('AAPL', 1, PRICES.get)
+        self.accounts[2].deposit(500.0)
+
+    def test_holdings_matrix(self):
+        matrix, symbols = holdings_matrix(self.accounts)
+        self.assertEqual(symbols, ['AAPL', 'TSLA'])
+        np.testing.assert_array_equal(matrix, [[10, 0], [1, 4], [0, 0]])
+
+    def test_matches_account_valuation(self):
+        provider = CountingProvider()
+        values, profit_loss = mark_to_market(self.accounts, provider)
+        self.assertEqual(provider.calls, [['AAPL', 'TSLA']])
+        np.testing.assert_allclose(values, [a.get_portfolio_value(PRICES.get) for a in self.accounts])
+        np.testing.assert_allclose(profit_loss, [a.get_profit_loss(PRICES.get) for a in self.accounts])
+
+    def test_snapshot_values_accounts_against_one_fetch(self):
+        provider = CountingProvider()
+        snapshot = PriceSnapshot.take({s for a in self.accounts for s in a.get_holdings()}, provider)
+        values = [account.get_portfolio_value(snapshot) for account in self.accounts]
+        self.assertEqual(len(provider.calls), 1)
+        self.assertEqual(values, [10000.0, 10000.0, 10500.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
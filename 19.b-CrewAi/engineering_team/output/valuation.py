@@ -0,0 +1,101 @@
+import numpy as np
+
+
+def as_batch(get_share_price_func):
+    """
+    Adapts a single-symbol price function to the batch price-provider interface.
+
+    A batch provider takes an iterable of symbols and returns a dictionary {symbol: price}.
+
+    Args:
+        get_share_price_func (function): A function that retrieves the current price of a share.
+
+    Returns:
+        function: The batch price provider.
+    """
+    def get_share_prices(symbols):
+        return {symbol: get_share_price_func(symbol) for symbol in symbols}
+
+    return get_share_prices
+
+
+class PriceSnapshot:
+    """
+    Prices of a set of symbols fetched once with a batch provider.
+
+    A snapshot is callable like a get_share_price_func, so it can be passed to every
+    Account method to value a whole refresh against one fetch per symbol.
+    """
+
+    def __init__(self, prices):
+        """
+        Initializes a snapshot from already fetched prices.
+
+        Args:
+            prices (dict): {symbol: price}.
+        """
+        self.prices = dict(prices)
+
+    @classmethod
+    def take(cls, symbols, get_share_prices_func):
+        """
+        Fetches the prices of the given symbols in a single batch.
+
+        Args:
+            symbols (Iterable[str]): The stock symbols.
+            get_share_prices_func (function): A batch price provider.
+
+        Returns:
+            PriceSnapshot: The snapshot.
+        """
+        symbols = sorted(set(symbols))
+        return cls(get_share_prices_func(symbols) if symbols else {})
+
+    def __call__(self, symbol):
+        return self.prices[symbol]
+
+    def vector(self, symbols):
+        """
+        Returns the prices of the given symbols as an array, in the same order.
+        """
+        return np.fromiter((self.prices[symbol] for symbol in symbols), dtype=np.float64, count=len(symbols))
+
+
+def holdings_matrix(accounts):
+    """
+    Builds the matrix of holdings of many accounts.
+
+    Args:
+        accounts (list): Account objects.
+
+    Returns:
+        tuple: (matrix, symbols) where matrix[i, j] is the quantity of symbols[j] held by accounts[i].
+    """
+    symbols = sorted({symbol for account in accounts for symbol in account.holdings})
+    column = {symbol: j for j, symbol in enumerate(symbols)}
+    matrix = np.zeros((len(accounts), len(symbols)), dtype=np.float64)
+    for i, account in enumerate(accounts):
+        for symbol, quantity in account.holdings.items():
+            matrix[i, column[symbol]] = quantity
+    return matrix, symbols
+
+
+def mark_to_market(accounts, get_share_prices_func):
+    """
+    Values many accounts at once against one price vector.
+
+    Every symbol held by any of the accounts is priced once, in a single batch.
+
+    Args:
+        accounts (list): Account objects.
+        get_share_prices_func (function): A batch price provider.
+
+    Returns:
+        tuple: (values, profit_loss) arrays, in the order of ``accounts``.
+    """
+    matrix, symbols = holdings_matrix(accounts)
+    prices = PriceSnapshot.take(symbols, get_share_prices_func).vector(symbols)
+    balances = np.fromiter((account.balance for account in accounts), dtype=np.float64, count=len(accounts))
+    deposits = np.fromiter((account.net_deposits for account in accounts), dtype=np.float64, count=len(accounts))
+    values = balances + matrix @ prices
+    return values, values - deposits
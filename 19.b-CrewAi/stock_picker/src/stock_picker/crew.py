@@ -9,23 +9,15 @@ from crewai.memory import LongTermMemory, ShortTermMemory, EntityMemory
 from crewai.memory.storage.rag_storage import RAGStorage
 from crewai.memory.storage.ltm_sqlite_storage import LTMSQLiteStorage
 
-from chromadb import EmbeddingFunction
-
-class MyCohereEmbedder(EmbeddingFunction):
-    def __init__(self, api_key, model):
-        import cohere
-        self.client = cohere.Client(api_key)
-        self.model = model
-
-    def __call__(self, texts):
-        response = self.client.embed(
-            texts=texts,
-            model=self.model,
-            input_type="search_document",
-            embedding_types=["float"]
-        )
-        # Aquí extraes solo los embeddings
-        return response.embeddings  # O response["embeddings"] según SDK
+from .embedder import EmbeddingCache, LocalEmbedder, MyCohereEmbedder
+
+
+def build_embedder():
+    """ Embedder compartido por las memorias; STOCK_PICKER_EMBEDDER=local usa el sustituto sin red """
+    if os.environ.get("STOCK_PICKER_EMBEDDER") == "local":
+        return LocalEmbedder()
+    return MyCohereEmbedder(os.environ.get("COHERE_API_KEY"), 'embed-multilingual-v3.0',
+                            cache=EmbeddingCache("./memory/embeddings_cache.db"))
 
 
 class TrendingCompany(BaseModel):
@@ -94,6 +86,9 @@ class StockPicker():
     def crew(self) -> Crew:
         """Crea el equipo StockPicker"""
 
+        # Una sola instancia para las dos memorias: comparten la caché y no se repiten embeddings
+        embedder = build_embedder()
+
         manager = Agent(
             config=self.agents_config['manager'],
             allow_delegation=True
@@ -119,7 +114,7 @@ class StockPicker():
                         embedder_config = {
                             "provider": "custom",
                             "config": {
-                                "embedder": MyCohereEmbedder(os.environ.get("COHERE_API_KEY"), 'embed-multilingual-v3.0')
+                                "embedder": embedder
                             }
                         },
                         # embedder_config={
@@ -139,7 +134,7 @@ class StockPicker():
                     embedder_config = {
                             "provider": "custom",
                             "config": {
-                                "embedder": MyCohereEmbedder(os.environ.get("COHERE_API_KEY"), 'embed-multilingual-v3.0')
+                                "embedder": embedder
                             }
                     },
                     # embedder_config={
@@ -0,0 +1,149 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+import numpy as np
+from chromadb import EmbeddingFunction
+
+# Máximo de textos por llamada a embed que admite Cohere
+COHERE_BATCH_SIZE = 96
+
+
+class EmbeddingCache:
+    """ Caché persistente de embeddings en SQLite, indexada por el hash del contenido """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn.commit()
+
+    @staticmethod
+    def key(model, input_type, text):
+        """ Hash del modelo, el tipo de entrada y el texto: el mismo texto con otro modelo es otra entrada """
+        return hashlib.sha256(f"{model}\0{input_type}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys):
+        """ Devuelve {key: vector} con las claves que ya están en la caché """
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            # SQLite limita el número de parámetros de una consulta
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                )
+                found.update((key, np.frombuffer(vector, dtype=np.float32)) for key, vector in rows)
+        return found
+
+    def put_many(self, vectors):
+        """ Guarda {key: vector} en una sola transacción """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in vectors.items()],
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class MyCohereEmbedder(EmbeddingFunction):
+    """
+    Adaptador de Cohere para las memorias RAG de CrewAI.
+
+    Elimina los textos repetidos, busca el resto en la caché y envía los que faltan
+    en lotes del tamaño máximo de Cohere, varios a la vez y con reintentos.
+    """
+
+    def __init__(self, api_key, model, cache=None, input_type="search_document",
+                 batch_size=COHERE_BATCH_SIZE, max_workers=4, max_retries=3, backoff=1.0):
+        import cohere
+        self.client = cohere.Client(api_key)
+        self.model = model
+        self.cache = cache
+        self.input_type = input_type
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def __call__(self, texts):
+        texts = list(texts)
+        keys = [EmbeddingCache.key(self.model, self.input_type, text) for text in texts]
+        unique = dict(zip(keys, texts))
+        vectors = self.cache.get_many(unique) if self.cache is not None else {}
+
+        missing = [key for key in unique if key not in vectors]
+        if missing:
+            batches = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+            with ThreadPoolExecutor(min(self.max_workers, len(batches))) as pool:
+                results = pool.map(self._embed_batch, [[unique[key] for key in batch] for batch in batches])
+                new = {}
+                for batch, embeddings in zip(batches, results):
+                    new.update(zip(batch, np.asarray(embeddings, dtype=np.float32)))
+            if self.cache is not None:
+                self.cache.put_many(new)
+            vectors.update(new)
+
+        return [vectors[key] for key in keys]
+
+    def _embed_batch(self, texts):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._embed(texts)
+            except Exception as exc:
+                if attempt == self.max_retries or not _is_transient(exc):
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+
+    def _embed(self, texts):
+        response = self.client.embed(
+            texts=texts,
+            model=self.model,
+            input_type=self.input_type,
+            embedding_types=["float"]
+        )
+        # Con embedding_types el SDK devuelve los vectores agrupados por tipo
+        embeddings = response.embeddings
+        return getattr(embeddings, "float_", None) or getattr(embeddings, "float", None) or embeddings
+
+
+def _is_transient(exc):
+    """ Solo merece la pena reintentar los límites de uso, los timeouts y los errores 5xx """
+    status = getattr(exc, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(exc, (httpx.TimeoutException, httpx.NetworkError, TimeoutError, ConnectionError))
+
+
+class LocalEmbedder(EmbeddingFunction):
+    """
+    Sustituto local y determinista de Cohere para ejecutar sin red ni clave de API.
+
+    Cada palabra suma +-1 en una dimensión elegida por su hash, así que textos que
+    comparten palabras quedan cerca; el mismo texto da siempre el mismo vector.
+    """
+
+    def __init__(self, dimensions=1024):
+        self.dimensions = dimensions
+
+    def __call__(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def _embed(self, text):
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for word in re.findall(r"\w+", text.lower()):
+            digest = int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+            vector[digest % self.dimensions] += 1.0 if digest >> 63 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
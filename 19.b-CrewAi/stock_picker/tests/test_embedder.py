@@ -0,0 +1,177 @@
+import sys
+import tempfile
+import threading
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import httpx
+import numpy as np
+
+from stock_picker.embedder import COHERE_BATCH_SIZE, EmbeddingCache, LocalEmbedder, MyCohereEmbedder, _is_transient
+
+
+class ApiError(Exception):
+    """Error with an HTTP status, like the ones raised by the Cohere SDK."""
+
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FakeCohereClient:
+    """Stand-in for cohere.Client: embeds with LocalEmbedder and records every call."""
+
+    def __init__(self, api_key):
+        self.calls = []
+        self.errors = []  # errores que lanzarán las próximas llamadas, en orden
+        self._lock = threading.Lock()
+        self._local = LocalEmbedder()
+
+    def embed(self, texts, model, input_type, embedding_types):
+        with self._lock:
+            self.calls.append(list(texts))
+            if self.errors:
+                raise self.errors.pop(0)
+        return types.SimpleNamespace(embeddings=types.SimpleNamespace(float_=self._local(texts)))
+
+
+def cohere_embedder(**kwargs):
+    with mock.patch.dict(sys.modules, {"cohere": types.SimpleNamespace(Client=FakeCohereClient)}):
+        return MyCohereEmbedder("key", "embed-multilingual-v3.0", backoff=0, **kwargs)
+
+
+class TestEmbeddingCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / "nested" / "embeddings.db"
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip_and_persistence(self):
+        cache = EmbeddingCache(self.path)
+        vectors = {EmbeddingCache.key("m", "search_document", str(i)): np.full(4, i, dtype=np.float32) for i in range(1200)}
+        cache.put_many(vectors)
+        cache.close()
+
+        cache = EmbeddingCache(self.path)
+        found = cache.get_many(list(vectors) + ["missing"])
+        cache.close()
+        self.assertEqual(found.keys(), vectors.keys())
+        for key, vector in vectors.items():
+            np.testing.assert_array_equal(found[key], vector)
+
+    def test_key_depends_on_model_input_type_and_text(self):
+        keys = {
+            EmbeddingCache.key("m", "search_document", "text"),
+            EmbeddingCache.key("other", "search_document", "text"),
+            EmbeddingCache.key("m", "search_query", "text"),
+            EmbeddingCache.key("m", "search_document", "text "),
+        }
+        self.assertEqual(len(keys), 4)
+        self.assertEqual(EmbeddingCache.key("m", "q", "text"), EmbeddingCache.key("m", "q", "text"))
+
+
+class TestMyCohereEmbedder(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = EmbeddingCache(Path(self.directory.name) / "embeddings.db")
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def test_cached_texts_are_not_sent_again(self):
+        embedder = cohere_embedder(cache=self.cache)
+        first = embedder(["Apple earnings", "Tesla deliveries"])
+        again = embedder(["Tesla deliveries", "Apple earnings", "Nvidia guidance"])
+        self.assertEqual(embedder.client.calls, [["Apple earnings", "Tesla deliveries"], ["Nvidia guidance"]])
+        np.testing.assert_array_equal(again[0], first[1])
+        np.testing.assert_array_equal(again[1], first[0])
+
+        # Otra instancia con la misma caché no llama a Cohere
+        other = cohere_embedder(cache=self.cache)
+        other(["Apple earnings", "Nvidia guidance"])
+        self.assertEqual(other.client.calls, [])
+
+    def test_repeated_texts_are_embedded_once(self):
+        embedder = cohere_embedder()
+        vectors = embedder(["a b", "c d", "a b", "a b"])
+        self.assertEqual(embedder.client.calls, [["a b", "c d"]])
+        self.assertEqual(len(vectors), 4)
+        np.testing.assert_array_equal(vectors[0], vectors[3])
+
+    def test_splits_in_batches_of_96(self):
+        embedder = cohere_embedder(cache=self.cache)
+        texts = [f"company {i}" for i in range(2 * COHERE_BATCH_SIZE + 8)]
+        vectors = embedder(texts)
+        self.assertEqual(COHERE_BATCH_SIZE, 96)
+        self.assertEqual(sorted(len(call) for call in embedder.client.calls), [8, 96, 96])
+        self.assertEqual(sorted(text for call in embedder.client.calls for text in call), sorted(texts))
+        # Los vectores vuelven en el orden de los textos aunque los lotes terminen en otro orden
+        expected = LocalEmbedder()(texts)
+        for vector, reference in zip(vectors, expected):
+            np.testing.assert_array_equal(vector, reference)
+
+    def test_retries_only_transient_errors(self):
+        embedder = cohere_embedder(max_retries=2)
+        embedder.client.errors = [ApiError(429), ApiError(503)]
+        self.assertEqual(len(embedder(["retry me"])), 1)
+        self.assertEqual(len(embedder.client.calls), 3)
+
+        embedder.client.calls.clear()
+        embedder.client.errors = [ApiError(400)]
+        with self.assertRaises(ApiError):
+            embedder(["bad request"])
+        self.assertEqual(len(embedder.client.calls), 1)
+
+        embedder.client.calls.clear()
+        embedder.client.errors = [ApiError(500)] * 3
+        with self.assertRaises(ApiError):
+            embedder(["still down"])
+        self.assertEqual(len(embedder.client.calls), 3)
+
+    def test_failed_batch_is_not_cached(self):
+        embedder = cohere_embedder(cache=self.cache, max_retries=0)
+        embedder.client.errors = [ApiError(401)]
+        with self.assertRaises(ApiError):
+            embedder(["text"])
+        self.assertEqual(self.cache.get_many([EmbeddingCache.key(embedder.model, embedder.input_type, "text")]), {})
+
+    def test_is_transient(self):
+        request = httpx.Request("POST", "https://api.cohere.com/v1/embed")
+        self.assertTrue(_is_transient(ApiError(429)))
+        self.assertTrue(_is_transient(ApiError(502)))
+        self.assertFalse(_is_transient(ApiError(400)))
+        self.assertFalse(_is_transient(ApiError(401)))
+        self.assertTrue(_is_transient(httpx.ReadTimeout("timeout", request=request)))
+        self.assertTrue(_is_transient(httpx.ConnectError("refused", request=request)))
+        self.assertTrue(_is_transient(TimeoutError()))
+        self.assertTrue(_is_transient(ConnectionResetError()))
+        self.assertFalse(_is_transient(ValueError("bad input")))
+
+
+class TestLocalEmbedder(unittest.TestCase):
+
+    def test_deterministic_unit_vectors(self):
+        embedder = LocalEmbedder()
+        first, second, empty = embedder(["Apple beats earnings", "Apple beats earnings", ""])
+        self.assertEqual(first.shape, (1024,))
+        self.assertEqual(first.dtype, np.float32)
+        np.testing.assert_array_equal(first, second)
+        self.assertAlmostEqual(float(np.linalg.norm(first)), 1.0, places=6)
+        self.assertFalse(empty.any())
+
+    def test_shared_words_are_closer(self):
+        apple, apple_again, oil = LocalEmbedder()(
+            ["Apple beats earnings estimates", "apple earnings beat", "Oil prices fall on supply"]
+        )
+        self.assertGreater(float(apple @ apple_again), float(apple @ oil))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,25 +2,36 @@
 # para depurar: npx @modelcontextprotocol/inspector /home/surtich/projects/Ampliaci-n-de-Entornos/.venv/bin/python /home/surtich/projects/Ampliaci-n-de-Entornos/21.MCP/21.a-.binance_mcp_w_tools.py 
 # para ejecutar Claude Desktop en Linux: ❯ NIXPKGS_ALLOW_UNFREE=1 nix run github:k3d3/claude-desktop-linux-flake --impure --extra-experimental-features nix-command --extra-experimental-features flakes
 
+import json
 from typing import Any
 
-import requests
 from mcp.server.fastmcp import FastMCP
 
-mcp = FastMCP("Binance MCP")
+from binance_common.client import (
+    BINANCE_API_URL,
+    BINANCE_DATA_API_URL,
+    get_json,
+    get_json_by_symbol,
+)
+from binance_common.cache import cache_stats, price_cache, price_change_cache
+from binance_common.metrics import instrument, metrics
+from binance_common.server import lifespan, limit_concurrency, run
+from binance_common.stream import ticker_stream
+from binance_common.symbols import symbol_index
+
+# El lifespan arranca el stream de tickers (si está configurado) y cierra el cliente HTTP
+mcp = FastMCP("Binance MCP", lifespan=lifespan)
 
 
 def get_symbol_from_name(name: str) -> str:
-    if name.lower() in ["bitcoin", "btc"]:
-        return "BTCUSDT"
-    elif name.lower() in ["ethereum", "eth"]:
-        return "ETHUSDT"
-    else:
-        return name.upper()
+    # Índice construido con /exchangeInfo: los símbolos inválidos se rechazan sin llamar a Binance
+    return symbol_index.resolve(name)
 
 
 @mcp.tool()
-def get_price(symbol: str) -> Any:
+@instrument("tool")
+@limit_concurrency
+async def get_price(symbol: str) -> Any:
     """
     Get the current price of a crypto asset from Binance
 
@@ -31,14 +42,36 @@ def get_price(symbol: str) -> Any:
         Any: The current price of the crypto asset
     """
     symbol = get_symbol_from_name(symbol)
-    url = f"https://api.binance.com/api/v3/ticker/price?symbol={symbol}"
-    response = requests.get(url)
-    response.raise_for_status()
-    return response.json()
+    return await price_cache.get_or_fetch(
+        symbol, lambda: get_json(f"{BINANCE_API_URL}/ticker/price", {"symbol": symbol})
+    )
 
 
 @mcp.tool()
-def get_price_price_change(symbol: str) -> Any:
+@instrument("tool")
+@limit_concurrency
+async def get_prices(symbols: list[str]) -> Any:
+    """
+    Get the current price of several crypto assets from Binance in a single request
+
+    Args:
+        symbols (list[str]): The symbols of the crypto assets to get the price of
+
+    Returns:
+        Any: The current price of every crypto asset
+    """
+    symbols = [get_symbol_from_name(symbol) for symbol in symbols]
+    prices = await price_cache.get_many_or_fetch(
+        symbols,
+        lambda missing: get_json_by_symbol(f"{BINANCE_API_URL}/ticker/price", missing),
+    )
+    return list(prices.values())
+
+
+@mcp.tool()
+@instrument("tool")
+@limit_concurrency
+async def get_price_price_change(symbol: str) -> Any:
     """
     Get the price change of the last 24 hours of a crypto asset from Binance
 
@@ -49,13 +82,120 @@ def get_price_price_change(symbol: str) -> Any:
         Any: The price change of the crypto asset in the last 24 hours
     """
     symbol = get_symbol_from_name(symbol)
-    url = f"https://data-api.binance.vision/api/v3/ticker/24hr?symbol={symbol}"
-    response = requests.get(url)
-    response.raise_for_status()
-    return response.json()
+    return await price_change_cache.get_or_fetch(
+        symbol,
+        lambda: get_json(f"{BINANCE_DATA_API_URL}/ticker/24hr", {"symbol": symbol}),
+    )
+
+
+@mcp.tool()
+@instrument("tool")
+@limit_concurrency
+async def get_prices_price_change(symbols: list[str]) -> Any:
+    """
+    Get the price change of the last 24 hours of several crypto assets from Binance
+    in a single request
+
+    Args:
+        symbols (list[str]): The symbols of the crypto assets to get the price change of
+
+    Returns:
+        Any: The price change of every crypto asset in the last 24 hours
+    """
+    symbols = [get_symbol_from_name(symbol) for symbol in symbols]
+    changes = await price_change_cache.get_many_or_fetch(
+        symbols,
+        lambda missing: get_json_by_symbol(f"{BINANCE_DATA_API_URL}/ticker/24hr", missing),
+    )
+    return list(changes.values())
+
+
+@mcp.tool()
+@instrument("tool")
+@limit_concurrency
+async def get_klines(
+    symbol: str, interval: str = "1d", start: str | None = None, end: str | None = None
+) -> Any:
+    """
+    Get the historical candlesticks (klines) of a crypto asset from Binance
+
+    Args:
+        symbol (str): The symbol of the crypto asset
+        interval (str): Candle interval: 1m, 3m, 5m, 15m, 30m, 1h, 2h, 4h, 6h, 8h, 12h, 1d, 3d or 1w
+        start (str): First date in ISO format (e.g. "2025-01-01"); defaults to 500 candles before end
+        end (str): Last date in ISO format; defaults to now
+
+    Returns:
+        Any: The open time, open, high, low, close and volume of every candle
+    """
+    symbol = get_symbol_from_name(symbol)
+    # NumPy se importa la primera vez que se usa, no al arrancar el servidor
+    from binance_common.klines import default_range, kline_store, klines_summary
+
+    start_ms, end_ms = default_range(interval, start, end)
+    klines = await kline_store.sync(symbol, interval, start_ms, end_ms)
+    return klines_summary(symbol, interval, klines)
+
+
+@mcp.tool()
+@instrument("tool")
+@limit_concurrency
+async def get_technical_indicators(
+    symbol: str,
+    interval: str = "1d",
+    start: str | None = None,
+    end: str | None = None,
+    window: int = 14,
+) -> Any:
+    """
+    Get the SMA, EMA, RSI and annualized volatility of a crypto asset over a period
+
+    Args:
+        symbol (str): The symbol of the crypto asset
+        interval (str): Candle interval: 1m, 3m, 5m, 15m, 30m, 1h, 2h, 4h, 6h, 8h, 12h, 1d, 3d or 1w
+        start (str): First date in ISO format (e.g. "2025-01-01"); defaults to 500 candles before end
+        end (str): Last date in ISO format; defaults to now
+        window (int): Number of candles used by every indicator
+
+    Returns:
+        Any: The latest value of every indicator and the change, high and low of the period
+    """
+    symbol = get_symbol_from_name(symbol)
+    # NumPy se importa la primera vez que se usa, no al arrancar el servidor
+    from binance_common.klines import default_range, indicators_summary, kline_store
+
+    start_ms, end_ms = default_range(interval, start, end)
+    klines = await kline_store.sync(symbol, interval, start_ms, end_ms)
+    return indicators_summary(symbol, interval, klines, window)
+
+
+@mcp.resource("stats://cache")
+@instrument("resource")
+def cache_statistics() -> str:
+    """Hit/miss counters of the price caches"""
+    return json.dumps(cache_stats())
+
+
+@mcp.resource("stats://ticker_stream")
+@instrument("resource")
+def ticker_stream_statistics() -> str:
+    """State of the optional WebSocket ticker feed"""
+    return json.dumps(ticker_stream.stats())
+
+
+# Métricas en formato Prometheus (para un scraper) y en JSON (para el LLM o el inspector)
+@mcp.resource("metrics://prometheus")
+def metrics_prometheus() -> str:
+    return metrics.to_prometheus()
+
+
+@mcp.resource("metrics://json")
+def metrics_json() -> str:
+    return json.dumps(metrics.to_json())
 
 
 if __name__ == "__main__":
     print("Starting Binance MCP")
-    # stdio es útil en entornos de desarrollo y depuración
-    mcp.run(transport="stdio")
+    # stdio es útil en entornos de desarrollo y depuración.
+    # Con --transport streamable-http (o sse) un único proceso atiende a muchos clientes
+    run(mcp)
@@ -1,25 +1,39 @@
 # mcp dev 21.MCP/21.c-binance_mcp_w_prompts.py
 
+import asyncio
 import datetime
+import json
+import os
 from pathlib import Path
 from typing import Any
 
-import requests
 from mcp.server.fastmcp import FastMCP
 
+from binance_common.client import (
+    BINANCE_API_URL,
+    BINANCE_DATA_API_URL,
+    get_json,
+    get_json_by_symbol,
+    request,
+)
+from binance_common.activity_log import ActivityLog
+from binance_common.cache import cache_stats, price_cache, price_change_cache
+from binance_common.metrics import instrument, metrics
+from binance_common.server import lifespan, limit_concurrency, run
+from binance_common.stream import ticker_stream
+from binance_common.symbols import symbol_index
+
 THIS_FOLDER = Path(__file__).parent.absolute()
-ACTIVITY_LOG_FILE = THIS_FOLDER / "activity.log"
+ACTIVITY_LOG_FILE = Path(os.environ.get("BINANCE_ACTIVITY_LOG_FILE", THIS_FOLDER / "activity.log"))
+activity_log = ActivityLog(ACTIVITY_LOG_FILE)
 
-mcp = FastMCP("Binance MCP")
+# El lifespan arranca el stream de tickers (si está configurado) y cierra el cliente HTTP
+mcp = FastMCP("Binance MCP", lifespan=lifespan)
 
 
 def get_symbol_from_name(name: str) -> str:
-    if name.lower() in ["bitcoin", "btc"]:
-        return "BTCUSDT"
-    elif name.lower() in ["ethereum", "eth"]:
-        return "ETHUSDT"
-    else:
-        return name.upper()
+    # Índice construido con /exchangeInfo: los símbolos inválidos se rechazan sin llamar a Binance
+    return symbol_index.resolve(name)
 
 
 @mcp.prompt()
@@ -33,8 +47,9 @@ def executive_summary() -> str:
     el cambio de precio en las últimas 24 horas y el cambio porcentual
     en las últimas 24 horas.
 
-    Al usar las herramientas get_price y get_price_price_change,
-    usa el símbolo como argumento.
+    Usa las herramientas get_prices y get_prices_price_change con la
+    lista de símbolos como argumento para obtener todos los activos en
+    una sola llamada.
     
     Símbolos: Para bitcoin/btc, el símbolo es "BTCUSDT".
     Símbolos: Para ethereum/eth, el símbolo es "ETHUSDT".
@@ -56,8 +71,34 @@ def crypto_summary(crypto: str) -> str:
     """
 
 
+async def fetch_price(symbol: str) -> dict[str, str]:
+    response = await request(f"{BINANCE_API_URL}/ticker/price", {"symbol": symbol})
+    if response.status_code != 200:
+        activity_log.write(
+            f"Error getting price change for {symbol}: {response.status_code} {response.text}\n"
+        )
+        raise Exception(
+            f"Error getting price change for {symbol}: {response.status_code} {response.text}"
+        )
+    return response.json()
+
+
+async def current_price(symbol: str) -> str:
+    # Compartida por la tool y el resource: cada uno cuenta en sus métricas y la tool en su cupo
+    symbol = get_symbol_from_name(symbol)
+    # Las peticiones simultáneas del mismo símbolo comparten una única llamada a Binance
+    ticker = await price_cache.get_or_fetch(symbol, lambda: fetch_price(symbol))
+    price = ticker["price"]
+    activity_log.write(
+        f"Successfully got price change for {symbol}. Current price is {price}. Current time is {datetime.datetime.now(datetime.UTC)}\n"
+    )
+    return f"The current price of {symbol} is {price}"
+
+
 @mcp.tool()
-def get_price(symbol: str) -> Any:
+@instrument("tool")
+@limit_concurrency
+async def get_price(symbol: str) -> Any:
     """
     Get the current price of a crypto asset from Binance
 
@@ -67,39 +108,71 @@ def get_price(symbol: str) -> Any:
     Returns:
         Any: The current price of the crypto asset
     """
-    symbol = get_symbol_from_name(symbol)
-    url = f"https://api.binance.com/api/v3/ticker/price?symbol={symbol}"
-    response = requests.get(url)
-    if response.status_code != 200:
-        with open(ACTIVITY_LOG_FILE, "a") as f:
-            f.write(
-                f"Error getting price change for {symbol}: {response.status_code} {response.text}\n"
-            )
-        raise Exception(
-            f"Error getting price change for {symbol}: {response.status_code} {response.text}"
+    return await current_price(symbol)
+
+
+@mcp.tool()
+@instrument("tool")
+@limit_concurrency
+async def get_prices(symbols: list[str]) -> str:
+    """
+    Get the current price of several crypto assets from Binance in a single request
+
+    Args:
+        symbols (list[str]): The symbols of the crypto assets to get the price of
+
+    Returns:
+        str: The current price of every crypto asset, one per line
+    """
+    symbols = [get_symbol_from_name(symbol) for symbol in symbols]
+    tickers = await price_cache.get_many_or_fetch(
+        symbols,
+        lambda missing: get_json_by_symbol(f"{BINANCE_API_URL}/ticker/price", missing),
+    )
+    prices = {symbol: ticker["price"] for symbol, ticker in tickers.items()}
+    for symbol, price in prices.items():
+        activity_log.write(
+            f"Successfully got price change for {symbol}. Current price is {price}. Current time is {datetime.datetime.now(datetime.UTC)}\n"
         )
-    else:
-        price = response.json()["price"]
-        with open(ACTIVITY_LOG_FILE, "a") as f:
-            f.write(
-                f"Successfully got price change for {symbol}. Current price is {price}. Current time is {datetime.datetime.now(datetime.UTC)}\n"
-            )
-    return f"The current price of {symbol} is {price}"
+    return "\n".join(
+        f"The current price of {symbol} is {price}" for symbol, price in prices.items()
+    )
 
 
 @mcp.resource("file://activity.log")
-def activity_log() -> str:
+@instrument("resource")
+async def activity_log_file() -> str:
+    await activity_log.flush()
     with open(ACTIVITY_LOG_FILE, "r") as f:
         return f.read()
 
 
+# Para logs grandes es mejor leer solo el final o una página del fichero
+@mcp.resource("file://activity.log/tail/{lines}")
+@instrument("resource")
+async def activity_log_tail(lines: int) -> str:
+    await activity_log.flush()
+    return await asyncio.to_thread(activity_log.tail, int(lines))
+
+
+@mcp.resource("file://activity.log/page/{offset}/{size}")
+@instrument("resource")
+async def activity_log_page(offset: int, size: int) -> str:
+    await activity_log.flush()
+    page = await asyncio.to_thread(activity_log.read_page, int(offset), int(size))
+    return json.dumps(page)
+
+
 @mcp.resource("resource://crypto_price/{symbol}")
-def get_crypto_price(symbol: str) -> str:
-    return get_price(symbol)
+@instrument("resource")
+async def get_crypto_price(symbol: str) -> str:
+    return await current_price(symbol)
 
 
 @mcp.tool()
-def get_price_price_change(symbol: str) -> Any:
+@instrument("tool")
+@limit_concurrency
+async def get_price_price_change(symbol: str) -> Any:
     """
     Get the price change of the last 24 hours of a crypto asset from Binance
 
@@ -110,13 +183,120 @@ def get_price_price_change(symbol: str) -> Any:
         Any: The price change of the crypto asset in the last 24 hours
     """
     symbol = get_symbol_from_name(symbol)
-    url = f"https://data-api.binance.vision/api/v3/ticker/24hr?symbol={symbol}"
-    response = requests.get(url)
-    response.raise_for_status()
-    return response.json()
+    return await price_change_cache.get_or_fetch(
+        symbol,
+        lambda: get_json(f"{BINANCE_DATA_API_URL}/ticker/24hr", {"symbol": symbol}),
+    )
+
+
+@mcp.tool()
+@instrument("tool")
+@limit_concurrency
+async def get_prices_price_change(symbols: list[str]) -> Any:
+    """
+    Get the price change of the last 24 hours of several crypto assets from Binance
+    in a single request
+
+    Args:
+        symbols (list[str]): The symbols of the crypto assets to get the price change of
+
+    Returns:
+        Any: The price change of every crypto asset in the last 24 hours
+    """
+    symbols = [get_symbol_from_name(symbol) for symbol in symbols]
+    changes = await price_change_cache.get_many_or_fetch(
+        symbols,
+        lambda missing: get_json_by_symbol(f"{BINANCE_DATA_API_URL}/ticker/24hr", missing),
+    )
+    return list(changes.values())
+
+
+@mcp.tool()
+@instrument("tool")
+@limit_concurrency
+async def get_klines(
+    symbol: str, interval: str = "1d", start: str | None = None, end: str | None = None
+) -> Any:
+    """
+    Get the historical candlesticks (klines) of a crypto asset from Binance
+
+    Args:
+        symbol (str): The symbol of the crypto asset
+        interval (str): Candle interval: 1m, 3m, 5m, 15m, 30m, 1h, 2h, 4h, 6h, 8h, 12h, 1d, 3d or 1w
+        start (str): First date in ISO format (e.g. "2025-01-01"); defaults to 500 candles before end
+        end (str): Last date in ISO format; defaults to now
+
+    Returns:
+        Any: The open time, open, high, low, close and volume of every candle
+    """
+    symbol = get_symbol_from_name(symbol)
+    # NumPy se importa la primera vez que se usa, no al arrancar el servidor
+    from binance_common.klines import default_range, kline_store, klines_summary
+
+    start_ms, end_ms = default_range(interval, start, end)
+    klines = await kline_store.sync(symbol, interval, start_ms, end_ms)
+    return klines_summary(symbol, interval, klines)
+
+
+@mcp.tool()
+@instrument("tool")
+@limit_concurrency
+async def get_technical_indicators(
+    symbol: str,
+    interval: str = "1d",
+    start: str | None = None,
+    end: str | None = None,
+    window: int = 14,
+) -> Any:
+    """
+    Get the SMA, EMA, RSI and annualized volatility of a crypto asset over a period
+
+    Args:
+        symbol (str): The symbol of the crypto asset
+        interval (str): Candle interval: 1m, 3m, 5m, 15m, 30m, 1h, 2h, 4h, 6h, 8h, 12h, 1d, 3d or 1w
+        start (str): First date in ISO format (e.g. "2025-01-01"); defaults to 500 candles before end
+        end (str): Last date in ISO format; defaults to now
+        window (int): Number of candles used by every indicator
+
+    Returns:
+        Any: The latest value of every indicator and the change, high and low of the period
+    """
+    symbol = get_symbol_from_name(symbol)
+    # NumPy se importa la primera vez que se usa, no al arrancar el servidor
+    from binance_common.klines import default_range, indicators_summary, kline_store
+
+    start_ms, end_ms = default_range(interval, start, end)
+    klines = await kline_store.sync(symbol, interval, start_ms, end_ms)
+    return indicators_summary(symbol, interval, klines, window)
+
+
+@mcp.resource("stats://cache")
+@instrument("resource")
+def cache_statistics() -> str:
+    """Hit/miss counters of the price caches"""
+    return json.dumps(cache_stats())
+
+
+@mcp.resource("stats://ticker_stream")
+@instrument("resource")
+def ticker_stream_statistics() -> str:
+    """State of the optional WebSocket ticker feed"""
+    return json.dumps(ticker_stream.stats())
+
+
+# Métricas en formato Prometheus (para un scraper) y en JSON (para el LLM o el inspector)
+@mcp.resource("metrics://prometheus")
+def metrics_prometheus() -> str:
+    return metrics.to_prometheus()
+
+
+@mcp.resource("metrics://json")
+def metrics_json() -> str:
+    return json.dumps(metrics.to_json())
 
 
 if __name__ == "__main__":
     if not Path(ACTIVITY_LOG_FILE).exists():
         Path(ACTIVITY_LOG_FILE).touch()
-    mcp.run(transport="stdio")
+    # Por defecto stdio; con --transport streamable-http se comparte el servidor por red
+    run(mcp)
@@ -1,12 +1,21 @@
 import asyncio
+import os
+import sys
+import time
+from contextlib import AsyncExitStack
 from pathlib import Path
 
+import anyio
 from dotenv import load_dotenv
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import HumanMessage, ToolMessage
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
 from langchain_google_genai import ChatGoogleGenerativeAI
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
 
-from langgraph.prebuilt import create_react_agent
+from langgraph.graph import START, MessagesState, StateGraph
+from langgraph.prebuilt import tools_condition
 
 load_dotenv()
 
@@ -23,24 +32,230 @@ mcp_config = {
     }
 }
 
+# Si hay un servidor compartido arrancado con --transport streamable-http
+# (p. ej. BINANCE_MCP_URL=http://127.0.0.1:8000/mcp) se usa en lugar de lanzar un proceso
+if os.environ.get("BINANCE_MCP_URL"):
+    mcp_config = {
+        "binance": {
+            "url": os.environ["BINANCE_MCP_URL"],
+            "transport": "streamable_http",
+        }
+    }
+# Con un servidor arrancado con --transport prefork (BINANCE_MCP_SOCKET=/tmp/binance_mcp.sock)
+# cada sesión se engancha a un worker ya caliente; si no hay ninguno se lanza el servidor
+elif os.environ.get("BINANCE_MCP_SOCKET"):
+    mcp_config = {
+        "binance": {
+            "command": "python",
+            "args": [
+                "-S",
+                str(ROOT_FOLDER / "21.MCP" / "binance_common" / "warm.py"),
+                "--socket",
+                os.environ["BINANCE_MCP_SOCKET"],
+                "--server",
+                MCP_PATH,
+            ],
+            "transport": "stdio",
+        }
+    }
+
+# Máximo de tool calls de un mismo turno que se ejecutan a la vez sobre la sesión MCP
+MAX_PARALLEL_TOOL_CALLS = int(os.environ.get("MAX_PARALLEL_TOOL_CALLS", "4"))
+
+# Errores que indican que el proceso del servidor MCP ha muerto o cerrado la conexión
+CONNECTION_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    BrokenPipeError,
+    ConnectionResetError,
+    ProcessLookupError,
+)
+
+
+def is_connection_error(error: BaseException) -> bool:
+    """True if the MCP session is gone, False if only the request failed (e.g. a tool error)"""
+    # Las peticiones pendientes cuando se cierra la conexión fallan con CONNECTION_CLOSED;
+    # cualquier otro McpError es un error de esa llamada y la sesión sigue sirviendo
+    if isinstance(error, McpError):
+        return error.error.code == CONNECTION_CLOSED
+    return isinstance(error, CONNECTION_ERRORS)
+
+
+class ParallelToolNode:
+    """
+    Graph node that runs the independent tool calls of a model turn concurrently.
+
+    At most ``max_parallel`` calls run at the same time and the resulting messages
+    keep the order of the tool calls. Every turn appends its timing to ``timings``.
+    """
+
+    def __init__(self, tools, max_parallel: int = MAX_PARALLEL_TOOL_CALLS, timings: list | None = None):
+        self.tools_by_name = {tool.name: tool for tool in tools}
+        self.max_parallel = max_parallel
+        self.timings = timings if timings is not None else []
+
+    async def _run_call(self, call: dict, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                # Invocar la tool con el ToolCall completo devuelve directamente un ToolMessage
+                message = await self.tools_by_name[call["name"]].ainvoke({**call, "type": "tool_call"})
+            except Exception as e:
+                if is_connection_error(e):
+                    # Se propaga para que PriceAgent reconecte con el servidor
+                    raise
+                message = ToolMessage(
+                    content=f"Error: {e!r}", name=call["name"], tool_call_id=call["id"], status="error"
+                )
+            return message, time.perf_counter() - start
+
+    async def __call__(self, state: MessagesState):
+        tool_calls = state["messages"][-1].tool_calls
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        start = time.perf_counter()
+        results = await asyncio.gather(*(self._run_call(call, semaphore) for call in tool_calls))
+        self.timings.append(
+            {
+                "tool_calls": [
+                    {"name": call["name"], "seconds": seconds}
+                    for call, (_, seconds) in zip(tool_calls, results)
+                ],
+                "wall_seconds": time.perf_counter() - start,
+            }
+        )
+        return {"messages": [message for message, _ in results]}
+
+
+def build_agent(tools, timings: list | None = None):
+    """
+    Build the react graph: the model decides, the tools node runs the calls in parallel
+
+    Args:
+        tools (list): The LangChain tools of the MCP session
+        timings (list): Where each turn records the time of the model and of the tools
+
+    Returns:
+        CompiledStateGraph: The agent
+    """
+    timings = timings if timings is not None else []
+    model_with_tools = model.bind_tools(tools)
+
+    async def agent(state: MessagesState):
+        start = time.perf_counter()
+        response = await model_with_tools.ainvoke(state["messages"])
+        timings.append({"model_seconds": time.perf_counter() - start})
+        return {"messages": [response]}
+
+    graph_builder = StateGraph(MessagesState)
+    graph_builder.add_node("agent", agent)
+    graph_builder.add_node("tools", ParallelToolNode(tools, timings=timings))
+    graph_builder.add_edge(START, "agent")
+    graph_builder.add_conditional_edges("agent", tools_condition, "tools")
+    graph_builder.add_edge("tools", "agent")
+    return graph_builder.compile()
+
+
+class PriceAgent:
+    """
+    Long-lived react agent that keeps the MCP stdio session open between queries.
+
+    The Binance server subprocess is spawned once, the tool schemas are listed once
+    and cached, and the session is re-opened (reusing the cached schemas) if the
+    server dies. Must be started and closed from the same task.
+    """
+
+    def __init__(self, config: dict = mcp_config, server_name: str = "binance"):
+        self.client = MultiServerMCPClient(config)
+        self.server_name = server_name
+        self.agent = None
+        self.timings: list[dict] = []  # tiempos por turno de la última pregunta
+        self._tool_schemas = None
+        self._stack: AsyncExitStack | None = None
+
+    async def start(self):
+        """Open the MCP session and build the agent"""
+        self._stack = AsyncExitStack()
+        session = await self._stack.enter_async_context(
+            self.client.session(self.server_name)
+        )
+        if self._tool_schemas is None:
+            self._tool_schemas = (await session.list_tools()).tools
+        tools = [
+            convert_mcp_tool_to_langchain_tool(session, tool)
+            for tool in self._tool_schemas
+        ]
+        self.agent = build_agent(tools, self.timings)
+
+    async def close(self):
+        """Close the MCP session and stop the server subprocess"""
+        if self._stack is not None:
+            stack, self._stack = self._stack, None
+            try:
+                await stack.aclose()
+            except Exception:
+                # El servidor puede haber muerto ya
+                pass
+        self.agent = None
+
+    async def restart(self):
+        await self.close()
+        await self.start()
+
+    async def ask(self, query: str) -> str:
+        """
+        Answer a question with the warm agent, reconnecting once if the server died
+
+        Args:
+            query (str): The question for the agent
+
+        Returns:
+            str: The answer of the agent
+        """
+        if self.agent is None:
+            await self.start()
+        message = HumanMessage(content=query)
+        self.timings.clear()
+        try:
+            response = await self.agent.ainvoke({"messages": [message]})
+        except Exception as e:
+            if not is_connection_error(e):
+                raise
+            await self.restart()
+            self.timings.clear()
+            response = await self.agent.ainvoke({"messages": [message]})
+        return response["messages"][-1].content
 
-async def get_crypto_prices():
-    client = MultiServerMCPClient(mcp_config)
-    tools = await client.get_tools()
+    async def __aenter__(self):
+        await self.start()
+        return self
 
-    agent = create_react_agent(model, tools)
+    async def __aexit__(self, *exc_info):
+        await self.close()
 
-    query = "What are the current prices of Bitcoin and Ethereum?"
-    message = HumanMessage(content=query)
 
-    response = await agent.ainvoke({"messages": [message]})
+async def get_crypto_prices(
+    query: str = "What are the current prices of Bitcoin and Ethereum?",
+    agent: PriceAgent | None = None,
+):
+    # Sin agente se abre una sesión solo para esta pregunta (lanza un proceso nuevo)
+    if agent is not None:
+        return await agent.ask(query)
+    async with PriceAgent() as agent:
+        return await agent.ask(query)
 
-    answer = response["messages"][-1].content
 
-    return answer
+async def main(queries: list[str]):
+    # Una única sesión para todas las preguntas: el proceso del servidor se lanza una vez
+    async with PriceAgent() as agent:
+        for query in queries:
+            print(await get_crypto_prices(query, agent))
+            for turn in agent.timings:
+                print(f"  {turn}")
 
 
 if __name__ == "__main__":
     # Run the main async function
-    response = asyncio.run(get_crypto_prices())
-    print(response)
+    # Se pueden pasar varias preguntas como argumentos: se responden con la misma sesión
+    queries = sys.argv[1:] or ["What are the current prices of Bitcoin and Ethereum?"]
+    asyncio.run(main(queries))
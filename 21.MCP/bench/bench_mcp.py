@@ -0,0 +1,252 @@
+"""
+Load test and latency benchmark for the Binance MCP servers.
+
+Starts a fake Binance (``fake_binance.py``), launches one of the servers of 21.MCP
+against it and drives it with N concurrent MCP clients. Reports cold start,
+throughput and p50/p95/p99 latency per tool, plus the upstream requests made:
+
+    python 21.MCP/bench/bench_mcp.py --server 21.a-.binance_mcp_w_tools.py --clients 8 --calls 50
+    python 21.MCP/bench/bench_mcp.py --transport streamable-http --latency 0.05 --json result.json
+
+With ``stdio`` every client spawns its own server process (like Claude Desktop or
+21.d); with ``streamable-http`` all clients share a single server process, and with
+``prefork`` every client attaches to a warm worker of ``--transport prefork``.
+The cold start row is the time to the first tool response of each client.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+import httpx
+import uvicorn
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+from fake_binance import SYMBOLS, create_app
+
+MCP_FOLDER = Path(__file__).parent.parent.absolute()
+
+# Mezcla de llamadas: (tool, generador de argumentos)
+WORKLOAD = [
+    ("get_price", lambda rng: {"symbol": rng.choice(list(SYMBOLS))}),
+    ("get_price_price_change", lambda rng: {"symbol": rng.choice(list(SYMBOLS))}),
+    ("get_prices", lambda rng: {"symbols": rng.sample(list(SYMBOLS), 3)}),
+]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(values: list[float], q: int) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def summarize(latencies: list[float]) -> dict[str, float]:
+    return {
+        "count": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+async def wait_for_port(port: int, timeout: float = 30.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.02)
+    raise TimeoutError(f"Nothing is listening on port {port}")
+
+
+async def wait_for_socket(path: str, timeout: float = 30.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            _, writer = await asyncio.open_unix_connection(path)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.02)
+    raise TimeoutError(f"Nothing is listening on {path}")
+
+
+async def run_client(session_factory, calls: int, seed: int, latencies, errors, cold_starts) -> None:
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    async with AsyncExitStack() as stack:
+        read, write = (await stack.enter_async_context(session_factory()))[:2]
+        session = await stack.enter_async_context(ClientSession(read, write))
+        await session.initialize()
+        first = True
+        for _ in range(calls):
+            tool, make_args = rng.choice(WORKLOAD)
+            call_start = time.perf_counter()
+            result = await session.call_tool(tool, make_args(rng))
+            elapsed = time.perf_counter() - call_start
+            if first:
+                # Tiempo hasta la primera respuesta de una tool, arranque incluido
+                cold_starts.append(time.perf_counter() - start)
+                first = False
+            latencies[tool].append(elapsed)
+            if result.isError:
+                errors[tool] += 1
+
+
+async def benchmark(args) -> dict:
+    fake_port = free_port()
+    fake_app = create_app(args.latency, args.jitter, args.error_rate, args.seed, args.weight_limit)
+    fake_server = uvicorn.Server(
+        uvicorn.Config(fake_app, host="127.0.0.1", port=fake_port, log_level="warning")
+    )
+    fake_task = asyncio.create_task(fake_server.serve())
+    await wait_for_port(fake_port)
+
+    work_dir = tempfile.mkdtemp(prefix="binance_bench_")
+    fake_url = f"http://127.0.0.1:{fake_port}/api/v3"
+    env = {
+        **os.environ,
+        "BINANCE_API_URL": fake_url,
+        "BINANCE_DATA_API_URL": fake_url,
+        "BINANCE_SYMBOL_CACHE_FILE": os.path.join(work_dir, "symbols.json"),
+        "BINANCE_KLINES_CACHE_DIR": os.path.join(work_dir, "klines"),
+        "BINANCE_ACTIVITY_LOG_FILE": os.path.join(work_dir, "activity.log"),
+    }
+    server_path = str(MCP_FOLDER / args.server)
+
+    server_process = None
+    if args.transport == "stdio":
+        params = StdioServerParameters(command=sys.executable, args=[server_path], env=env)
+        # Los logs de los servidores van a un fichero para no mezclarse con el informe
+        server_log = open(os.path.join(work_dir, "server.log"), "w")
+
+        def session_factory():
+            return stdio_client(params, errlog=server_log)
+    elif args.transport == "prefork":
+        socket_path = os.path.join(work_dir, "mcp.sock")
+        spawn_start = time.perf_counter()
+        server_process = await asyncio.create_subprocess_exec(
+            sys.executable, server_path, "--transport", "prefork", "--socket", socket_path,
+            "--workers", str(args.clients),
+            env=env, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+        )
+        await wait_for_socket(socket_path)
+        server_ready = time.perf_counter() - spawn_start
+        params = StdioServerParameters(
+            command=sys.executable,
+            args=["-S", str(MCP_FOLDER / "binance_common" / "warm.py"), "--socket", socket_path],
+            env=env,
+        )
+
+        def session_factory():
+            return stdio_client(params)
+    else:
+        port = free_port()
+        spawn_start = time.perf_counter()
+        server_process = await asyncio.create_subprocess_exec(
+            sys.executable, server_path, "--transport", "streamable-http", "--port", str(port),
+            env=env, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+        )
+        await wait_for_port(port)
+        server_ready = time.perf_counter() - spawn_start
+
+        def session_factory():
+            return streamablehttp_client(f"http://127.0.0.1:{port}/mcp")
+
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    cold_starts: list[float] = []
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(
+            *(
+                run_client(session_factory, args.calls, args.seed + i, latencies, errors, cold_starts)
+                for i in range(args.clients)
+            )
+        )
+        elapsed = time.perf_counter() - start
+    finally:
+        if server_process is not None:
+            server_process.terminate()
+            await server_process.wait()
+        async with httpx.AsyncClient() as client:
+            upstream = (await client.get(f"http://127.0.0.1:{fake_port}/stats")).json()
+        fake_server.should_exit = True
+        await fake_task
+
+    total_calls = sum(len(values) for values in latencies.values())
+    report = {
+        "server": args.server,
+        "transport": args.transport,
+        "clients": args.clients,
+        "calls_per_client": args.calls,
+        "fake_latency_ms": args.latency * 1000,
+        "error_rate": args.error_rate,
+        "elapsed_s": elapsed,
+        "throughput_calls_s": total_calls / elapsed,
+        "cold_start": summarize(cold_starts),
+        "tools": {tool: {**summarize(values), "errors": errors[tool]} for tool, values in sorted(latencies.items())},
+        "upstream_requests": upstream,
+    }
+    if server_process is not None:
+        report["server_ready_s"] = server_ready
+    return report
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"{report['server']} ({report['transport']}) - {report['clients']} clients x "
+        f"{report['calls_per_client']} calls, fake latency {report['fake_latency_ms']:.0f} ms"
+    )
+    print(f"Throughput: {report['throughput_calls_s']:.1f} calls/s in {report['elapsed_s']:.2f} s")
+    print(f"{'':24} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+    rows = [("cold start (1st tool)", {**report["cold_start"], "errors": ""})]
+    rows += list(report["tools"].items())
+    for name, stats in rows:
+        print(
+            f"{name:24} {stats['count']:>6} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} "
+            f"{stats['p99_ms']:>9.1f} {stats['max_ms']:>9.1f} {stats['errors']:>7}"
+        )
+    print(f"Upstream requests: {report['upstream_requests']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the Binance MCP servers")
+    parser.add_argument("--server", default="21.a-.binance_mcp_w_tools.py", help="Server file inside 21.MCP")
+    parser.add_argument("--transport", choices=["stdio", "streamable-http", "prefork"], default="stdio")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--calls", type=int, default=25, help="Tool calls per client")
+    parser.add_argument("--latency", type=float, default=0.02, help="Fake Binance latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--weight-limit", type=int, default=6000, help="Fake Binance weight per minute")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    report = asyncio.run(benchmark(args))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,204 @@
+"""
+Local fake of the Binance REST endpoints used by the MCP servers.
+
+Serves ``/api/v3/ticker/price``, ``/api/v3/ticker/24hr``, ``/api/v3/exchangeInfo`` and
+``/api/v3/klines`` with configurable latency and error rate, and counts the requests
+it receives (``/stats``) so caching and batching regressions show up as numbers:
+
+    python 21.MCP/bench/fake_binance.py --port 9000 --latency 0.05 --error-rate 0.01
+    BINANCE_API_URL=http://127.0.0.1:9000/api/v3 BINANCE_DATA_API_URL=http://127.0.0.1:9000/api/v3 \\
+        python 21.MCP/21.a-.binance_mcp_w_tools.py
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from binance_common.rate_limit import request_weight  # noqa: E402
+
+BASE_PRICES = {
+    "BTC": 108000.0,
+    "ETH": 2700.0,
+    "BNB": 650.0,
+    "SOL": 150.0,
+    "XRP": 2.2,
+    "ADA": 0.7,
+    "DOGE": 0.19,
+    "DOT": 4.1,
+    "LTC": 88.0,
+    "LINK": 14.0,
+}
+QUOTE = "USDT"
+SYMBOLS = {f"{base}{QUOTE}": price for base, price in BASE_PRICES.items()}
+DAY_MS = 86_400_000
+INTERVAL_MS = {"1m": 60_000, "5m": 300_000, "15m": 900_000, "1h": 3_600_000, "4h": 14_400_000, "1d": DAY_MS}
+
+
+def create_app(
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    seed: int | None = None,
+    weight_limit: int = 6000,
+) -> Starlette:
+    """
+    Build the fake Binance application
+
+    Args:
+        latency (float): Seconds added to every response
+        jitter (float): Maximum random seconds added on top of ``latency``
+        error_rate (float): Probability (0-1) of answering with a 500 error
+        seed (int): Seed of the random generator, for reproducible runs
+        weight_limit (int): Request weight per minute before answering 429
+
+    Returns:
+        Starlette: The ASGI application; ``app.state.requests`` counts requests per path
+    """
+    rng = random.Random(seed)
+    requests = Counter()
+    used_weight = {"minute": 0, "weight": 0}
+
+    def price_of(symbol: str) -> float:
+        # Paseo aleatorio suave pero determinista en función del tiempo
+        drift = ((int(time.time()) + zlib.crc32(symbol.encode())) % 200 - 100) / 10_000
+        return SYMBOLS[symbol] * (1 + drift)
+
+    async def simulate(request: Request) -> JSONResponse | None:
+        requests[request.url.path] += 1
+        delay = latency + (rng.random() * jitter if jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        minute = int(time.time() // 60)
+        if used_weight["minute"] != minute:
+            used_weight.update(minute=minute, weight=0)
+        used_weight["weight"] += request_weight(str(request.url), dict(request.query_params))
+        headers = {"X-MBX-USED-WEIGHT-1M": str(used_weight["weight"])}
+        if used_weight["weight"] > weight_limit:
+            requests["429"] += 1
+            headers["Retry-After"] = str(60 - int(time.time()) % 60)
+            return JSONResponse({"code": -1003, "msg": "Too much request weight used."}, 429, headers)
+        if error_rate and rng.random() < error_rate:
+            return JSONResponse({"code": -1000, "msg": "An unknown error occurred."}, 500, headers)
+        return None
+
+    def requested_symbols(request: Request) -> list[str] | JSONResponse:
+        if "symbols" in request.query_params:
+            symbols = json.loads(request.query_params["symbols"])
+        else:
+            symbols = [request.query_params.get("symbol", "")]
+        if any(symbol not in SYMBOLS for symbol in symbols):
+            return JSONResponse({"code": -1121, "msg": "Invalid symbol."}, status_code=400)
+        return symbols
+
+    def respond(request: Request, items: list[dict]) -> JSONResponse:
+        return JSONResponse(items if "symbols" in request.query_params else items[0])
+
+    async def ticker_price(request: Request) -> JSONResponse:
+        error = await simulate(request)
+        symbols = requested_symbols(request)
+        if error or isinstance(symbols, JSONResponse):
+            return error or symbols
+        return respond(request, [{"symbol": s, "price": f"{price_of(s):.8f}"} for s in symbols])
+
+    async def ticker_24hr(request: Request) -> JSONResponse:
+        error = await simulate(request)
+        symbols = requested_symbols(request)
+        if error or isinstance(symbols, JSONResponse):
+            return error or symbols
+        now = int(time.time() * 1000)
+        items = []
+        for s in symbols:
+            last, open_ = price_of(s), SYMBOLS[s]
+            items.append(
+                {
+                    "symbol": s,
+                    "priceChange": f"{last - open_:.8f}",
+                    "priceChangePercent": f"{(last / open_ - 1) * 100:.3f}",
+                    "lastPrice": f"{last:.8f}",
+                    "openPrice": f"{open_:.8f}",
+                    "highPrice": f"{max(last, open_) * 1.01:.8f}",
+                    "lowPrice": f"{min(last, open_) * 0.99:.8f}",
+                    "volume": "12345.00000000",
+                    "openTime": now - DAY_MS,
+                    "closeTime": now,
+                }
+            )
+        return respond(request, items)
+
+    async def exchange_info(request: Request) -> JSONResponse:
+        error = await simulate(request)
+        if error:
+            return error
+        return JSONResponse(
+            {
+                "symbols": [
+                    {"symbol": f"{base}{QUOTE}", "status": "TRADING", "baseAsset": base, "quoteAsset": QUOTE}
+                    for base in BASE_PRICES
+                ]
+            }
+        )
+
+    async def klines(request: Request) -> JSONResponse:
+        error = await simulate(request)
+        if error:
+            return error
+        symbol = request.query_params.get("symbol", "")
+        if symbol not in SYMBOLS:
+            return JSONResponse({"code": -1121, "msg": "Invalid symbol."}, status_code=400)
+        step = INTERVAL_MS.get(request.query_params.get("interval", "1d"), DAY_MS)
+        end = int(request.query_params.get("endTime", time.time() * 1000))
+        limit = int(request.query_params.get("limit", 500))
+        start = int(request.query_params.get("startTime", end - limit * step))
+        start = -(-start // step) * step
+        base = SYMBOLS[symbol]
+        rows = []
+        for open_time in range(start, end + 1, step)[:limit]:
+            close = base * (1 + ((open_time // step) % 50 - 25) / 1000)
+            rows.append(
+                [open_time, f"{base:.8f}", f"{close * 1.01:.8f}", f"{close * 0.99:.8f}", f"{close:.8f}",
+                 "100.0", open_time + step - 1, f"{close * 100:.8f}", 42, "50.0", "0", "0"]
+            )
+        return JSONResponse(rows)
+
+    async def stats(request: Request) -> JSONResponse:
+        return JSONResponse(dict(requests))
+
+    app = Starlette(
+        routes=[
+            Route("/api/v3/ticker/price", ticker_price),
+            Route("/api/v3/ticker/24hr", ticker_24hr),
+            Route("/api/v3/exchangeInfo", exchange_info),
+            Route("/api/v3/klines", klines),
+            Route("/stats", stats),
+        ]
+    )
+    app.state.requests = requests
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake Binance REST API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--weight-limit", type=int, default=6000)
+    args = parser.parse_args()
+    app = create_app(args.latency, args.jitter, args.error_rate, args.seed, args.weight_limit)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,92 @@
+"""
+Import-time profile of the Binance MCP servers.
+
+Imports a server file under ``python -X importtime`` (without starting it) and
+reports the interpreter start-up, the total import time and the packages that
+take the longest, i.e. what a stdio client waits for before the first response:
+
+    python 21.MCP/bench/import_profile.py --server 21.a-.binance_mcp_w_tools.py --top 15
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+MCP_FOLDER = Path(__file__).parent.parent.absolute()
+
+# Importa el servidor sin ejecutar el bloque __main__
+LOAD_SERVER = "import runpy, sys; sys.path.insert(0, {folder!r}); runpy.run_path({path!r}, run_name='import_profile')"
+
+
+def wall_time(code: str, runs: int) -> float:
+    """Best wall time, in seconds, of running ``code`` in a fresh interpreter"""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def import_times(code: str) -> list[tuple[int, str, int, int]]:
+    """``(level, module, self_us, cumulative_us)`` of every import made by ``code``"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], check=True, capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        # Cada nivel de anidamiento añade dos espacios delante del nombre
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((level, name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def profile(server: str, top: int, runs: int) -> dict:
+    code = LOAD_SERVER.format(folder=str(MCP_FOLDER), path=str(MCP_FOLDER / server))
+    rows = import_times(code)
+    by_package: dict[str, int] = defaultdict(int)
+    for _, name, self_us, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+    slowest = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "server": server,
+        "interpreter_s": wall_time("pass", runs),
+        "server_import_s": wall_time(code, runs),
+        "import_total_ms": sum(row[3] for row in rows if row[0] == 0) / 1000,
+        "modules": len(rows),
+        "packages_ms": {name: self_us / 1000 for name, self_us in slowest},
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"{report['server']}: {report['modules']} modules imported")
+    print(f"Interpreter start-up:    {report['interpreter_s'] * 1000:8.1f} ms")
+    print(f"Start-up + server import: {report['server_import_s'] * 1000:7.1f} ms")
+    print(f"Import time (importtime): {report['import_total_ms']:7.1f} ms")
+    print(f"{'package':32} {'self ms':>9}")
+    for name, ms in report["packages_ms"].items():
+        print(f"{name:32} {ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import-time profile of a Binance MCP server")
+    parser.add_argument("--server", default="21.a-.binance_mcp_w_tools.py", help="Server file inside 21.MCP")
+    parser.add_argument("--top", type=int, default=15, help="Packages shown")
+    parser.add_argument("--runs", type=int, default=3, help="Runs of every wall time measurement")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    report = profile(args.server, args.top, args.runs)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,3 @@
+# Código compartido por los servidores MCP de Binance (21.a, 21.b y 21.c).
+# Los scripts se lanzan directamente (python 21.MCP/21.x-....py o mcp dev), por lo
+# que la carpeta 21.MCP está en sys.path y este paquete se importa sin instalar nada.
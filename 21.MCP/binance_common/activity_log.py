@@ -0,0 +1,166 @@
+"""
+Buffered, non-blocking activity log for the Binance MCP servers.
+
+Tools only append to an in-memory buffer; the buffer is written to disk from a
+worker thread shortly after, rotating the file when it grows past ``max_bytes``.
+Reads seek from the end of the file instead of loading it whole.
+"""
+
+import asyncio
+import atexit
+import os
+import weakref
+from pathlib import Path
+from typing import Any
+
+ACTIVITY_LOG_MAX_BYTES = int(os.environ.get("BINANCE_ACTIVITY_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+ACTIVITY_LOG_BACKUP_COUNT = int(os.environ.get("BINANCE_ACTIVITY_LOG_BACKUP_COUNT", "3"))
+ACTIVITY_LOG_FLUSH_INTERVAL = float(os.environ.get("BINANCE_ACTIVITY_LOG_FLUSH_INTERVAL", "1"))
+ACTIVITY_LOG_MAX_BUFFER = 1000  # líneas pendientes que fuerzan una escritura inmediata
+TAIL_BLOCK_SIZE = 8192
+
+_logs: "weakref.WeakSet[ActivityLog]" = weakref.WeakSet()
+
+
+class ActivityLog:
+    """
+    Append-only text log with a write buffer and size-based rotation.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_bytes: int = ACTIVITY_LOG_MAX_BYTES,
+        backup_count: int = ACTIVITY_LOG_BACKUP_COUNT,
+        flush_interval: float = ACTIVITY_LOG_FLUSH_INTERVAL,
+    ):
+        """
+        Args:
+            path (str | Path): The log file
+            max_bytes (int): Size that triggers a rotation (0 disables it)
+            backup_count (int): Number of rotated files kept (activity.log.1, .2, ...)
+            flush_interval (float): Seconds a line may wait in the buffer
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self._buffer: list[str] = []
+        self._flush_task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+        _logs.add(self)
+
+    def write(self, text: str) -> None:
+        """
+        Append text to the log without blocking the event loop
+
+        Args:
+            text (str): The text to append, including its trailing newline
+        """
+        self._buffer.append(text)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Sin bucle de eventos (scripts, tests) se escribe directamente
+            self.flush_sync()
+            return
+        if len(self._buffer) >= ACTIVITY_LOG_MAX_BUFFER:
+            loop.create_task(self.flush())
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Write the buffered text to disk from a worker thread"""
+        async with self._lock:
+            if self._buffer:
+                chunk, self._buffer = "".join(self._buffer), []
+                await asyncio.to_thread(self._append, chunk)
+
+    def flush_sync(self) -> None:
+        """Write the buffered text to disk from the calling thread"""
+        if self._buffer:
+            chunk, self._buffer = "".join(self._buffer), []
+            self._append(chunk)
+
+    def _append(self, chunk: str) -> None:
+        data = chunk.encode()
+        if self.max_bytes and self.path.exists():
+            size = self.path.stat().st_size
+            if size and size + len(data) > self.max_bytes:
+                self._rotate()
+        with open(self.path, "ab") as f:
+            f.write(data)
+
+    def _rotate(self) -> None:
+        if self.backup_count <= 0:
+            self.path.unlink()
+            return
+        for i in range(self.backup_count - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{i}")
+            if source.exists():
+                source.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+        self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+
+    def tail(self, lines: int) -> str:
+        """
+        Return the last lines of the log reading backwards from the end of the file
+
+        Args:
+            lines (int): Number of lines to return
+
+        Returns:
+            str: The last ``lines`` lines of the log
+        """
+        if lines <= 0 or not self.path.exists():
+            return ""
+        with open(self.path, "rb") as f:
+            position = f.seek(0, os.SEEK_END)
+            data = b""
+            # Una línea más de las pedidas para saber que la primera está completa
+            while position > 0 and data.count(b"\n") <= lines:
+                step = min(TAIL_BLOCK_SIZE, position)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+        selected = data.splitlines()[-lines:]
+        return b"".join(line + b"\n" for line in selected).decode(errors="replace")
+
+    def read_page(self, offset: int, size: int) -> dict[str, Any]:
+        """
+        Return ``size`` bytes of the log starting at byte ``offset``
+
+        Args:
+            offset (int): Byte offset to start reading from
+            size (int): Maximum number of bytes to read
+
+        Returns:
+            dict: The page text, its offset, the offset of the next page and the file size
+        """
+        if not self.path.exists():
+            return {"offset": offset, "next_offset": offset, "size": 0, "data": ""}
+        with open(self.path, "rb") as f:
+            file_size = f.seek(0, os.SEEK_END)
+            f.seek(max(offset, 0))
+            data = f.read(max(size, 0))
+        return {
+            "offset": offset,
+            "next_offset": offset + len(data),
+            "size": file_size,
+            "data": data.decode(errors="replace"),
+        }
+
+
+async def close_activity_logs() -> None:
+    """Flush every activity log of the process"""
+    for log in list(_logs):
+        await log.flush()
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    for log in list(_logs):
+        log.flush_sync()
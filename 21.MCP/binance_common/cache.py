@@ -0,0 +1,170 @@
+"""
+In-process TTL cache with request coalescing for the Binance MCP servers.
+
+Concurrent misses for the same key share a single in-flight fetch, so a burst of
+agent traffic costs one upstream call per symbol and freshness window.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable
+
+# Ventanas de frescura por tool (segundos)
+PRICE_TTL = float(os.environ.get("BINANCE_PRICE_TTL", "5"))
+PRICE_CHANGE_TTL = float(os.environ.get("BINANCE_PRICE_CHANGE_TTL", "30"))
+
+
+class TTLCache:
+    """
+    Cache whose entries expire ``ttl`` seconds after being fetched.
+    """
+
+    def __init__(self, name: str, ttl: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            name (str): Name used when reporting statistics
+            ttl (float): Freshness window of every entry in seconds
+            clock (Callable): Monotonic clock, injectable for tests
+        """
+        self.name = name
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: dict[str, tuple[float, Any]] = {}  # {key: (expires_at, value)}
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key: str) -> Any | None:
+        """
+        Return the cached value for ``key`` if it is still fresh
+
+        Args:
+            key (str): The cache key
+
+        Returns:
+            Any | None: The cached value or None when missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store ``value`` under ``key`` starting a new freshness window"""
+        self._entries[key] = (self._clock() + self.ttl, value)
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value or fetch it, coalescing concurrent misses
+
+        Args:
+            key (str): The cache key (a resolved symbol)
+            fetch (Callable): Coroutine factory that loads the value upstream
+
+        Returns:
+            Any: The cached or freshly fetched value
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._load(key, fetch))
+            self._inflight[key] = task
+        else:
+            self.coalesced += 1
+        # shield: si un cliente cancela su llamada, los demás siguen esperando la misma petición
+        return await asyncio.shield(task)
+
+    async def get_many_or_fetch(
+        self,
+        keys: list[str],
+        fetch_many: Callable[[list[str]], Awaitable[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        """
+        Return the values of several keys fetching every miss in a single call
+
+        Args:
+            keys (list[str]): The cache keys (resolved symbols)
+            fetch_many (Callable): Coroutine factory that loads the given keys
+                upstream in one request and returns them as ``{key: value}``
+
+        Returns:
+            dict: ``{key: value}`` in the order of ``keys`` (duplicates removed)
+        """
+        results: dict[str, Any] = {}
+        waiting: dict[str, asyncio.Task] = {}
+        missing: list[str] = []
+        for key in dict.fromkeys(keys):
+            value = self.get(key)
+            if value is not None:
+                self.hits += 1
+                results[key] = value
+            elif key in self._inflight:
+                self.coalesced += 1
+                waiting[key] = self._inflight[key]
+            else:
+                self.misses += 1
+                missing.append(key)
+
+        if missing:
+            batch = asyncio.ensure_future(fetch_many(missing))
+            for key in missing:
+                task = asyncio.ensure_future(
+                    self._load(key, lambda key=key: self._pick(batch, key))
+                )
+                self._inflight[key] = task
+                waiting[key] = task
+
+        values = await asyncio.gather(*(asyncio.shield(task) for task in waiting.values()))
+        results.update(zip(waiting, values))
+        return {key: results[key] for key in dict.fromkeys(keys)}
+
+    @staticmethod
+    async def _pick(batch: asyncio.Future, key: str) -> Any:
+        values = await asyncio.shield(batch)
+        return values[key]
+
+    async def _load(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await fetch()
+            self.set(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Return the hit/miss counters of the cache
+
+        Returns:
+            dict: Counters, hit rate and number of cached entries
+        """
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "name": self.name,
+            "ttl": self.ttl,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
+
+
+price_cache = TTLCache("price", PRICE_TTL)
+price_change_cache = TTLCache("price_change", PRICE_CHANGE_TTL)
+
+
+def cache_stats() -> list[dict[str, Any]]:
+    """Return the statistics of every cache of the server"""
+    return [price_cache.stats(), price_change_cache.stats()]
@@ -0,0 +1,124 @@
+"""
+Shared asynchronous HTTP client for the Binance MCP servers.
+
+Every server process keeps a single keep-alive ``httpx.AsyncClient`` so that tool
+calls reuse TCP/TLS connections and never block the FastMCP event loop.
+"""
+
+import json
+import os
+from typing import Any
+
+import httpx
+
+from binance_common.metrics import metrics
+from binance_common.rate_limit import RateLimitError, limiter_for, request_weight
+
+# Se pueden redirigir a un Binance falso (ver bench/fake_binance.py)
+BINANCE_API_URL = os.environ.get("BINANCE_API_URL", "https://api.binance.com/api/v3")
+BINANCE_DATA_API_URL = os.environ.get(
+    "BINANCE_DATA_API_URL", "https://data-api.binance.vision/api/v3"
+)
+
+# Se pueden ajustar con variables de entorno (por ejemplo en el .env)
+HTTP_TIMEOUT = float(os.environ.get("BINANCE_HTTP_TIMEOUT", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("BINANCE_HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_MAX_CONNECTIONS = int(os.environ.get("BINANCE_HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.environ.get("BINANCE_HTTP_MAX_KEEPALIVE_CONNECTIONS", "10")
+)
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide HTTP client, creating it on first use
+
+    Returns:
+        httpx.AsyncClient: The shared keep-alive client
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+            event_hooks={"request": [metrics.on_request], "response": [metrics.on_response]},
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared HTTP client and release its pooled connections"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def request(url: str, params: dict[str, Any] | None = None) -> httpx.Response:
+    """
+    Perform a GET request with the shared client within Binance's weight limit
+
+    The call waits in the rate limiter queue if needed and, if Binance still answers
+    429/418, it is retried once after the ``Retry-After`` delay.
+
+    Args:
+        url (str): The URL to request
+        params (dict): Optional query string parameters
+
+    Returns:
+        httpx.Response: The response
+
+    Raises:
+        RateLimitError: If the weight limit does not allow the call soon enough
+    """
+    limiter = limiter_for(url)
+    weight = request_weight(url, params)
+    for attempt in range(2):
+        await limiter.acquire(weight)
+        response = await get_client().get(url, params=params)
+        limiter.update(response.status_code, response.headers)
+        if response.status_code not in (418, 429):
+            return response
+    raise RateLimitError(float(response.headers.get("retry-after", 60)))
+
+
+async def get_json(url: str, params: dict[str, Any] | None = None) -> Any:
+    """
+    Perform a rate-limited GET request and decode the JSON body
+
+    Args:
+        url (str): The URL to request
+        params (dict): Optional query string parameters
+
+    Returns:
+        Any: The decoded JSON response
+
+    Raises:
+        httpx.HTTPStatusError: If the response status is not 2xx
+        RateLimitError: If the weight limit does not allow the call soon enough
+    """
+    response = await request(url, params)
+    response.raise_for_status()
+    return response.json()
+
+
+async def get_json_by_symbol(url: str, symbols: list[str]) -> dict[str, Any]:
+    """
+    Fetch a ticker endpoint for several symbols in a single round trip
+
+    Args:
+        url (str): A Binance ticker endpoint accepting the ``symbols`` parameter
+        symbols (list[str]): The resolved symbols to request
+
+    Returns:
+        dict: ``{symbol: ticker}`` with one entry per returned symbol
+    """
+    # Binance espera el parámetro como un array JSON sin espacios: ["BTCUSDT","ETHUSDT"]
+    data = await get_json(url, {"symbols": json.dumps(symbols, separators=(",", ":"))})
+    return {item["symbol"]: item for item in data}
+
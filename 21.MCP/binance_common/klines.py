@@ -0,0 +1,376 @@
+"""
+Historical klines (candlesticks) with a local columnar cache and vectorized indicators.
+
+Every symbol/interval pair is stored as a NumPy structured array in a ``.npy`` file
+that is memory-mapped on read. Only the ranges missing from the file are downloaded,
+so repeated analyses of the same period cost local I/O instead of upstream calls.
+A small JSON file next to it records the ranges already checked upstream, so periods
+without candles (e.g. before the pair was listed) are not requested again and a gap
+between two analysed periods is filled without refetching either of them.
+"""
+
+import asyncio
+import datetime
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from binance_common.client import BINANCE_DATA_API_URL, get_json
+
+KLINES_CACHE_DIR = Path(
+    os.environ.get("BINANCE_KLINES_CACHE_DIR", Path(__file__).parent.parent / ".cache" / "klines")
+)
+KLINES_PAGE_SIZE = 1000  # máximo que admite /api/v3/klines por petición
+KLINES_DEFAULT_CANDLES = 500
+KLINES_MAX_ROWS = 1000  # filas que devuelve como mucho la tool get_klines
+
+MINUTE = 60_000
+INTERVALS = {
+    "1m": MINUTE,
+    "3m": 3 * MINUTE,
+    "5m": 5 * MINUTE,
+    "15m": 15 * MINUTE,
+    "30m": 30 * MINUTE,
+    "1h": 60 * MINUTE,
+    "2h": 120 * MINUTE,
+    "4h": 240 * MINUTE,
+    "6h": 360 * MINUTE,
+    "8h": 480 * MINUTE,
+    "12h": 720 * MINUTE,
+    "1d": 1440 * MINUTE,
+    "3d": 3 * 1440 * MINUTE,
+    "1w": 7 * 1440 * MINUTE,
+}
+YEAR_MS = 365 * 1440 * MINUTE
+
+KLINE_DTYPE = np.dtype(
+    [
+        ("open_time", "i8"),
+        ("open", "f8"),
+        ("high", "f8"),
+        ("low", "f8"),
+        ("close", "f8"),
+        ("volume", "f8"),
+        ("close_time", "i8"),
+        ("quote_volume", "f8"),
+        ("trades", "i8"),
+    ]
+)
+
+
+def parse_time(value: str | int | None, default: int) -> int:
+    """
+    Convert a date to milliseconds since the epoch
+
+    Args:
+        value (str | int | None): ISO date ("2025-01-31", "2025-01-31T12:00"),
+            milliseconds, or None
+        default (int): Value returned when ``value`` is empty
+
+    Returns:
+        int: Milliseconds since the epoch (UTC)
+    """
+    if value is None or value == "":
+        return default
+    if isinstance(value, int) or str(value).isdigit():
+        return int(value)
+    moment = datetime.datetime.fromisoformat(str(value))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.UTC)
+    return int(moment.timestamp() * 1000)
+
+
+def merge_ranges(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Sort inclusive ``(first, last)`` ranges and join the ones that overlap or touch"""
+    merged: list[tuple[int, int]] = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def missing_ranges(covered: list[tuple[int, int]], start: int, end: int) -> list[tuple[int, int]]:
+    """Parts of ``[start, end]`` outside the sorted, disjoint ``covered`` ranges"""
+    missing = []
+    for first, last in covered:
+        if start > end or first > end:
+            break
+        if last < start:
+            continue
+        if first > start:
+            missing.append((start, first - 1))
+        start = last + 1
+    if start <= end:
+        missing.append((start, end))
+    return missing
+
+
+def to_array(rows: list[list[Any]]) -> np.ndarray:
+    """Convert the rows returned by /api/v3/klines into a structured array"""
+    return np.array(
+        [
+            (row[0], row[1], row[2], row[3], row[4], row[5], row[6], row[7], row[8])
+            for row in rows
+        ],
+        dtype=KLINE_DTYPE,
+    )
+
+
+class KlineStore:
+    """
+    On-disk cache of klines, one memory-mapped ``.npy`` file per symbol and interval.
+    """
+
+    def __init__(self, cache_dir: Path = KLINES_CACHE_DIR):
+        """
+        Args:
+            cache_dir (Path): Folder where the ``.npy`` files are kept
+        """
+        self.cache_dir = Path(cache_dir)
+        self._locks: dict[tuple[str, str], asyncio.Lock] = {}
+        self.upstream_calls = 0
+
+    def path(self, symbol: str, interval: str) -> Path:
+        return self.cache_dir / f"{symbol}_{interval}.npy"
+
+    def coverage_path(self, symbol: str, interval: str) -> Path:
+        return self.cache_dir / f"{symbol}_{interval}.json"
+
+    def load_coverage(self, symbol: str, interval: str) -> list[tuple[int, int]] | None:
+        """
+        Return the open time ranges already checked upstream, cached candles or not
+
+        Returns:
+            list[tuple[int, int]] | None: Sorted, disjoint ``(first, last)`` open times
+                (inclusive), or None if unknown
+        """
+        try:
+            with open(self.coverage_path(symbol, interval), "r") as f:
+                coverage = json.load(f)
+            return merge_ranges([(int(first), int(last)) for first, last in coverage["ranges"]])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _save_coverage(self, symbol: str, interval: str, ranges: list[tuple[int, int]]) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.coverage_path(symbol, interval)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"ranges": [list(r) for r in ranges]}, f)
+        tmp_path.replace(path)
+
+    def load(self, symbol: str, interval: str) -> np.ndarray:
+        """
+        Return the cached klines of a symbol, memory-mapped
+
+        Returns:
+            np.ndarray: Structured array sorted by ``open_time`` (empty if nothing is cached)
+        """
+        path = self.path(symbol, interval)
+        if not path.exists():
+            return np.empty(0, dtype=KLINE_DTYPE)
+        return np.load(path, mmap_mode="r")
+
+    def _save(self, symbol: str, interval: str, klines: np.ndarray) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path(symbol, interval)
+        tmp_path = path.with_suffix(".tmp.npy")
+        np.save(tmp_path, klines)
+        tmp_path.replace(path)
+
+    async def _download(self, symbol: str, interval: str, start: int, end: int) -> np.ndarray:
+        pages = []
+        while start <= end:
+            rows = await get_json(
+                f"{BINANCE_DATA_API_URL}/klines",
+                {
+                    "symbol": symbol,
+                    "interval": interval,
+                    "startTime": start,
+                    "endTime": end,
+                    "limit": KLINES_PAGE_SIZE,
+                },
+            )
+            self.upstream_calls += 1
+            if not rows:
+                break
+            pages.append(to_array(rows))
+            start = rows[-1][0] + INTERVALS[interval]
+            if len(rows) < KLINES_PAGE_SIZE:
+                break
+        if not pages:
+            return np.empty(0, dtype=KLINE_DTYPE)
+        return np.concatenate(pages)
+
+    async def sync(self, symbol: str, interval: str, start: int, end: int) -> np.ndarray:
+        """
+        Make sure the range is cached, downloading only the missing parts
+
+        Args:
+            symbol (str): The resolved symbol
+            interval (str): One of ``INTERVALS``
+            start (int): First open time in milliseconds
+            end (int): Last open time in milliseconds
+
+        Returns:
+            np.ndarray: The klines with an open time within ``[start, end]``
+        """
+        if interval not in INTERVALS:
+            raise ValueError(f"Unsupported interval '{interval}'. Use one of: {', '.join(INTERVALS)}")
+        step = INTERVALS[interval]
+        lock = self._locks.setdefault((symbol, interval), asyncio.Lock())
+        async with lock:
+            cached = await asyncio.to_thread(self.load, symbol, interval)
+            coverage = await asyncio.to_thread(self.load_coverage, symbol, interval)
+            # Solo se guardan velas cerradas: la vela en curso se vuelve a pedir
+            last_closed = (int(time.time() * 1000) // step - 1) * step
+            end = min(end, last_closed)
+
+            # Rangos ya consultados a Binance: pueden tener huecos entre sí y periodos sin velas
+            if coverage is None:
+                # Velas guardadas sin su cobertura (p. ej. si el proceso murió entre los dos ficheros)
+                coverage = [(int(cached["open_time"][0]), int(cached["open_time"][-1]))] if len(cached) else []
+            missing = missing_ranges(coverage, start, end)
+
+            downloaded = [await self._download(symbol, interval, a, b) for a, b in missing]
+            downloaded = [part for part in downloaded if len(part)]
+            if downloaded:
+                merged = np.concatenate([np.asarray(cached), *downloaded])
+                merged = merged[merged["close_time"] < int(time.time() * 1000)]
+                merged.sort(order="open_time")
+                _, unique = np.unique(merged["open_time"], return_index=True)
+                cached = merged[unique]
+                await asyncio.to_thread(self._save, symbol, interval, cached)
+            if missing:
+                # Después de guardar las velas, para no dar por consultado lo que no llegó al disco
+                await asyncio.to_thread(self._save_coverage, symbol, interval, merge_ranges(coverage + missing))
+
+        times = cached["open_time"]
+        first = np.searchsorted(times, start, side="left")
+        last = np.searchsorted(times, end, side="right")
+        return cached[first:last]
+
+
+def sma(values: np.ndarray, window: int) -> np.ndarray:
+    """Simple moving average (NaN until ``window`` values are available)"""
+    out = np.full(len(values), np.nan)
+    if window <= 0 or len(values) < window:
+        return out
+    sums = np.cumsum(np.insert(values.astype(float), 0, 0.0))
+    out[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return out
+
+
+def _ewm(values: np.ndarray, alpha: float, initial: float) -> np.ndarray:
+    """
+    Exponential smoothing ``y[k] = (1 - alpha) * y[k - 1] + alpha * x[k]`` with ``y[-1] = initial``
+
+    The recurrence is solved in closed form over blocks short enough for the
+    powers of ``1 - alpha`` not to overflow.
+    """
+    values = np.asarray(values, dtype=float)
+    out = np.empty(len(values))
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[:] = values
+        return out
+    block = int(max(1, min(4096, 150 / -np.log10(decay))))
+    previous = initial
+    for begin in range(0, len(values), block):
+        chunk = values[begin:begin + block]
+        powers = decay ** np.arange(1, len(chunk) + 1)
+        out[begin:begin + len(chunk)] = powers * (previous + alpha * np.cumsum(chunk / powers))
+        previous = out[begin + len(chunk) - 1]
+    return out
+
+
+def ema(values: np.ndarray, window: int) -> np.ndarray:
+    """Exponential moving average seeded with the first value (like pandas ``adjust=False``)"""
+    if len(values) == 0:
+        return np.empty(0)
+    return _ewm(values, 2.0 / (window + 1), float(values[0]))
+
+
+def rsi(values: np.ndarray, window: int = 14) -> np.ndarray:
+    """Relative Strength Index with Wilder's smoothing (NaN for the first ``window`` values)"""
+    out = np.full(len(values), np.nan)
+    changes = np.diff(np.asarray(values, dtype=float))
+    if window <= 0 or len(changes) < window:
+        return out
+    gains = np.clip(changes, 0, None)
+    losses = np.clip(-changes, 0, None)
+    alpha = 1.0 / window
+    avg_gain = np.concatenate([[gains[:window].mean()], _ewm(gains[window:], alpha, gains[:window].mean())])
+    avg_loss = np.concatenate([[losses[:window].mean()], _ewm(losses[window:], alpha, losses[:window].mean())])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[window:] = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+    return out
+
+
+def volatility(values: np.ndarray, window: int, interval: str) -> np.ndarray:
+    """Rolling annualized volatility of the log returns (NaN until ``window`` returns)"""
+    out = np.full(len(values), np.nan)
+    returns = np.diff(np.log(np.asarray(values, dtype=float)))
+    if window < 2 or len(returns) < window:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(returns, window)
+    out[window:] = windows.std(axis=1, ddof=1) * np.sqrt(YEAR_MS / INTERVALS[interval])
+    return out
+
+
+def default_range(interval: str, start: str | int | None, end: str | int | None) -> tuple[int, int]:
+    """Resolve the requested range, defaulting to the last ``KLINES_DEFAULT_CANDLES`` candles"""
+    end_ms = parse_time(end, int(time.time() * 1000))
+    start_ms = parse_time(start, end_ms - KLINES_DEFAULT_CANDLES * INTERVALS.get(interval, MINUTE))
+    return start_ms, end_ms
+
+
+def klines_summary(symbol: str, interval: str, klines: np.ndarray) -> dict[str, Any]:
+    """Format cached klines for a tool response, keeping at most ``KLINES_MAX_ROWS`` rows"""
+    rows = klines[-KLINES_MAX_ROWS:]
+    columns = ["open_time", "open", "high", "low", "close", "volume"]
+    return {
+        "symbol": symbol,
+        "interval": interval,
+        "count": len(klines),
+        "truncated": len(klines) > len(rows),
+        "columns": columns,
+        "rows": [[row[column].item() for column in columns] for row in rows],
+    }
+
+
+def indicators_summary(symbol: str, interval: str, klines: np.ndarray, window: int) -> dict[str, Any]:
+    """Compute SMA, EMA, RSI and volatility over the closes and return their latest values"""
+    close = np.asarray(klines["close"], dtype=float)
+    if len(close) == 0:
+        return {"symbol": symbol, "interval": interval, "count": 0}
+
+    def last(series: np.ndarray) -> float | None:
+        value = series[-1]
+        return None if np.isnan(value) else round(float(value), 8)
+
+    return {
+        "symbol": symbol,
+        "interval": interval,
+        "count": len(close),
+        "window": window,
+        "from": int(klines["open_time"][0]),
+        "to": int(klines["open_time"][-1]),
+        "close": float(close[-1]),
+        "change_percent": round(float((close[-1] / close[0] - 1) * 100), 4),
+        "high": float(np.max(klines["high"])),
+        "low": float(np.min(klines["low"])),
+        "sma": last(sma(close, window)),
+        "ema": last(ema(close, window)),
+        "rsi": last(rsi(close, window)),
+        "volatility": last(volatility(close, window, interval)),
+    }
+
+
+kline_store = KlineStore()
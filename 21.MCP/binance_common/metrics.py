@@ -0,0 +1,234 @@
+"""
+Lightweight instrumentation of the Binance MCP servers.
+
+Counts calls and errors and keeps fixed-bucket latency histograms for every tool and
+resource handler and for every upstream HTTP endpoint. Recording a sample is a dict
+lookup and a bisect, cheap enough to leave on in production. The registry is
+rendered in the Prometheus text format or as JSON.
+"""
+
+import bisect
+import functools
+import inspect
+import time
+from typing import Any
+
+from binance_common.cache import price_cache, price_change_cache
+from binance_common.rate_limit import rate_limit_stats
+
+# Límites superiores (segundos) de los buckets de los histogramas
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PREFIX = "binance_mcp"
+
+
+class Histogram:
+    """
+    Latency histogram with the fixed ``BUCKETS``.
+    """
+
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # el último bucket es +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket containing the ``q`` quantile (None if empty or +Inf)"""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum_seconds": self.sum,
+            "mean_seconds": self.sum / self.count if self.count else None,
+            "p50_seconds": self.quantile(0.50),
+            "p95_seconds": self.quantile(0.95),
+            "p99_seconds": self.quantile(0.99),
+        }
+
+
+class Metrics:
+    """
+    Registry of handler and upstream metrics of a server process.
+    """
+
+    def __init__(self):
+        self.calls: dict[tuple[str, str], int] = {}
+        self.errors: dict[tuple[str, str], int] = {}
+        self.handler_latency: dict[tuple[str, str], Histogram] = {}
+        self.upstream_responses: dict[tuple[str, int], int] = {}
+        self.upstream_latency: dict[str, Histogram] = {}
+        self.started_at = time.time()
+
+    def observe_handler(self, kind: str, name: str, seconds: float, error: bool) -> None:
+        key = (kind, name)
+        self.calls[key] = self.calls.get(key, 0) + 1
+        if error:
+            self.errors[key] = self.errors.get(key, 0) + 1
+        histogram = self.handler_latency.get(key)
+        if histogram is None:
+            histogram = self.handler_latency[key] = Histogram()
+        histogram.observe(seconds)
+
+    def observe_upstream(self, endpoint: str, status: int, seconds: float) -> None:
+        key = (endpoint, status)
+        self.upstream_responses[key] = self.upstream_responses.get(key, 0) + 1
+        histogram = self.upstream_latency.get(endpoint)
+        if histogram is None:
+            histogram = self.upstream_latency[endpoint] = Histogram()
+        histogram.observe(seconds)
+
+    # Hooks de httpx: miden el tiempo hasta recibir las cabeceras de la respuesta
+    async def on_request(self, request) -> None:
+        request.extensions["metrics_start"] = time.perf_counter()
+
+    async def on_response(self, response) -> None:
+        start = response.request.extensions.get("metrics_start")
+        if start is not None:
+            endpoint = response.request.url.path.rsplit("/api/v3/", 1)[-1]
+            self.observe_upstream(endpoint, response.status_code, time.perf_counter() - start)
+
+    def to_json(self) -> dict[str, Any]:
+        """
+        Return every metric as a JSON-serializable dict
+        """
+        return {
+            "uptime_seconds": time.time() - self.started_at,
+            "handlers": [
+                {
+                    "kind": kind,
+                    "name": name,
+                    "calls": self.calls.get((kind, name), 0),
+                    "errors": self.errors.get((kind, name), 0),
+                    **histogram.to_dict(),
+                }
+                for (kind, name), histogram in sorted(self.handler_latency.items())
+            ],
+            "upstream": [
+                {
+                    "endpoint": endpoint,
+                    "responses": {
+                        str(status): count
+                        for (name, status), count in sorted(self.upstream_responses.items())
+                        if name == endpoint
+                    },
+                    **histogram.to_dict(),
+                }
+                for endpoint, histogram in sorted(self.upstream_latency.items())
+            ],
+            "caches": [price_cache.stats(), price_change_cache.stats()],
+            "rate_limits": rate_limit_stats(),
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        Return every metric in the Prometheus text exposition format
+        """
+        lines: list[str] = []
+
+        def header(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+
+        def histogram_lines(name: str, labels: str, histogram: Histogram) -> None:
+            cumulative = 0
+            for bound, count in zip(BUCKETS + (float("inf"),), histogram.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{PREFIX}_{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{PREFIX}_{name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{PREFIX}_{name}_count{{{labels}}} {histogram.count}")
+
+        header("handler_calls_total", "counter", "Tool and resource calls.")
+        for (kind, name), count in sorted(self.calls.items()):
+            lines.append(f'{PREFIX}_handler_calls_total{{kind="{kind}",name="{name}"}} {count}')
+        header("handler_errors_total", "counter", "Tool and resource calls that raised an error.")
+        for (kind, name), count in sorted(self.errors.items()):
+            lines.append(f'{PREFIX}_handler_errors_total{{kind="{kind}",name="{name}"}} {count}')
+        header("handler_duration_seconds", "histogram", "Time spent in tool and resource handlers.")
+        for (kind, name), histogram in sorted(self.handler_latency.items()):
+            histogram_lines("handler_duration_seconds", f'kind="{kind}",name="{name}"', histogram)
+
+        header("upstream_responses_total", "counter", "Responses received from Binance.")
+        for (endpoint, status), count in sorted(self.upstream_responses.items()):
+            lines.append(f'{PREFIX}_upstream_responses_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+        header("upstream_duration_seconds", "histogram", "Time until Binance answered.")
+        for endpoint, histogram in sorted(self.upstream_latency.items()):
+            histogram_lines("upstream_duration_seconds", f'endpoint="{endpoint}"', histogram)
+
+        for field, help_text in (
+            ("hits", "Lookups answered from the cache."),
+            ("misses", "Lookups that went upstream."),
+            ("coalesced", "Lookups that joined an in-flight request."),
+        ):
+            header(f"cache_{field}_total", "counter", help_text)
+            for cache in (price_cache, price_change_cache):
+                lines.append(f'{PREFIX}_cache_{field}_total{{cache="{cache.name}"}} {getattr(cache, field)}')
+
+        limits = rate_limit_stats()
+        for field, help_text in (
+            ("throttled", "Upstream calls that waited for request weight."),
+            ("rejected", "Upstream calls rejected by the rate limiter."),
+        ):
+            header(f"rate_limit_{field}_total", "counter", help_text)
+            for host, stats in sorted(limits.items()):
+                lines.append(f'{PREFIX}_rate_limit_{field}_total{{host="{host}"}} {stats[field]}')
+        return "\n".join(lines) + "\n"
+
+
+def instrument(kind: str):
+    """
+    Decorator that records calls, errors and latency of a tool or resource handler
+
+    Args:
+        kind (str): "tool" or "resource"
+    """
+
+    def decorator(fn):
+        name = fn.__name__
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                error = True
+                try:
+                    result = await fn(*args, **kwargs)
+                    error = False
+                    return result
+                finally:
+                    metrics.observe_handler(kind, name, time.perf_counter() - start, error)
+
+        else:
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                error = True
+                try:
+                    result = fn(*args, **kwargs)
+                    error = False
+                    return result
+                finally:
+                    metrics.observe_handler(kind, name, time.perf_counter() - start, error)
+
+        return wrapper
+
+    return decorator
+
+
+metrics = Metrics()
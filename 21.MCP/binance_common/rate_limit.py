@@ -0,0 +1,202 @@
+"""
+Request-weight aware rate limiting for the upstream Binance calls.
+
+Binance limits every IP to a request weight per minute and answers 429 (and then
+418, a temporary ban) when it is exceeded. A token bucket per host throttles the
+requests before that happens, is kept in sync with the ``X-MBX-USED-WEIGHT-1M``
+header, and serves interactive tool calls before background refreshes. Requests
+that cannot be served within ``max_wait`` fail with a clear ``RateLimitError``.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Callable
+from urllib.parse import urlparse
+
+WEIGHT_LIMIT_PER_MINUTE = int(os.environ.get("BINANCE_WEIGHT_LIMIT", "6000"))
+# Fracción del límite que se usa, para dejar margen a otros procesos en la misma IP
+WEIGHT_SAFETY_FACTOR = float(os.environ.get("BINANCE_WEIGHT_SAFETY_FACTOR", "0.9"))
+RATE_LIMIT_MAX_WAIT = float(os.environ.get("BINANCE_RATE_LIMIT_MAX_WAIT", "10"))
+DEFAULT_RETRY_AFTER = 60.0
+
+INTERACTIVE = 0
+BACKGROUND = 1
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("binance_request_priority", default=INTERACTIVE)
+
+
+class RateLimitError(Exception):
+    """Raised when Binance's request-weight limit does not allow a call soon enough."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(
+            f"Binance rate limit reached. Try again in {retry_after:.0f} seconds."
+        )
+
+
+@contextmanager
+def background_priority():
+    """Run the upstream calls made inside the block behind interactive ones"""
+    token = _priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def request_weight(url: str, params: dict[str, Any] | None = None) -> int:
+    """
+    Return the request weight Binance charges for a call
+
+    Args:
+        url (str): The endpoint URL
+        params (dict): The query string parameters
+
+    Returns:
+        int: The request weight
+    """
+    params = params or {}
+    path = urlparse(url).path.rsplit("/api/v3/", 1)[-1]
+    if path == "exchangeInfo":
+        return 20
+    if path in ("ticker/price", "ticker/24hr"):
+        if "symbol" in params:
+            return 2
+        if "symbols" not in params:
+            return 4 if path == "ticker/price" else 80
+        if path == "ticker/price":
+            return 4
+        count = params["symbols"].count(",") + 1
+        return 2 if count <= 20 else 40 if count <= 100 else 80
+    return 2
+
+
+class WeightLimiter:
+    """
+    Token bucket over the request weight of one host, with a priority queue.
+    """
+
+    def __init__(
+        self,
+        limit_per_minute: int = WEIGHT_LIMIT_PER_MINUTE,
+        safety_factor: float = WEIGHT_SAFETY_FACTOR,
+        max_wait: float = RATE_LIMIT_MAX_WAIT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            limit_per_minute (int): The request weight allowed by Binance per minute
+            safety_factor (float): Fraction of the limit this process may use
+            max_wait (float): Seconds a call may wait in the queue before failing
+            clock (Callable): Monotonic clock, injectable for tests
+        """
+        self.capacity = limit_per_minute * safety_factor
+        self.rate = self.capacity / 60.0
+        self.max_wait = max_wait
+        self._clock = clock
+        self.tokens = self.capacity
+        self._updated = clock()
+        self.blocked_until = 0.0
+        self._waiters: list[tuple[int, int, float, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self.throttled = 0
+        self.rejected = 0
+
+    def _refill(self) -> float:
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return now
+
+    async def acquire(self, weight: float) -> None:
+        """
+        Wait until ``weight`` can be spent without exceeding the limit
+
+        Raises:
+            RateLimitError: If the call cannot be sent within ``max_wait`` seconds
+        """
+        weight = min(weight, self.capacity)
+        now = self._refill()
+        if self.blocked_until - now > self.max_wait:
+            self.rejected += 1
+            raise RateLimitError(self.blocked_until - now)
+        if not self._waiters and now >= self.blocked_until and self.tokens >= weight:
+            self.tokens -= weight
+            return
+
+        self.throttled += 1
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (_priority.get(), next(self._seq), weight, future))
+        self._drain()
+        try:
+            await asyncio.wait_for(future, self.max_wait)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise RateLimitError(max(self.blocked_until - self._clock(), weight / self.rate)) from None
+
+    def _drain(self) -> None:
+        self._timer = None
+        now = self._refill()
+        while self._waiters:
+            priority, _, weight, future = self._waiters[0]
+            if future.done():
+                # Cancelada o caducada mientras esperaba
+                heapq.heappop(self._waiters)
+                continue
+            if now < self.blocked_until or self.tokens < weight:
+                delay = max(self.blocked_until - now, (weight - self.tokens) / self.rate)
+                self._timer = asyncio.get_running_loop().call_later(delay, self._drain)
+                return
+            heapq.heappop(self._waiters)
+            self.tokens -= weight
+            future.set_result(None)
+
+    def update(self, status_code: int, headers) -> None:
+        """
+        Synchronize the bucket with the weight Binance reports in a response
+
+        Args:
+            status_code (int): The response status
+            headers (Mapping): The response headers
+        """
+        self._refill()
+        used = headers.get("x-mbx-used-weight-1m")
+        if used is not None:
+            self.tokens = min(self.tokens, max(0.0, self.capacity - float(used)))
+        if status_code in (418, 429):
+            retry_after = float(headers.get("retry-after", DEFAULT_RETRY_AFTER))
+            self.blocked_until = self._clock() + retry_after
+            self.tokens = 0.0
+
+    def stats(self) -> dict[str, Any]:
+        self._refill()
+        return {
+            "capacity": self.capacity,
+            "tokens": self.tokens,
+            "queued": sum(1 for *_, future in self._waiters if not future.done()),
+            "blocked_for": max(0.0, self.blocked_until - self._clock()),
+            "throttled": self.throttled,
+            "rejected": self.rejected,
+        }
+
+
+_limiters: dict[str, WeightLimiter] = {}
+
+
+def limiter_for(url: str) -> WeightLimiter:
+    """Return the limiter of the host of ``url`` (the weight is counted per host)"""
+    host = urlparse(url).netloc
+    limiter = _limiters.get(host)
+    if limiter is None:
+        limiter = _limiters[host] = WeightLimiter()
+    return limiter
+
+
+def rate_limit_stats() -> dict[str, dict[str, Any]]:
+    return {host: limiter.stats() for host, limiter in _limiters.items()}
@@ -0,0 +1,93 @@
+"""
+Lifespan, concurrency limit and entry point shared by the Binance MCP servers.
+"""
+
+import argparse
+import asyncio
+import functools
+import os
+from contextlib import asynccontextmanager
+
+from binance_common.activity_log import close_activity_logs
+from binance_common.client import close_client
+from binance_common.stream import ticker_stream
+from binance_common.symbols import symbol_index
+
+TRANSPORTS = ["stdio", "sse", "streamable-http", "prefork"]
+MCP_TRANSPORT = os.environ.get("BINANCE_MCP_TRANSPORT", "stdio")
+MCP_HOST = os.environ.get("BINANCE_MCP_HOST", "127.0.0.1")
+MCP_PORT = int(os.environ.get("BINANCE_MCP_PORT", "8000"))
+# Llamadas a tools que se atienden a la vez; el resto esperan en cola
+MAX_CONCURRENT_CALLS = int(os.environ.get("BINANCE_MCP_MAX_CONCURRENT_CALLS", "32"))
+
+_call_slots = asyncio.Semaphore(MAX_CONCURRENT_CALLS)
+_active_sessions = 0
+
+
+@asynccontextmanager
+async def lifespan(server):
+    """
+    Start the optional background subsystems and release them on shutdown
+
+    With the HTTP transports FastMCP enters the lifespan once per client session,
+    so the shared subsystems are started by the first session and released when
+    the last one ends.
+    """
+    global _active_sessions
+    if _active_sessions == 0:
+        symbol_index.start()
+        ticker_stream.start()
+    _active_sessions += 1
+    try:
+        yield {}
+    finally:
+        _active_sessions -= 1
+        if _active_sessions == 0:
+            await ticker_stream.stop()
+            await close_client()
+            await close_activity_logs()
+
+
+def limit_concurrency(fn):
+    """
+    Decorator that caps the number of tool calls running at the same time
+
+    Calls over ``BINANCE_MCP_MAX_CONCURRENT_CALLS`` wait for a free slot instead of failing.
+    """
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        async with _call_slots:
+            return await fn(*args, **kwargs)
+
+    return wrapper
+
+
+def run(mcp) -> None:
+    """
+    Run a FastMCP server with the transport selected on the command line
+
+    ``python 21.MCP/21.a-.binance_mcp_w_tools.py --transport streamable-http --port 8000``
+    lets one server process (and its caches and connections) serve many clients,
+    and ``--transport prefork`` keeps warm stdio workers on a Unix socket (see ``warm.py``).
+
+    Args:
+        mcp (FastMCP): The server to run
+    """
+    parser = argparse.ArgumentParser(description=mcp.name)
+    parser.add_argument("--transport", choices=TRANSPORTS, default=MCP_TRANSPORT)
+    parser.add_argument("--host", default=MCP_HOST)
+    parser.add_argument("--port", type=int, default=MCP_PORT)
+    parser.add_argument("--socket", help="Unix socket of the prefork transport")
+    parser.add_argument("--workers", type=int, help="Idle workers of the prefork transport")
+    args = parser.parse_args()
+
+    if args.transport == "prefork":
+        from binance_common.warm import MCP_SOCKET, PREFORK_WORKERS, serve
+
+        serve(mcp, args.socket or MCP_SOCKET, args.workers or PREFORK_WORKERS)
+        return
+
+    mcp.settings.host = args.host
+    mcp.settings.port = args.port
+    mcp.run(transport=args.transport)
@@ -0,0 +1,180 @@
+"""
+Optional WebSocket ticker feed for the Binance MCP servers.
+
+A background task subscribes to the ``<symbol>@ticker`` streams and writes every
+tick into the price caches, so ``get_price`` and ``get_price_price_change`` are
+answered from memory. When the stream stops delivering, the cache entries expire
+after their TTL and the tools fall back to REST automatically.
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Callable
+
+from binance_common.cache import TTLCache, price_cache, price_change_cache
+
+STREAM_URL = os.environ.get("BINANCE_STREAM_URL", "wss://stream.binance.com:9443")
+# Lista separada por comas, p. ej. "BTCUSDT,ETHUSDT". Vacía = stream desactivado
+STREAM_SYMBOLS = [
+    symbol.strip().upper()
+    for symbol in os.environ.get("BINANCE_STREAM_SYMBOLS", "").split(",")
+    if symbol.strip()
+]
+STREAM_MAX_RECONNECT_DELAY = 30.0
+
+# Campos del evento 24hrTicker del stream -> campos de /api/v3/ticker/24hr
+TICKER_FIELDS = {
+    "s": "symbol",
+    "p": "priceChange",
+    "P": "priceChangePercent",
+    "w": "weightedAvgPrice",
+    "x": "prevClosePrice",
+    "c": "lastPrice",
+    "Q": "lastQty",
+    "b": "bidPrice",
+    "B": "bidQty",
+    "a": "askPrice",
+    "A": "askQty",
+    "o": "openPrice",
+    "h": "highPrice",
+    "l": "lowPrice",
+    "v": "volume",
+    "q": "quoteVolume",
+    "O": "openTime",
+    "C": "closeTime",
+    "F": "firstId",
+    "L": "lastId",
+    "n": "count",
+}
+
+
+class TickerStream:
+    """
+    Background subscription to the Binance 24h ticker streams.
+    """
+
+    def __init__(
+        self,
+        symbols: list[str],
+        url: str = STREAM_URL,
+        price_cache: TTLCache = price_cache,
+        price_change_cache: TTLCache = price_change_cache,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            symbols (list[str]): The resolved symbols to subscribe to
+            url (str): Base URL of the stream server (a local replay in tests)
+            price_cache (TTLCache): Cache fed with ``{"symbol", "price"}`` entries
+            price_change_cache (TTLCache): Cache fed with 24h ticker entries
+            clock (Callable): Monotonic clock, injectable for tests
+        """
+        self.symbols = [symbol.upper() for symbol in symbols]
+        self.url = url.rstrip("/")
+        self.price_cache = price_cache
+        self.price_change_cache = price_change_cache
+        self._clock = clock
+        self._task: asyncio.Task | None = None
+        self.last_update: dict[str, float] = {}
+        self.messages = 0
+        self.reconnects = 0
+
+    @property
+    def stream_url(self) -> str:
+        streams = "/".join(f"{symbol.lower()}@ticker" for symbol in self.symbols)
+        return f"{self.url}/stream?streams={streams}"
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the background subscription in the running event loop"""
+        if not self.symbols or self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the background subscription and wait for it to finish"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        try:
+            from websockets.asyncio.client import connect
+        except ImportError as e:
+            raise ImportError(
+                "The ticker stream needs the 'websockets' package: pip install websockets"
+            ) from e
+
+        delay = 1.0
+        while True:
+            try:
+                async with connect(self.stream_url) as websocket:
+                    delay = 1.0
+                    async for message in websocket:
+                        self.handle_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Si se cae la conexión, las entradas caducan y las tools usan REST
+                self.reconnects += 1
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, STREAM_MAX_RECONNECT_DELAY)
+
+    def handle_message(self, message: str | bytes) -> None:
+        """
+        Store a tick received from the stream in the price caches
+
+        Args:
+            message (str | bytes): A raw combined-stream message
+        """
+        payload = json.loads(message)
+        data = payload.get("data", payload)
+        if data.get("e") != "24hrTicker":
+            return
+        symbol = data["s"]
+        self.messages += 1
+        self.last_update[symbol] = self._clock()
+        self.price_cache.set(symbol, {"symbol": symbol, "price": data["c"]})
+        self.price_change_cache.set(symbol, to_ticker_24hr(data))
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Return the state of the subscription
+
+        Returns:
+            dict: Subscribed symbols, counters and age in seconds of the last tick
+        """
+        now = self._clock()
+        return {
+            "running": self.running,
+            "symbols": self.symbols,
+            "messages": self.messages,
+            "reconnects": self.reconnects,
+            "age": {symbol: now - updated for symbol, updated in self.last_update.items()},
+        }
+
+
+def to_ticker_24hr(data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Convert a stream 24hrTicker event into the shape returned by the REST API
+
+    Args:
+        data (dict): The stream event
+
+    Returns:
+        dict: The ticker with the field names of ``/api/v3/ticker/24hr``
+    """
+    return {name: data[key] for key, name in TICKER_FIELDS.items() if key in data}
+
+
+ticker_stream = TickerStream(STREAM_SYMBOLS)
@@ -0,0 +1,240 @@
+"""
+Symbol resolution index built from the Binance exchange metadata.
+
+The list of trading pairs is downloaded once from ``/exchangeInfo``, cached on disk
+and refreshed in the background. Names, tickers and common aliases resolve to a
+valid pair with dict lookups, and unknown assets are rejected without a network call.
+"""
+
+import asyncio
+import bisect
+import difflib
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+from binance_common.client import BINANCE_API_URL, get_json
+from binance_common.rate_limit import background_priority
+
+SYMBOL_CACHE_FILE = Path(
+    os.environ.get(
+        "BINANCE_SYMBOL_CACHE_FILE",
+        Path(__file__).parent.parent / ".cache" / "binance_symbols.json",
+    )
+)
+SYMBOL_REFRESH_INTERVAL = float(os.environ.get("BINANCE_SYMBOL_REFRESH_INTERVAL", str(24 * 3600)))
+# Espera mínima entre dos intentos de refresco, para no insistir sin conexión en cada consulta
+SYMBOL_RETRY_INTERVAL = 300.0
+
+# Monedas de cotización preferidas cuando solo se indica el activo base
+PREFERRED_QUOTES = ["USDT", "FDUSD", "USDC", "BTC", "ETH", "BNB", "EUR"]
+
+# Nombres comunes -> activo base
+ASSET_ALIASES = {
+    "bitcoin": "BTC",
+    "ethereum": "ETH",
+    "ether": "ETH",
+    "binance coin": "BNB",
+    "solana": "SOL",
+    "ripple": "XRP",
+    "cardano": "ADA",
+    "dogecoin": "DOGE",
+    "polkadot": "DOT",
+    "litecoin": "LTC",
+    "tron": "TRX",
+    "chainlink": "LINK",
+    "avalanche": "AVAX",
+    "polygon": "POL",
+    "shiba inu": "SHIB",
+    "toncoin": "TON",
+    "stellar": "XLM",
+    "uniswap": "UNI",
+    "cosmos": "ATOM",
+    "monero": "XMR",
+    "bitcoin cash": "BCH",
+    "ethereum classic": "ETC",
+    "near protocol": "NEAR",
+    "aptos": "APT",
+    "arbitrum": "ARB",
+    "optimism": "OP",
+    "pepe": "PEPE",
+    "sui": "SUI",
+}
+
+# Lo que se usaba antes del índice; sirve mientras este no se ha cargado
+LEGACY_SYMBOLS = {"bitcoin": "BTCUSDT", "btc": "BTCUSDT", "ethereum": "ETHUSDT", "eth": "ETHUSDT"}
+
+
+class UnknownSymbolError(ValueError):
+    """Raised when a name does not match any trading pair of the exchange."""
+    pass
+
+
+def normalize(name: str) -> str:
+    """Lower-case a name and drop separators such as ``/``, ``-`` or ``_``"""
+    return re.sub(r"[^a-z0-9 ]", "", name.lower()).strip()
+
+
+class SymbolIndex:
+    """
+    Lookup table from names, tickers and aliases to trading pairs.
+    """
+
+    def __init__(self, cache_file: Path = SYMBOL_CACHE_FILE, refresh_interval: float = SYMBOL_REFRESH_INTERVAL):
+        """
+        Args:
+            cache_file (Path): JSON file where the exchange pairs are cached
+            refresh_interval (float): Age in seconds after which the cache is refreshed
+        """
+        self.cache_file = Path(cache_file)
+        self.refresh_interval = refresh_interval
+        self.fetched_at = 0.0
+        self._attempted_at = 0.0
+        self._lookup: dict[str, str] = {}  # {alias normalizado: símbolo}
+        self._sorted_aliases: list[str] = []
+        self._refresh_task: asyncio.Task | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self._lookup)
+
+    @property
+    def stale(self) -> bool:
+        return time.time() - self.fetched_at > self.refresh_interval
+
+    def build(self, pairs: list[list[str]], fetched_at: float | None = None) -> None:
+        """
+        Build the lookup tables from the exchange trading pairs
+
+        Args:
+            pairs (list[list[str]]): ``[symbol, base_asset, quote_asset]`` of every pair
+            fetched_at (float): Unix time when the pairs were downloaded
+        """
+        lookup: dict[str, str] = {}
+        by_base: dict[str, dict[str, str]] = {}
+        for symbol, base, quote in pairs:
+            lookup[symbol.lower()] = symbol
+            by_base.setdefault(base, {})[quote] = symbol
+
+        for base, quotes in by_base.items():
+            preferred = next((quotes[q] for q in PREFERRED_QUOTES if q in quotes), None)
+            preferred = preferred or quotes[min(quotes)]
+            lookup.setdefault(base.lower(), preferred)
+
+        for alias, base in ASSET_ALIASES.items():
+            if base.lower() in lookup:
+                lookup[alias] = lookup[base.lower()]
+
+        self._lookup = lookup
+        self._sorted_aliases = sorted(lookup)
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+
+    def resolve(self, name: str) -> str:
+        """
+        Resolve a name, ticker or alias to a trading pair
+
+        Args:
+            name (str): e.g. "bitcoin", "btc", "BTCUSDT" or "eth/usdt"
+
+        Returns:
+            str: The trading pair symbol, e.g. "BTCUSDT"
+
+        Raises:
+            UnknownSymbolError: If the name does not match any pair of the exchange
+        """
+        # Un servidor de larga duración no vuelve a pasar por start(): el refresco se lanza desde aquí
+        self._refresh_if_stale()
+        key = normalize(name)
+        if not self.loaded:
+            return LEGACY_SYMBOLS.get(key, name.upper())
+
+        symbol = self._lookup.get(key) or self._lookup.get(key.replace(" ", ""))
+        if symbol is not None:
+            return symbol
+
+        # Prefijo único: "ethere" -> ethereum
+        start = bisect.bisect_left(self._sorted_aliases, key)
+        candidates = set()
+        for alias in self._sorted_aliases[start:]:
+            if not alias.startswith(key):
+                break
+            candidates.add(self._lookup[alias])
+        if len(candidates) == 1:
+            return candidates.pop()
+
+        # Errores de escritura: "etherum" -> ethereum
+        matches = difflib.get_close_matches(key, self._sorted_aliases, n=3, cutoff=0.85)
+        if len({self._lookup[match] for match in matches}) == 1:
+            return self._lookup[matches[0]]
+
+        suggestions = sorted(candidates)[:5] or [self._lookup[match] for match in matches]
+        hint = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""
+        raise UnknownSymbolError(f"Unknown crypto asset '{name}'.{hint}")
+
+    def load_cache(self) -> bool:
+        """
+        Build the index from the on-disk cache
+
+        Returns:
+            bool: True if a cache file was found and loaded
+        """
+        if not self.cache_file.exists():
+            return False
+        with open(self.cache_file, "r") as f:
+            cached = json.load(f)
+        self.build(cached["pairs"], cached["fetched_at"])
+        return True
+
+    async def refresh(self) -> None:
+        """Download the trading pairs from Binance, rebuild the index and save it to disk"""
+        info = await get_json(f"{BINANCE_API_URL}/exchangeInfo", {"symbolStatus": "TRADING"})
+        pairs = [
+            [item["symbol"], item["baseAsset"], item["quoteAsset"]]
+            for item in info["symbols"]
+        ]
+        self.build(pairs)
+        await asyncio.to_thread(self._save_cache, pairs)
+
+    def _save_cache(self, pairs: list[list[str]]) -> None:
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cache_file.with_suffix(".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump({"fetched_at": self.fetched_at, "pairs": pairs}, f)
+        tmp_file.replace(self.cache_file)
+
+    def start(self) -> None:
+        """Load the disk cache and refresh it in the background when missing or stale"""
+        if not self.loaded:
+            try:
+                self.load_cache()
+            except (OSError, ValueError, KeyError):
+                pass
+        self._refresh_if_stale(force=True)
+
+    def _refresh_if_stale(self, force: bool = False) -> None:
+        """Refresh in the background when stale, at most once every SYMBOL_RETRY_INTERVAL unless forced"""
+        if not self.stale or (self._refresh_task is not None and not self._refresh_task.done()):
+            return
+        if not force and time.time() - self._attempted_at < SYMBOL_RETRY_INTERVAL:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Llamada síncrona fuera del servidor: no hay bucle donde refrescar
+            return
+        self._attempted_at = time.time()
+        self._refresh_task = loop.create_task(self._refresh_quietly())
+
+    async def _refresh_quietly(self) -> None:
+        try:
+            # Es una tarea de fondo: las tools interactivas tienen preferencia
+            with background_priority():
+                await self.refresh()
+        except Exception:
+            # Sin conexión se sigue usando la caché (o la resolución básica)
+            pass
+
+
+symbol_index = SymbolIndex()
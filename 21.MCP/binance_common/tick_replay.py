@@ -0,0 +1,124 @@
+"""
+Local stand-in for the Binance ticker stream.
+
+``record`` stores real ticks in a JSON Lines file and ``serve`` replays them over a
+local WebSocket server, so the ticker stream can be exercised without network:
+
+    python -m binance_common.tick_replay record ticks.jsonl BTCUSDT ETHUSDT
+    python -m binance_common.tick_replay serve binance_common/ticks_sample.jsonl
+    BINANCE_STREAM_URL=ws://localhost:8765 BINANCE_STREAM_SYMBOLS=BTCUSDT,ETHUSDT \\
+        python 21.MCP/21.a-.binance_mcp_w_tools.py
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from binance_common.stream import STREAM_URL
+
+
+def load_ticks(path: str | Path) -> list[dict]:
+    """
+    Read a recording made with ``record``
+
+    Args:
+        path (str | Path): The JSON Lines file, one ``{"t": offset, "message": ...}`` per line
+
+    Returns:
+        list[dict]: The recorded ticks in order
+    """
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def record(path: str | Path, symbols: list[str], count: int, url: str = STREAM_URL) -> None:
+    """
+    Record ``count`` messages of the real ticker stream
+
+    Args:
+        path (str | Path): Output JSON Lines file
+        symbols (list[str]): The symbols to subscribe to
+        count (int): Number of messages to record
+        url (str): Base URL of the stream server
+    """
+    from websockets.asyncio.client import connect
+
+    streams = "/".join(f"{symbol.lower()}@ticker" for symbol in symbols)
+    start = time.monotonic()
+    async with connect(f"{url}/stream?streams={streams}") as websocket:
+        with open(path, "w") as f:
+            for _ in range(count):
+                message = json.loads(await websocket.recv())
+                f.write(json.dumps({"t": time.monotonic() - start, "message": message}) + "\n")
+
+
+async def serve(
+    ticks: list[dict], host: str = "localhost", port: int = 8765, speed: float = 1.0, loop: bool = True
+):
+    """
+    Replay recorded ticks to every client that connects
+
+    Each client only receives the ticks of the streams requested in its URL
+    (``/stream?streams=btcusdt@ticker/...``), with the recorded timing divided by ``speed``.
+
+    Args:
+        ticks (list[dict]): Ticks loaded with ``load_ticks``
+        host (str): Interface to listen on
+        port (int): Port to listen on (0 picks a free one)
+        speed (float): Replay speed factor; 0 sends every tick without waiting
+        loop (bool): Start again from the first tick when the recording ends
+
+    Returns:
+        Server: The running ``websockets`` server, usable as an async context manager
+    """
+    from websockets.asyncio.server import serve as ws_serve
+
+    async def handler(websocket):
+        query = parse_qs(urlparse(websocket.request.path).query)
+        streams = set(query.get("streams", [""])[0].split("/")) - {""}
+        while True:
+            previous = 0.0
+            for tick in ticks:
+                if speed:
+                    await asyncio.sleep(max(tick["t"] - previous, 0) / speed)
+                previous = tick["t"]
+                message = tick["message"]
+                if streams and message.get("stream") not in streams:
+                    continue
+                await websocket.send(json.dumps(message))
+            if not loop:
+                break
+
+    return await ws_serve(handler, host, port)
+
+
+async def _serve_forever(args) -> None:
+    server = await serve(load_ticks(args.path), args.host, args.port, args.speed)
+    async with server:
+        print(f"Replaying {args.path} on ws://{args.host}:{args.port}")
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="Record the real ticker stream")
+    record_parser.add_argument("path")
+    record_parser.add_argument("symbols", nargs="+")
+    record_parser.add_argument("--count", type=int, default=100)
+
+    serve_parser = subparsers.add_parser("serve", help="Replay a recording locally")
+    serve_parser.add_argument("path")
+    serve_parser.add_argument("--host", default="localhost")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--speed", type=float, default=1.0)
+
+    args = parser.parse_args()
+    if args.command == "record":
+        asyncio.run(record(args.path, args.symbols, args.count))
+    else:
+        asyncio.run(_serve_forever(args))
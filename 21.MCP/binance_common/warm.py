@@ -0,0 +1,164 @@
+"""
+Warm, pre-forked Binance MCP server for stdio clients (POSIX only).
+
+Importing ``mcp`` and its dependencies is most of the start-up time of a server
+process, and stdio clients pay it on every session. With ``--transport prefork``
+the server imports everything once and forks a pool of workers that wait on a
+Unix socket; every connection is served over stdio by one worker, exactly like a
+freshly launched process:
+
+    python 21.MCP/21.a-.binance_mcp_w_tools.py --transport prefork --socket /tmp/binance_mcp.sock
+
+Clients attach by launching this file, which only uses the standard library (so
+``python -S`` skips site-packages too). With ``--server`` it launches that server
+instead when nothing is listening on the socket:
+
+    python -S 21.MCP/binance_common/warm.py --socket /tmp/binance_mcp.sock --server 21.MCP/21.a-.binance_mcp_w_tools.py
+"""
+
+import argparse
+import importlib
+import os
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import traceback
+
+MCP_SOCKET = os.environ.get("BINANCE_MCP_SOCKET", os.path.join(tempfile.gettempdir(), "binance_mcp.sock"))
+# Workers esperando conexiones; cada uno atiende una sesión y se sustituye por otro
+PREFORK_WORKERS = int(os.environ.get("BINANCE_MCP_PREFORK_WORKERS", "4"))
+# Módulos que se importan de forma diferida en el servidor y que los workers heredan ya cargados
+PRELOAD_MODULES = ["binance_common.klines", "mcp.server.stdio", "websockets.asyncio.client"]
+
+
+def _preload() -> None:
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+    # El índice de símbolos en disco se lee una vez y lo heredan todos los workers
+    from binance_common.symbols import symbol_index
+
+    try:
+        symbol_index.load_cache()
+    except (OSError, ValueError, KeyError):
+        pass
+
+
+def _worker(mcp, listener: socket.socket) -> None:
+    """Serve one connection over stdio and exit without returning to the parent's code"""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    code = 0
+    try:
+        conn, _ = listener.accept()
+        listener.close()
+        os.dup2(conn.fileno(), 0)
+        os.dup2(conn.fileno(), 1)
+        conn.close()
+        # Los objetos de stdin/stdout heredados siguen asociados al fichero anterior
+        sys.stdin = open(0, encoding="utf-8", closefd=False)
+        sys.stdout = open(1, "w", encoding="utf-8", closefd=False)
+        mcp.run(transport="stdio")
+    except KeyboardInterrupt:
+        pass
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        # os._exit evita que el worker vuelva al bucle del proceso padre
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except (OSError, ValueError):
+                pass
+        os._exit(code)
+
+
+def _terminate(signum, frame):
+    raise KeyboardInterrupt
+
+
+def serve(mcp, socket_path: str = MCP_SOCKET, workers: int = PREFORK_WORKERS) -> None:
+    """
+    Listen on a Unix socket and serve every connection with a pre-forked worker
+
+    Args:
+        mcp (FastMCP): The server to run in the workers
+        socket_path (str): Path of the Unix socket
+        workers (int): Number of idle workers kept ready
+    """
+    _preload()
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen(64)
+    signal.signal(signal.SIGTERM, _terminate)
+    print(f"Pre-forked Binance MCP listening on {socket_path} with {workers} workers", file=sys.stderr)
+
+    children: set[int] = set()
+    try:
+        while True:
+            while len(children) < workers:
+                pid = os.fork()
+                if pid == 0:
+                    _worker(mcp, listener)
+                children.add(pid)
+            # Cuando un worker termina su sesión se lanza otro en su lugar
+            pid, _ = os.wait()
+            children.discard(pid)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        listener.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def attach(socket_path: str = MCP_SOCKET, server: str | None = None) -> int:
+    """
+    Relay stdin and stdout to a pre-forked server
+
+    Args:
+        socket_path (str): Path of the Unix socket of the server
+        server (str): Server file launched in this process when the socket is not available
+
+    Returns:
+        int: The exit code
+    """
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(socket_path)
+    except OSError as e:
+        if server is None:
+            print(f"No Binance MCP server on {socket_path}: {e}", file=sys.stderr)
+            return 1
+        os.execv(sys.executable, [sys.executable, server])
+
+    def pump_stdin():
+        while chunk := os.read(0, 65536):
+            conn.sendall(chunk)
+        conn.shutdown(socket.SHUT_WR)
+
+    threading.Thread(target=pump_stdin, daemon=True).start()
+    stdout = sys.stdout.buffer
+    while chunk := conn.recv(65536):
+        stdout.write(chunk)
+        stdout.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Attach to a pre-forked Binance MCP server over stdio")
+    parser.add_argument("--socket", default=MCP_SOCKET)
+    parser.add_argument("--server", help="Server file to launch when the socket is not available")
+    args = parser.parse_args()
+    sys.exit(attach(args.socket, args.server))
@@ -0,0 +1,122 @@
+import asyncio
+import unittest
+
+from binance_common.cache import TTLCache
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Upstream:
+    """Fake upstream that counts the calls and answers when released."""
+
+    def __init__(self):
+        self.calls = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def fetch(self, key):
+        self.calls.append(key)
+        call = len(self.calls)
+        await self.release.wait()
+        return f"{key}-{call}"
+
+    async def fetch_many(self, keys, omit=()):
+        self.calls.append(list(keys))
+        call = len(self.calls)
+        await self.release.wait()
+        return {key: f"{key}-{call}" for key in keys if key not in omit}
+
+
+class TestTTLCache(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.clock = FakeClock()
+        self.cache = TTLCache("test", ttl=5.0, clock=self.clock)
+        self.upstream = Upstream()
+
+    async def test_concurrent_misses_share_one_fetch(self):
+        self.upstream.release.clear()
+        callers = [
+            asyncio.ensure_future(self.cache.get_or_fetch("BTCUSDT", lambda: self.upstream.fetch("BTCUSDT")))
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0)
+        self.upstream.release.set()
+        self.assertEqual(await asyncio.gather(*callers), ["BTCUSDT-1"] * 5)
+        self.assertEqual(self.upstream.calls, ["BTCUSDT"])
+        stats = self.cache.stats()
+        self.assertEqual((stats["misses"], stats["coalesced"], stats["hits"]), (1, 4, 0))
+
+    async def test_entries_expire_after_ttl(self):
+        fetch = lambda: self.upstream.fetch("BTCUSDT")
+        self.assertEqual(await self.cache.get_or_fetch("BTCUSDT", fetch), "BTCUSDT-1")
+        self.clock.now = 4.9
+        self.assertEqual(await self.cache.get_or_fetch("BTCUSDT", fetch), "BTCUSDT-1")
+        self.clock.now = 5.0
+        self.assertIsNone(self.cache.get("BTCUSDT"))
+        self.assertEqual(await self.cache.get_or_fetch("BTCUSDT", fetch), "BTCUSDT-2")
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    async def test_cancelled_caller_does_not_cancel_the_fetch(self):
+        self.upstream.release.clear()
+        fetch = lambda: self.upstream.fetch("BTCUSDT")
+        first = asyncio.ensure_future(self.cache.get_or_fetch("BTCUSDT", fetch))
+        second = asyncio.ensure_future(self.cache.get_or_fetch("BTCUSDT", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        self.upstream.release.set()
+        self.assertEqual(await second, "BTCUSDT-1")
+        self.assertEqual(self.cache.get("BTCUSDT"), "BTCUSDT-1")
+
+    async def test_failed_fetch_is_not_cached(self):
+        async def failing():
+            raise RuntimeError("upstream down")
+
+        with self.assertRaises(RuntimeError):
+            await self.cache.get_or_fetch("BTCUSDT", failing)
+        self.assertEqual(await self.cache.get_or_fetch("BTCUSDT", lambda: self.upstream.fetch("BTCUSDT")), "BTCUSDT-1")
+
+    async def test_get_many_fetches_only_the_misses_in_one_call(self):
+        await self.cache.get_or_fetch("BTCUSDT", lambda: self.upstream.fetch("BTCUSDT"))
+        self.upstream.release.clear()
+        inflight = asyncio.ensure_future(self.cache.get_or_fetch("ETHUSDT", lambda: self.upstream.fetch("ETHUSDT")))
+        await asyncio.sleep(0)
+        many = asyncio.ensure_future(
+            self.cache.get_many_or_fetch(["SOLUSDT", "BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT"], self.upstream.fetch_many)
+        )
+        await asyncio.sleep(0)
+        self.upstream.release.set()
+
+        self.assertEqual(await many, {
+            "SOLUSDT": "SOLUSDT-3", "BTCUSDT": "BTCUSDT-1", "ETHUSDT": "ETHUSDT-2", "BNBUSDT": "BNBUSDT-3",
+        })
+        self.assertEqual(await inflight, "ETHUSDT-2")
+        self.assertEqual(self.upstream.calls, ["BTCUSDT", "ETHUSDT", ["SOLUSDT", "BNBUSDT"]])
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["coalesced"], stats["misses"]), (1, 1, 4))
+
+        # Ya está todo en la caché
+        await self.cache.get_many_or_fetch(["BNBUSDT", "SOLUSDT"], self.upstream.fetch_many)
+        self.assertEqual(len(self.upstream.calls), 3)
+
+    async def test_batch_response_without_a_symbol(self):
+        fetch_many = lambda keys: self.upstream.fetch_many(keys, omit={"XXXUSDT"})
+        with self.assertRaises(KeyError):
+            await self.cache.get_many_or_fetch(["BTCUSDT", "XXXUSDT"], fetch_many)
+        # El resto del lote sí se guarda y la clave que faltaba no se queda en vuelo
+        self.assertEqual(self.cache.get("BTCUSDT"), "BTCUSDT-1")
+        self.assertEqual(self.cache._inflight, {})
+        with self.assertRaises(KeyError):
+            await self.cache.get_many_or_fetch(["XXXUSDT"], fetch_many)
+        self.assertEqual(self.upstream.calls, [["BTCUSDT", "XXXUSDT"], ["XXXUSDT"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+from binance_common import klines
+from binance_common.klines import MINUTE, KlineStore, merge_ranges, missing_ranges
+
+LISTED = 100 * MINUTE  # primera vela del par falso
+NOW = 10_000 * MINUTE
+
+
+class FakeKlines:
+    """Upstream /klines with a 1m candle every minute from LISTED on."""
+
+    def __init__(self):
+        self.requests = []
+
+    async def __call__(self, url, params):
+        start, end = params["startTime"], params["endTime"]
+        self.requests.append((start, end))
+        first = max(LISTED, -(-start // MINUTE) * MINUTE)
+        times = range(first, min(end, NOW - MINUTE) + 1, MINUTE)[: params["limit"]]
+        return [[t, "1", "2", "0.5", "1.5", "10", t + MINUTE - 1, "15", 3] for t in times]
+
+
+class TestRanges(unittest.TestCase):
+
+    def test_merge_ranges(self):
+        self.assertEqual(merge_ranges([(10, 20), (0, 5), (6, 8), (15, 30), (40, 50)]), [(0, 8), (10, 30), (40, 50)])
+        self.assertEqual(merge_ranges([]), [])
+
+    def test_missing_ranges(self):
+        covered = [(10, 20), (30, 40)]
+        self.assertEqual(missing_ranges(covered, 0, 50), [(0, 9), (21, 29), (41, 50)])
+        self.assertEqual(missing_ranges(covered, 12, 35), [(21, 29)])
+        self.assertEqual(missing_ranges(covered, 12, 18), [])
+        self.assertEqual(missing_ranges(covered, 22, 25), [(22, 25)])
+        self.assertEqual(missing_ranges([], 5, 7), [(5, 7)])
+
+
+class TestKlineStore(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = KlineStore(self.directory.name)
+        self.upstream = FakeKlines()
+        for patcher in (
+            mock.patch.object(klines, "get_json", self.upstream),
+            mock.patch.object(klines.time, "time", lambda: NOW / 1000),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        self.directory.cleanup()
+
+    async def sync(self, start, end):
+        return await self.store.sync("BTCUSDT", "1m", start * MINUTE, end * MINUTE)
+
+    async def test_fetches_only_the_gap_between_two_periods(self):
+        await self.sync(1000, 1100)
+        await self.sync(2000, 2100)
+        self.upstream.requests.clear()
+
+        result = await self.sync(1050, 2050)
+        self.assertEqual(self.upstream.requests, [(1100 * MINUTE + 1, 2000 * MINUTE - 1)])
+        self.assertEqual(len(result), 1001)
+        self.assertEqual(self.store.load_coverage("BTCUSDT", "1m"), [(1000 * MINUTE, 2100 * MINUTE)])
+
+        self.upstream.requests.clear()
+        self.assertEqual(len(await self.sync(1000, 2100)), 1101)
+        self.assertEqual(self.upstream.requests, [])
+
+    async def test_period_without_candles_is_not_refetched(self):
+        self.assertEqual(len(await self.sync(0, 50)), 0)
+        self.assertEqual(len(await self.sync(0, 150)), 51)
+        self.upstream.requests.clear()
+        await self.sync(0, 150)
+        await self.sync(10, 20)
+        self.assertEqual(self.upstream.requests, [])
+
+    async def test_cached_candles_without_coverage(self):
+        await self.sync(1000, 1100)
+        self.store.coverage_path("BTCUSDT", "1m").write_text(json.dumps({"first": 0, "last": 1}))
+        self.upstream.requests.clear()
+        await self.sync(1000, 1200)
+        self.assertEqual(self.upstream.requests, [(1100 * MINUTE + 1, 1200 * MINUTE)])
+
+
+if __name__ == "__main__":
+    unittest.main()
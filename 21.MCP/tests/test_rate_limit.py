@@ -0,0 +1,97 @@
+import asyncio
+import unittest
+
+from binance_common.rate_limit import RateLimitError, WeightLimiter, background_priority, request_weight
+
+API = "https://api.binance.com/api/v3"
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRequestWeight(unittest.TestCase):
+
+    def test_weights(self):
+        self.assertEqual(request_weight(f"{API}/exchangeInfo"), 20)
+        self.assertEqual(request_weight(f"{API}/ticker/price", {"symbol": "BTCUSDT"}), 2)
+        self.assertEqual(request_weight(f"{API}/ticker/price"), 4)
+        self.assertEqual(request_weight(f"{API}/ticker/24hr"), 80)
+        self.assertEqual(request_weight(f"{API}/ticker/24hr", {"symbols": ",".join(["A"] * 21)}), 40)
+        self.assertEqual(request_weight(f"{API}/klines", {"symbol": "BTCUSDT"}), 2)
+
+
+class TestWeightLimiter(unittest.IsolatedAsyncioTestCase):
+
+    async def test_weight_accounting(self):
+        clock = FakeClock()
+        limiter = WeightLimiter(limit_per_minute=600, safety_factor=0.5, clock=clock)
+        self.assertEqual((limiter.capacity, limiter.rate), (300, 5))
+        await limiter.acquire(20)
+        await limiter.acquire(2)
+        self.assertEqual(limiter.tokens, 278)
+        clock.now = 2.0
+        self.assertEqual(limiter.stats()["tokens"], 288)
+        clock.now = 60.0
+        self.assertEqual(limiter.stats()["tokens"], 300)
+
+        # Binance cuenta también el peso de otros procesos de la misma IP
+        limiter.update(200, {"x-mbx-used-weight-1m": "250"})
+        self.assertEqual(limiter.tokens, 50)
+        limiter.update(200, {"x-mbx-used-weight-1m": "10"})
+        self.assertEqual(limiter.tokens, 50)
+        # Una petición más pesada que el cubo entero espera al cubo lleno, no para siempre
+        await limiter.acquire(40)
+        clock.now = 120.0
+        await limiter.acquire(1000)
+        self.assertEqual(limiter.tokens, 0)
+
+    async def test_ban_rejects_without_waiting(self):
+        clock = FakeClock()
+        limiter = WeightLimiter(limit_per_minute=600, max_wait=10, clock=clock)
+        limiter.update(429, {"retry-after": "30"})
+        with self.assertRaises(RateLimitError) as raised:
+            await limiter.acquire(1)
+        self.assertEqual(raised.exception.retry_after, 30)
+        self.assertEqual(limiter.stats()["rejected"], 1)
+        clock.now = 31.0
+        await limiter.acquire(1)
+
+    async def test_queued_call_times_out(self):
+        limiter = WeightLimiter(limit_per_minute=60, safety_factor=1.0, max_wait=0.05)
+        await limiter.acquire(60)
+        with self.assertRaises(RateLimitError):
+            await limiter.acquire(30)
+        self.assertEqual((limiter.throttled, limiter.rejected), (1, 1))
+        self.assertEqual(limiter.stats()["queued"], 0)
+
+    async def test_interactive_calls_go_first(self):
+        # 100 de peso por segundo: cada llamada de 5 espera 50 ms
+        limiter = WeightLimiter(limit_per_minute=6000, safety_factor=1.0, max_wait=5)
+        await limiter.acquire(6000)
+        order = []
+
+        async def call(name, background=False):
+            if background:
+                with background_priority():
+                    await limiter.acquire(5)
+            else:
+                await limiter.acquire(5)
+            order.append(name)
+
+        tasks = [asyncio.ensure_future(call("refresh-1", True)), asyncio.ensure_future(call("refresh-2", True))]
+        await asyncio.sleep(0)
+        tasks += [asyncio.ensure_future(call("tool-1")), asyncio.ensure_future(call("tool-2"))]
+        await asyncio.gather(*tasks)
+        self.assertEqual(order, ["tool-1", "tool-2", "refresh-1", "refresh-2"])
+        self.assertEqual(limiter.throttled, 4)
+        self.assertLess(limiter.tokens, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from binance_common import rate_limit, symbols
+from binance_common.symbols import SymbolIndex, UnknownSymbolError
+
+PAIRS = [
+    ["BTCUSDT", "BTC", "USDT"],
+    ["BTCEUR", "BTC", "EUR"],
+    ["ETHBTC", "ETH", "BTC"],
+    ["ETHUSDT", "ETH", "USDT"],
+    ["SOLBNB", "SOL", "BNB"],
+    ["SOLETH", "SOL", "ETH"],
+    ["DOGEUSDT", "DOGE", "USDT"],
+]
+
+
+def exchange_info(pairs):
+    return {"symbols": [{"symbol": s, "baseAsset": b, "quoteAsset": q} for s, b, q in pairs]}
+
+
+class TestResolve(unittest.TestCase):
+
+    def setUp(self):
+        self.index = SymbolIndex(cache_file=Path(tempfile.mkdtemp()) / "symbols.json")
+        self.index.build(PAIRS)
+
+    def test_names_tickers_and_aliases(self):
+        self.assertEqual(self.index.resolve("bitcoin"), "BTCUSDT")
+        self.assertEqual(self.index.resolve("BTC"), "BTCUSDT")
+        self.assertEqual(self.index.resolve("btceur"), "BTCEUR")
+        self.assertEqual(self.index.resolve("eth/btc"), "ETHBTC")
+        self.assertEqual(self.index.resolve("Ether"), "ETHUSDT")
+        # Sin USDT se usa la siguiente cotización preferida
+        self.assertEqual(self.index.resolve("solana"), "SOLETH")
+
+    def test_prefixes_and_typos(self):
+        self.assertEqual(self.index.resolve("ethere"), "ETHUSDT")
+        self.assertEqual(self.index.resolve("etherum"), "ETHUSDT")
+        self.assertEqual(self.index.resolve("dogecoi"), "DOGEUSDT")
+
+    def test_unknown_asset(self):
+        with self.assertRaises(UnknownSymbolError) as raised:
+            self.index.resolve("notacoin")
+        self.assertNotIn("Did you mean", str(raised.exception))
+        with self.assertRaises(UnknownSymbolError) as raised:
+            self.index.resolve("bt")
+        self.assertIn("BTCEUR, BTCUSDT", str(raised.exception))
+
+    def test_fallback_before_loading(self):
+        index = SymbolIndex(cache_file=Path(tempfile.mkdtemp()) / "symbols.json")
+        self.assertFalse(index.loaded)
+        self.assertEqual(index.resolve("Bitcoin"), "BTCUSDT")
+        self.assertEqual(index.resolve("eth"), "ETHUSDT")
+        self.assertEqual(index.resolve("solusdt"), "SOLUSDT")
+
+
+class TestRefresh(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_file = Path(self.directory.name) / "symbols.json"
+        self.requests = []
+        self.fail = False
+        self.pairs = PAIRS
+        patcher = mock.patch.object(symbols, "get_json", self.get_json)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        self.directory.cleanup()
+
+    async def get_json(self, url, params):
+        self.requests.append((url, params, rate_limit._priority.get()))
+        if self.fail:
+            raise OSError("no network")
+        return exchange_info(self.pairs)
+
+    async def wait_refresh(self, index):
+        if index._refresh_task is not None:
+            await index._refresh_task
+
+    async def test_start_uses_the_disk_cache_and_refreshes_in_the_background(self):
+        self.cache_file.write_text(json.dumps({"fetched_at": 0, "pairs": [["BTCUSDT", "BTC", "USDT"]]}))
+        index = SymbolIndex(cache_file=self.cache_file)
+        index.start()
+        # Disponible al momento con la caché, aunque esté caducada
+        with self.assertRaises(UnknownSymbolError):
+            index.resolve("DOGE")
+        await self.wait_refresh(index)
+        self.assertEqual(index.resolve("DOGE"), "DOGEUSDT")
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(self.requests[0][2], rate_limit.BACKGROUND)
+        self.assertEqual(len(json.loads(self.cache_file.read_text())["pairs"]), len(PAIRS))
+
+        # Una caché reciente no se vuelve a pedir
+        fresh = SymbolIndex(cache_file=self.cache_file)
+        fresh.start()
+        await self.wait_refresh(fresh)
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(fresh.resolve("ether"), "ETHUSDT")
+
+    async def test_offline_falls_back_to_the_cache(self):
+        self.cache_file.write_text(json.dumps({"fetched_at": 0, "pairs": PAIRS}))
+        self.fail = True
+        index = SymbolIndex(cache_file=self.cache_file)
+        index.start()
+        await self.wait_refresh(index)
+        self.assertEqual(index.resolve("bitcoin"), "BTCUSDT")
+        self.assertTrue(index.stale)
+
+    async def test_offline_without_cache_uses_legacy_symbols(self):
+        self.fail = True
+        index = SymbolIndex(cache_file=self.cache_file)
+        index.start()
+        await self.wait_refresh(index)
+        self.assertFalse(index.loaded)
+        self.assertEqual(index.resolve("ethereum"), "ETHUSDT")
+
+    async def test_resolve_refreshes_a_stale_index_at_most_once_per_retry_interval(self):
+        index = SymbolIndex(cache_file=self.cache_file, refresh_interval=3600)
+        index.build(PAIRS, fetched_at=time.time() - 7200)
+        self.pairs = PAIRS + [["PEPEUSDT", "PEPE", "USDT"]]
+        self.fail = True
+        index.resolve("btc")
+        await self.wait_refresh(index)
+        index.resolve("btc")
+        await asyncio.sleep(0)
+        self.assertEqual(len(self.requests), 1)
+
+        # Pasado el intervalo de reintento se vuelve a intentar, ahora con conexión
+        self.fail = False
+        with mock.patch.object(symbols, "SYMBOL_RETRY_INTERVAL", 0):
+            index.resolve("btc")
+            await self.wait_refresh(index)
+        self.assertEqual(len(self.requests), 2)
+        self.assertFalse(index.stale)
+        self.assertEqual(index.resolve("pepe"), "PEPEUSDT")
+
+
+if __name__ == "__main__":
+    unittest.main()